@@ -1,13 +1,30 @@
 # Blooper4/audio_engine/base_processor.py
+import numpy as np
+from constants import SAMPLE_RATE, TPQN, VOICE_RELEASE, VOICE_SILENCE_THRESHOLD, STREAM_BLOCK
 
 class BaseProcessor:
     """
     The Parent class for all Blooper 4.0 Audio Engines.
     Establishes the 'Contract' that allows the AudioManager to be generic.
     """
+    # Sources that override generate_blocks() with real per-block state
+    # (oscillator phase, filter memory, envelope position) set this to True.
+    supports_streaming = False
+
+    # Parameter schema (audio_engine/params.py): names, types, ranges and
+    # defaults. Plugins that declare one read compile_params() structs.
+    SCHEMA = None
+
+    # One-shot sources (drums) play to their natural end on SAMPLER pads:
+    # the note-off gate is skipped unless the pad sets "one_shot": False.
+    one_shot = False
+
     def __init__(self):
         # Universal state for all audio math
         self.active = True
+        # Internal render rate. The PluginFactory overrides it per instance
+        # (DRAFT playback / high-rate export): plugins never read SAMPLE_RATE.
+        self.sample_rate = SAMPLE_RATE
 
     def generate(self, track_model, note_model, bpm):
         """
@@ -27,6 +44,22 @@ class BaseProcessor:
         # Plugins will implement this to handle a simple parameter dictionary
         return None
 
+    def compile_params(self, params):
+        """Params dict -> cached __slots__ struct (derived values computed once per edit)."""
+        return self.SCHEMA.compile(params, self.sample_rate)
+
+    def generate_blocks(self, params, note, bpm, block_size=STREAM_BLOCK):
+        """
+        Streaming entry point: yields float32 blocks of 'block_size' samples.
+        Default: render the whole voice, then slice it (no memory win).
+        Streaming sources override this so only one block exists at a time.
+        """
+        buffer = self.generate_modular(params, note, bpm)
+        if buffer is None:
+            return
+        for start in range(0, len(buffer), block_size):
+            yield buffer[start:start + block_size]
+
     def process(self, buffer, params):
         """
         EFFECTS (EQ/Reverb) override this method.
@@ -39,6 +72,79 @@ class BaseProcessor:
         # Default behavior: pass-through (bypass)
         return buffer
 
+    # --- FX CHAIN COMPILER HOOKS (see audio_engine/fx_chain.py) ---
+    def is_identity(self, params):
+        """EFFECTS: True when these params leave the signal untouched (dropped from the chain)."""
+        return False
+
+    def to_sos(self, params):
+        """EFFECTS: the effect as SOS sections if it is a pure linear IIR cascade, else None."""
+        return None
+
+    def compile(self, params):
+        """
+        EFFECTS: returns a callable(buffer) -> buffer for these params.
+        Override to do the per-params work (filter design...) once, not per note.
+        """
+        return lambda buffer: self.process(buffer, params)
+
+    # --- GATE HELPERS (Sources) ---
+    # A voice only lasts as long as it is heard: note-off + release.
+    # Sources size their buffers with gated_samples() and finish with
+    # finish_voice(), so render cost scales with the note, not the knob.
+    # One-shot notes (models.OneShotNote) have no note-off: never gated.
+
+    @staticmethod
+    def gate_seconds(note, bpm):
+        """Note length in seconds (note-off time, infinite for one-shots)."""
+        if note.one_shot:
+            return float("inf")
+        return note.duration * 60.0 / (bpm * TPQN)
+
+    def gated_samples(self, natural_dur, note, bpm, sample_rate=None):
+        """Samples to render: the natural length, cut at note-off + release."""
+        sample_rate = sample_rate or self.sample_rate
+        heard = min(natural_dur, self.gate_seconds(note, bpm) + VOICE_RELEASE)
+        return max(0, int(heard * sample_rate))
+
+    def finish_voice(self, buffer, note, bpm, sample_rate=None):
+        """Applies the release fade at note-off and trims the silent tail."""
+        sample_rate = sample_rate or self.sample_rate
+        buffer = np.asarray(buffer, dtype=np.float32)
+        if note.one_shot:
+            return self.trim_tail(buffer)
+        gate = int(self.gate_seconds(note, bpm) * sample_rate)
+        if gate < len(buffer):
+            buffer = buffer[:gate + int(VOICE_RELEASE * sample_rate)].copy()
+            self.release_block(buffer, 0, note, bpm, sample_rate)
+        return self.trim_tail(buffer)
+
+    def release_block(self, block, start, note, bpm, sample_rate=None):
+        """
+        In-place release fade for a block starting at sample 'start' of the voice.
+        Works on whole voices (start=0) and on streamed blocks alike.
+        """
+        if note.one_shot:
+            return block
+        sample_rate = sample_rate or self.sample_rate
+        gate = int(self.gate_seconds(note, bpm) * sample_rate)
+        release = int(VOICE_RELEASE * sample_rate)
+        lo, hi = max(gate, start), min(gate + release, start + len(block))
+        if lo < hi:
+            block[lo - start:hi - start] *= 1.0 - (np.arange(lo, hi) - gate) / release
+        # Everything after the release is silence
+        if gate + release < start + len(block):
+            block[max(0, gate + release - start):] = 0.0
+        return block
+
+    @staticmethod
+    def trim_tail(buffer, threshold=VOICE_SILENCE_THRESHOLD):
+        """Drops trailing samples below 'threshold' (never returns empty)."""
+        loud = np.flatnonzero(np.abs(buffer) > threshold)
+        if len(loud) == 0:
+            return buffer[:1]
+        return buffer[:loud[-1] + 1]
+
     def toggle_power(self):
         """Standard method to enable/disable the module."""
         self.active = not self.active
\ No newline at end of file
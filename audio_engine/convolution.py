@@ -0,0 +1,187 @@
+# Blooper4/audio_engine/convolution.py
+import os
+import threading
+from math import gcd
+import numpy as np
+from scipy.io import wavfile
+from scipy.signal import butter, resample_poly, sosfilt
+from constants import IR_DIR, BUILTIN_IR
+
+# Shared by every factory / track: an IR is decoded and transformed once.
+# (Lives here, not in the plugin file: plugin modules are reloaded on demand.)
+_lock = threading.Lock()
+_irs = {}       # (name, file mtime, sample_rate) -> float32 IR
+_spectra = {}   # (name, file mtime, block, sample_rate) -> IRSpectra
+
+
+def list_irs():
+    """Names the CONVOLUTION_REVERB can load: the built-in hall + every WAV in IR_DIR."""
+    names = [BUILTIN_IR]
+    if os.path.isdir(IR_DIR):
+        names += sorted(f for f in os.listdir(IR_DIR) if f.lower().endswith(".wav"))
+    return names
+
+
+def _ir_path(name):
+    return name if os.path.isabs(name) else os.path.join(IR_DIR, name)
+
+
+def _ir_mtime(name):
+    if name == BUILTIN_IR:
+        return 0
+    try:
+        return os.path.getmtime(_ir_path(name))
+    except OSError:
+        return 0
+
+
+def _builtin_ir(sample_rate, seconds=1.8):
+    """Decaying filtered noise (-60 dB at 'seconds'): a usable hall without any file."""
+    n = int(seconds * sample_rate)
+    t = np.arange(n) / sample_rate
+    noise = np.random.default_rng(4).standard_normal(n)
+    noise = sosfilt(butter(2, min(6000, 0.45 * sample_rate), fs=sample_rate, output='sos'), noise)
+    return (noise * np.exp(-6.91 * t / seconds)).astype(np.float32)
+
+
+def _read_ir(name, sample_rate):
+    """Decodes a WAV IR to mono float32 at 'sample_rate'. None if unreadable."""
+    try:
+        file_rate, data = wavfile.read(_ir_path(name))
+    except (OSError, ValueError) as e:
+        print(f"Convolution: cannot load IR '{name}': {e}")
+        return None
+
+    # 1. PCM -> float
+    if data.dtype == np.uint8:
+        data = (data.astype(np.float32) - 128.0) / 128.0
+    elif np.issubdtype(data.dtype, np.integer):
+        data = data.astype(np.float32) / float(np.iinfo(data.dtype).max)
+    data = data.astype(np.float32)
+
+    # 2. Plugins are mono
+    if data.ndim > 1:
+        data = data.mean(axis=1)
+
+    # 3. To the render rate
+    if file_rate != sample_rate:
+        g = gcd(int(file_rate), int(sample_rate))
+        data = resample_poly(data, int(sample_rate) // g, int(file_rate) // g).astype(np.float32)
+    return data if len(data) else None
+
+
+def load_ir(name, sample_rate):
+    """Returns the IR, energy-normalized (the wet level does not depend on the file's gain)."""
+    key = (name, _ir_mtime(name), sample_rate)
+    with _lock:
+        ir = _irs.get(key)
+    if ir is not None:
+        return ir
+
+    ir = None if name == BUILTIN_IR else _read_ir(name, sample_rate)
+    if ir is None:
+        ir = _builtin_ir(sample_rate)
+    energy = float(np.sqrt(np.sum(ir.astype(np.float64) ** 2)))
+    if energy > 0:
+        ir = (ir / energy).astype(np.float32)
+
+    with _lock:
+        _irs[key] = ir
+    return ir
+
+
+class IRSpectra:
+    """
+    An IR cut into partitions of 'block' samples, each zero-padded to 2*block
+    and FFT'd once. H[k] is the spectrum of partition k.
+    """
+    def __init__(self, ir, block):
+        self.block = block
+        self.length = len(ir)
+        parts = -(-len(ir) // block)
+        padded = np.zeros((parts, 2 * block), dtype=np.float64)
+        padded[:, :block] = np.pad(ir, (0, parts * block - len(ir))).reshape(parts, block)
+        self.H = np.fft.rfft(padded, axis=1)
+
+    def __len__(self):
+        return len(self.H)
+
+
+def get_spectra(name, block, sample_rate):
+    """The cached IRSpectra for an IR at a block size (shared by every track instance)."""
+    key = (name, _ir_mtime(name), block, sample_rate)
+    with _lock:
+        spectra = _spectra.get(key)
+    if spectra is None:
+        spectra = IRSpectra(load_ir(name, sample_rate), block)
+        with _lock:
+            _spectra[key] = spectra
+    return spectra
+
+
+class ConvolutionStage:
+    """
+    Uniformly partitioned overlap-save convolution (UPOLS) with a dry/wet mix.
+
+    Each input block of B samples is FFT'd once (window = previous + current
+    block) and pushed into a frequency-domain delay line (FDL); the output
+    block is irfft(sum_k FDL[k] * H[k]). Latency is one block at most, and
+    a partial block is still exact (later samples are just zero for now),
+    so streamed and whole-buffer output are identical.
+    """
+    def __init__(self, spectra, mix):
+        self.spectra = spectra
+        self.mix = mix
+        self.tail_samples = spectra.length
+
+    def __call__(self, buffer):
+        """Whole buffer in one go: every block's spectrum at once, one pass per partition."""
+        B, H = self.spectra.block, self.spectra.H
+        n = len(buffer)
+        if n == 0:
+            return buffer
+        blocks = -(-n // B)
+        x = np.zeros((blocks + 1) * B)
+        x[B:B + n] = buffer
+        windows = np.lib.stride_tricks.sliding_window_view(x, 2 * B)[::B][:blocks]
+        X = np.fft.rfft(windows, axis=1)
+
+        Y = np.zeros_like(X)
+        for k in range(min(len(H), blocks)):
+            Y[k:] += X[:blocks - k] * H[k]
+        wet = np.fft.irfft(Y, n=2 * B, axis=1)[:, B:].ravel()[:n]
+        return (buffer * (1.0 - self.mix) + wet * self.mix).astype(np.float32)
+
+    def new_state(self):
+        B = self.spectra.block
+        return {"fdl": np.zeros_like(self.spectra.H), "head": 0,
+                "window": np.zeros(2 * B), "fill": 0}
+
+    def stream(self, buffer, state):
+        B, H = self.spectra.block, self.spectra.H
+        fdl, window = state["fdl"], state["window"]
+        wet = np.empty(len(buffer))
+        pos = 0
+        while pos < len(buffer):
+            # 1. Fill the current block (possibly only partly)
+            fill = state["fill"]
+            take = min(B - fill, len(buffer) - pos)
+            window[B + fill:B + fill + take] = buffer[pos:pos + take]
+
+            # 2. Newest spectrum at 'head', older ones behind it (circular FDL)
+            head = state["head"]
+            fdl[head] = np.fft.rfft(window)
+            Y = np.einsum('pk,pk->k', fdl[head::-1], H[:head + 1])
+            if head + 1 < len(H):
+                Y += np.einsum('pk,pk->k', fdl[:head:-1], H[head + 1:])
+            wet[pos:pos + take] = np.fft.irfft(Y, n=2 * B)[B + fill:B + fill + take]
+
+            # 3. Block complete: it becomes the 'previous' half of the next window
+            pos += take
+            state["fill"] = fill + take
+            if state["fill"] == B:
+                window[:B] = window[B:]
+                window[B:] = 0.0
+                state["head"] = (head + 1) % len(H)
+                state["fill"] = 0
+        return (buffer * (1.0 - self.mix) + wet * self.mix).astype(np.float32), state
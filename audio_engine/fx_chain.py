@@ -0,0 +1,130 @@
+# Blooper4/audio_engine/fx_chain.py
+import json
+import numpy as np
+from scipy.signal import sosfilt
+from audio_engine.base_processor import BaseProcessor
+from audio_engine.params import RecordingParams, ParamDependencies
+
+class CompiledChain:
+    """
+    A track's FX list turned into a flat list of ready-to-run stages.
+
+    Built once per edit (see compile_chain), then reused for every note:
+    - bypassed / identity effects (EQ flat, reverb mix 0) are gone,
+    - plugin instances and filter coefficients are resolved up front,
+    - consecutive linear IIR stages run as ONE fused SOS cascade.
+
+    STATE:
+    ------
+    process() treats every buffer as a whole new signal (one voice). A chain
+    whose stages can all carry state (IIR cascades, convolution) is
+    'streamable': process_block() runs it block
+    by block with filter state carried in a caller-owned object from
+    new_state() (one per streamed voice / bus), so blocks join seamlessly.
+    The chain itself stays stateless and can be shared by every track.
+    """
+    def __init__(self, stages, signature):
+        self.stages = stages        # [callable(buffer) -> buffer]
+        self.signature = signature
+        self.streamable = all(hasattr(stage, "stream") for stage in stages)
+        # Longest ring-out a streamable chain needs after its input stops
+        self.tail_samples = sum(getattr(stage, "tail_samples", 0) for stage in stages)
+
+    def __len__(self):
+        return len(self.stages)
+
+    def process(self, buffer):
+        for stage in self.stages:
+            buffer = stage(buffer)
+        return buffer
+
+    def new_state(self):
+        return [stage.new_state() for stage in self.stages]
+
+    def process_block(self, buffer, state):
+        """Streamable chains only: filters 'buffer', updating 'state' in place."""
+        for i, stage in enumerate(self.stages):
+            buffer, state[i] = stage.stream(buffer, state[i])
+        return buffer
+
+
+class SOSStage:
+    """
+    A fused linear IIR cascade (EQ bands, filters...).
+    Stateful stages share this shape: __call__ (whole buffer), new_state(),
+    stream(buffer, state) -> (buffer, state).
+    """
+    def __init__(self, sections):
+        self.sos = np.vstack(sections)
+
+    def __call__(self, buffer):
+        return sosfilt(self.sos, buffer).astype(np.float32)
+
+    def new_state(self):
+        return np.zeros((len(self.sos), 2))
+
+    def stream(self, buffer, zi):
+        out, zi = sosfilt(self.sos, buffer, zi=zi)
+        return out.astype(np.float32), zi
+
+
+def chain_signature(effects, factory=None):
+    """
+    Stable fingerprint of an FX list: the chain is only rebuilt when it changes.
+    With a factory, each effect contributes only the params it reads (once
+    recorded by compile_chain), so UI-only keys do not force a rebuild.
+    """
+    if factory is None:
+        return json.dumps(effects, sort_keys=True, default=str)
+    items = []
+    for fx in effects:
+        params = fx.get("params", {})
+        deps = factory.param_deps.get(fx.get("type"), factory.get_plugin_hash(fx.get("type")))
+        items.append([fx.get("type"), fx.get("active", True), ParamDependencies.project(params, deps)])
+    return json.dumps(items, sort_keys=True, default=str)
+
+
+def _record_reads(factory, plugin_id, processor, params, staged):
+    """
+    Files what compiling read. A stage from the default compile() reads
+    lazily at process() time, after the signature was made: it depends on all.
+    """
+    reads = set(params.reads)
+    if staged and type(processor).compile is BaseProcessor.compile:
+        reads.update(params._params)
+    factory.param_deps.record(plugin_id, factory.get_plugin_hash(plugin_id), reads)
+
+
+def compile_chain(factory, effects, signature=None):
+    """Builds a CompiledChain from a Track.effects style list of dicts."""
+    stages = []
+    pending_sos = []  # Linear IIR sections waiting to be fused
+
+    for fx in effects:
+        if not fx.get("active", True): continue
+        processor = factory.get_effect(fx["type"])
+        if not processor: continue
+        # Everything below reads params through a recorder (see chain_signature)
+        params = RecordingParams(fx["params"])
+        stage = None
+
+        # 1. Bypass elision: an effect that returns its input costs nothing
+        if processor.is_identity(params):
+            pass
+        # 2. Filter fusion: pure IIR effects join the current SOS cascade
+        elif (sos := processor.to_sos(params)) is not None:
+            pending_sos.append(sos)
+        # 3. Anything else is its own stage (pre-resolved instance + params)
+        else:
+            stage = processor.compile(params)
+        _record_reads(factory, fx["type"], processor, params, stage is not None)
+
+        if stage is not None:
+            if pending_sos:
+                stages.append(SOSStage(pending_sos))
+                pending_sos = []
+            stages.append(stage)
+
+    if pending_sos:
+        stages.append(SOSStage(pending_sos))
+    return CompiledChain(stages, signature or chain_signature(effects))
@@ -0,0 +1,249 @@
+# Blooper4/audio_engine/graph.py
+import os
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from constants import GRAPH_BLOCK, FX_TAIL_SECONDS
+
+MASTER = "master"
+
+def track_node_name(track_idx):
+    return f"track{track_idx + 1}"
+
+def return_node_name(name):
+    return f"return:{name}"
+
+
+def _to_stereo(mono, vol, pan):
+    """Same linear pan law as the live Mixer (channel.set_volume)."""
+    out = np.empty((len(mono), 2), dtype=np.float32)
+    out[:, 0] = mono * (vol * (1.0 - pan))
+    out[:, 1] = mono * (vol * pan)
+    return out
+
+
+class Node:
+    """
+    One vertex of the RenderGraph. Every node outputs stereo (n, 2) float32.
+    'inputs' are (source node name, gain) pairs, summed before process().
+    """
+    def __init__(self, name):
+        self.name = name
+        self.inputs = []
+
+    def reset(self):
+        """Clears any state carried between blocks (called before a render)."""
+        pass
+
+    def process(self, block, start, n):
+        return block
+
+
+class TrackNode(Node):
+    """Plays a track's pre-Mixer loop (LoopCache / frozen audio) through its fader and pan."""
+    def __init__(self, name, loop, params, audible=True):
+        super().__init__(name)
+        self.loop = loop
+        self.vol = params.get("volume", 0.8) if audible else 0.0
+        self.pan = params.get("pan", 0.5)
+
+    def process(self, block, start, n):
+        if self.loop is None or self.vol <= 0:
+            return None
+        mono = self.loop[start:start + n]
+        if len(mono) < n:
+            mono = np.pad(mono, (0, n - len(mono)))
+        return _to_stereo(mono, self.vol, self.pan)
+
+
+class BusNode(Node):
+    """
+    Sums its inputs, runs an FX chain, then applies its own fader/pan.
+
+    FX plugins are whole-buffer and mono, so a bus works on L+R (with the
+    linear pan law that is exactly the post-fader mono send) and renders each
+    block with FX_TAIL_SECONDS of zero padding: the part that rings past the
+    block is carried into the next one (overlap-add, exact for linear FX).
+    A streamable chain (IIR only, e.g. an EQ) needs no padding: its filter
+    state is simply carried from block to block.
+    """
+    def __init__(self, name, chain, params=None, sample_rate=44100):
+        super().__init__(name)
+        params = params or {}
+        self.chain = chain  # CompiledChain
+        self.vol = 0.0 if params.get("mute") else params.get("volume", 1.0)
+        self.pan = params.get("pan", 0.5)
+        self.stateful = bool(chain) and chain.streamable
+        self.tail_len = int(FX_TAIL_SECONDS * sample_rate) if chain else 0
+        if self.stateful:
+            # No padding per block, so a long tail (convolution IR) costs only the flush
+            self.tail_len = max(self.tail_len, chain.tail_samples)
+        self._carry = None
+        self._state = None
+
+    def reset(self):
+        self._carry = None
+        self._state = self.chain.new_state() if self.stateful else None
+
+    def process(self, block, start, n):
+        if self.stateful:
+            return self._process_stateful(block, n)
+        if block is None and self._carry is None:
+            return None
+        mono = np.zeros(n + self.tail_len, dtype=np.float32)
+        if block is not None:
+            mono[:n] = block[:, 0] + block[:, 1]
+        if self.chain:
+            mono = self.chain.process(mono)
+
+        # Overlap-add: previous block's tail rings into this one
+        if self._carry is not None:
+            mono[:len(self._carry)] += self._carry
+        self._carry = mono[n:].copy() if self.tail_len else None
+        return _to_stereo(mono[:n], self.vol, self.pan)
+
+    def _process_stateful(self, block, n):
+        mono = np.zeros(n, dtype=np.float32)
+        if block is not None:
+            mono[:] = block[:, 0] + block[:, 1]
+        return _to_stereo(self.chain.process_block(mono, self._state), self.vol, self.pan)
+
+    def flush(self):
+        """Tail still ringing after the last block (wrapped onto a loop start)."""
+        if self.stateful:
+            # Let the filters ring out from their final state
+            tail = self.chain.process_block(np.zeros(self.tail_len, dtype=np.float32), self._state)
+            self._state = self.chain.new_state()
+            return _to_stereo(tail, self.vol, self.pan)
+        carry, self._carry = self._carry, None
+        return None if carry is None else _to_stereo(carry, self.vol, self.pan)
+
+
+class MasterNode(Node):
+    """Final sum. No processing (master FX would go here)."""
+    pass
+
+
+class RenderGraph:
+    """
+    The signal flow as an explicit graph: track nodes -> send/return buses
+    -> master. Nodes are evaluated block by block in topological order;
+    nodes of the same level do not depend on each other and run in parallel.
+    """
+    def __init__(self, block_size=GRAPH_BLOCK, workers=None):
+        self.nodes = {}
+        self.block_size = block_size
+        self.workers = workers or max(1, min(4, os.cpu_count() or 1))
+
+    # --- BUILDING ---
+    def add(self, node):
+        self.nodes[node.name] = node
+        return node
+
+    def connect(self, src, dst, gain=1.0):
+        if src not in self.nodes or dst not in self.nodes:
+            raise KeyError(f"Graph: cannot connect {src} -> {dst}")
+        if gain > 0:
+            self.nodes[dst].inputs.append((src, gain))
+
+    # --- SCHEDULING ---
+    def levels(self):
+        """
+        Kahn's topological sort, grouped by depth: every node of a level only
+        reads nodes from earlier levels. Raises ValueError on feedback loops.
+        """
+        pending = {name: {src for src, _ in node.inputs} for name, node in self.nodes.items()}
+        levels = []
+        done = set()
+        while pending:
+            ready = sorted(name for name, deps in pending.items() if deps <= done)
+            if not ready:
+                raise ValueError(f"Graph: feedback loop between {sorted(pending)}")
+            levels.append(ready)
+            done.update(ready)
+            for name in ready:
+                del pending[name]
+        return levels
+
+    # --- RENDERING ---
+    def _run_node(self, name, outputs, start, n):
+        node = self.nodes[name]
+        block = None
+        for src, gain in node.inputs:
+            signal = outputs.get(src)
+            if signal is None: continue
+            block = signal * gain if block is None else block + signal * gain
+        return node.process(block, start, n)
+
+    def render(self, length, outputs=(MASTER,), wrap=False):
+        """
+        Renders 'length' samples. Returns {node name: stereo float32 (length, 2)}
+        for the requested outputs. wrap=True treats the range as a loop: FX
+        tails ringing past the end are added back onto its start.
+        """
+        levels = self.levels()
+        for node in self.nodes.values():
+            node.reset()
+        result = {name: np.zeros((length, 2), dtype=np.float32) for name in outputs}
+
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="graph") as pool:
+            for start in range(0, length, self.block_size):
+                n = min(self.block_size, length - start)
+                block_out = {}
+                for level in levels:
+                    if len(level) == 1:
+                        block_out[level[0]] = self._run_node(level[0], block_out, start, n)
+                        continue
+                    futures = {name: pool.submit(self._run_node, name, block_out, start, n) for name in level}
+                    for name, future in futures.items():
+                        block_out[name] = future.result()
+                for name in outputs:
+                    if block_out.get(name) is not None:
+                        result[name][start:start + n] += block_out[name]
+
+        if wrap and length > 0:
+            self._wrap_tails(result, length)
+        return result
+
+    def _wrap_tails(self, result, length):
+        """Adds each bus's leftover tail onto the loop start of the outputs it reaches."""
+        for node in self.nodes.values():
+            if not isinstance(node, BusNode): continue
+            tail = node.flush()
+            if tail is None: continue
+            targets = [(node.name, 1.0)]
+            for dst in self.nodes.values():
+                # Plain sums only: a tail entering another bus would need its FX
+                if isinstance(dst, BusNode): continue
+                targets += [(dst.name, gain) for src, gain in dst.inputs if src == node.name]
+            for name, gain in targets:
+                if name not in result: continue
+                for lo in range(0, len(tail), length):
+                    piece = tail[lo:lo + length]
+                    result[name][:len(piece)] += piece * gain
+
+
+def build_song_graph(song, factory, loops, block_size=GRAPH_BLOCK):
+    """
+    The project's graph: one TrackNode per track (fed by 'loops', track idx
+    -> pre-Mixer mono loop), one BusNode per song return, and the master.
+    Track sends (params['sends'], post-fader) feed the returns.
+    """
+    graph = RenderGraph(block_size)
+    master = graph.add(MasterNode(MASTER))
+    solo_active = any(t.params.get("solo", False) for t in song.tracks)
+
+    for ret in song.returns:
+        chain = factory.get_chain(ret.get("effects", []))
+        name = return_node_name(ret["name"])
+        graph.add(BusNode(name, chain, ret.get("params"), factory.sample_rate))
+        graph.connect(name, master.name)
+
+    for idx, track in enumerate(song.tracks):
+        audible = not (track.params.get("mute") or (solo_active and not track.params.get("solo")))
+        name = track_node_name(idx)
+        graph.add(TrackNode(name, loops.get(idx), track.params, audible))
+        graph.connect(name, master.name)
+        for ret_name, level in track.params.get("sends", {}).items():
+            if return_node_name(ret_name) in graph.nodes:
+                graph.connect(name, return_node_name(ret_name), level)
+    return graph
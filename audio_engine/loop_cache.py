@@ -0,0 +1,353 @@
+# Blooper4/audio_engine/loop_cache.py
+import copy
+import json
+import threading
+import numpy as np
+from audio_engine.voice import render_voice
+from audio_engine.graph import build_song_graph, MASTER
+from audio_engine.fx_chain import chain_signature
+from audio_engine.tuning import track_tuning
+from audio_engine.voice_allocator import VoiceAllocator
+from models import Note
+from constants import TPQN, TICKS_PER_BAR
+
+class _TrackSnapshot:
+    """Frozen copy of the parts of a Track the renderer reads (thread-safe)."""
+    def __init__(self, track, pitches):
+        self.mode = track.mode
+        self.source_type = track.source_type
+        self.source_params = copy.deepcopy(track.source_params)
+        # Only the pads this segment actually plays
+        self.sampler_map = {p: track.sampler_map.snapshot(p) for p in pitches}
+        self.effects = copy.deepcopy(track.effects)
+        self.piano_roll_scale = track.piano_roll_scale
+        self.tuning = track.tuning
+
+
+def _sig(obj):
+    """Stable text fingerprint of a params structure."""
+    return json.dumps(obj, sort_keys=True, default=str)
+
+
+class LoopCache:
+    """
+    The pre-rendered song loop: one float32 buffer per track (pre-Mixer).
+
+    DIRTY TRACKING:
+    ---------------
+    Every track is cut into bars (TICKS_PER_BAR). A bar 'owns' every voice that
+    STARTS inside it, tails included, so a segment can be longer than one bar
+    (reverb/decay spilling forward). Each segment stores a signature built from
+    its notes + the source/pad params + the FX chain. Editing one hi-hat only
+    changes the signature of the bar(s) holding that pad's notes; those are
+    re-rendered and spliced back into the loop, everything else is reused.
+
+    VOICE MODES:
+    ------------
+    Choke groups and mono/legato are planned over the whole loop
+    (VoiceAllocator.plan) before bars are cut: each note carries the tick it
+    gets cut at and whether it plays legato. That is part of the bar's
+    signature, so an edit that changes who cuts whom re-renders both bars.
+
+    FREEZE:
+    -------
+    A track frozen at the cache's tempo, length and rate is never scanned
+    or rendered: its frozen_audio is used as the track loop, so the Mixer
+    and return sends are fed from the baked audio.
+
+    THREADING:
+    ----------
+    update() scans on the caller thread (cheap) and renders on a background
+    thread. Loops are swapped by reference, so anyone holding the old buffer
+    keeps playing it until the new one is ready.
+    """
+    def __init__(self, factory, sample_rate=None, voice_cache=None):
+        self.factory = factory
+        self.voice_cache = voice_cache
+        # The loop is built at the factory's render rate (44.1k, 48k, 96k...)
+        self.sample_rate = sample_rate or factory.sample_rate
+
+        self.bpm = None
+        self.length_ticks = None
+        self.loop_len = 0
+
+        self.track_loops = {}   # track_idx -> float32 [loop_len]
+        self._frozen = set()    # track indices whose loop is their frozen_audio
+        self.segments = {}      # (track_idx, bar) -> (signature, start_sample, float32 buffer)
+
+        self._lock = threading.Lock()
+        self._worker = None
+        self.stats = {"bars_rendered": 0, "bars_reused": 0}
+
+    # --- TIMING ---
+    def tick_to_sample(self, tick, bpm):
+        return int(round(tick * 60.0 / (bpm * TPQN) * self.sample_rate))
+
+    # --- PUBLIC API ---
+    @property
+    def is_busy(self):
+        return self._worker is not None and self._worker.is_alive()
+
+    def update(self, song):
+        """
+        Non-blocking refresh. Scans for dirty bars and renders them in the
+        background. Returns the set of track indices being re-rendered (empty:
+        every loop is current), or None if a previous render is still running
+        (nothing was scanned).
+        """
+        if self.is_busy:
+            return None
+        jobs = self._collect_jobs(song)
+        if not jobs:
+            return set()
+        self._worker = threading.Thread(target=self._run_jobs, args=(jobs,), daemon=True)
+        self._worker.start()
+        return {job[0] for job in jobs}
+
+    def render(self, song, tracks=None):
+        """
+        Blocking refresh (offline use). 'tracks' optionally limits the scan to
+        some track indices. Returns the number of bars re-rendered.
+        """
+        self.wait()
+        jobs = self._collect_jobs(song, tracks)
+        self._run_jobs(jobs)
+        return len(jobs)
+
+    def wait(self):
+        """Blocks until the background render (if any) has been spliced in."""
+        if self._worker is not None:
+            self._worker.join()
+            self._worker = None
+
+    def get_track_loop(self, track_idx):
+        """The current pre-Mixer loop for a track (or None if nothing rendered)."""
+        with self._lock:
+            return self.track_loops.get(track_idx)
+
+    def get_loops(self):
+        """Every complete track loop: {track_idx: float32 [loop_len]}."""
+        with self._lock:
+            return {i: l for i, l in self.track_loops.items() if len(l) == self.loop_len}
+
+    def mix(self, song):
+        """
+        Runs the cached loops through the song's RenderGraph (Mixer, sends,
+        return buses). Returns the master as float32 stereo (loop_len, 2).
+        """
+        return self.render_graph(song)[MASTER]
+
+    def render_graph(self, song, outputs=(MASTER,)):
+        """One loop pass of any graph nodes (FX tails wrap onto the loop start)."""
+        graph = build_song_graph(song, self.factory, self.get_loops())
+        return graph.render(self.loop_len, outputs, wrap=True)
+
+    # --- DIRTY SCAN (caller thread) ---
+    def _collect_jobs(self, song, tracks=None):
+        loop_len = self.tick_to_sample(song.length_ticks, song.bpm)
+
+        # Tempo or loop length changed: every sample moved, start over
+        if song.bpm != self.bpm or song.length_ticks != self.length_ticks:
+            with self._lock:
+                self.bpm, self.length_ticks, self.loop_len = song.bpm, song.length_ticks, loop_len
+                self.segments = {}
+                self.track_loops = {}
+                self._frozen = set()
+
+        jobs = []
+        for idx, track in enumerate(song.tracks):
+            if tracks is not None and idx not in tracks: continue
+            # Frozen tracks never synthesize: their baked loop stands in (FREEZE)
+            frozen = self._frozen_loop(track, song)
+            with self._lock:
+                if frozen is not None:
+                    self.track_loops[idx] = frozen
+                    self.segments = {k: v for k, v in self.segments.items() if k[0] != idx}
+                    self._frozen.add(idx)
+                    continue
+                if idx in self._frozen:
+                    # Unfrozen: rebuild from silence, not on top of the baked audio
+                    self._frozen.discard(idx)
+                    self.track_loops.pop(idx, None)
+            # Group the notes that will actually trigger by the bar they start in,
+            # each with its voice-mode cut (see VOICE MODES)
+            played = [n for n in track.notes if 0 <= n.tick < song.length_ticks]
+            bars = {}
+            for n, (cut, legato) in zip(played, self._plan_voices(track, played, song.length_ticks)):
+                bars.setdefault(n.tick // TICKS_PER_BAR, []).append(
+                    (n.tick, n.pitch, n.duration, n.velocity, cut, legato))
+
+            sigs = {}  # Source/pad/FX fingerprints of this track, computed once
+            for bar, notes in bars.items():
+                signature = self._bar_signature(track, notes, sigs)
+                old = self.segments.get((idx, bar))
+                if old and old[0] == signature:
+                    self.stats["bars_reused"] += 1
+                    continue
+                snapshot = _TrackSnapshot(track, {n[1] for n in notes})
+                jobs.append((idx, bar, signature, snapshot, notes, song.bpm))
+
+            # Bars that lost all their notes must be cleared too
+            for (t_idx, bar) in list(self.segments.keys()):
+                if t_idx == idx and bar not in bars:
+                    jobs.append((idx, bar, None, None, [], song.bpm))
+        return jobs
+
+    def _frozen_loop(self, track, song):
+        """The track's baked loop if it is frozen at this tempo, length and rate (else None)."""
+        info = track.freeze_info
+        if not (track.frozen and track.frozen_audio is not None and info):
+            return None
+        if (info["bpm"], info["length_ticks"], info["sample_rate"]) != (song.bpm, song.length_ticks, self.sample_rate):
+            return None   # Stale bake: the track plays (and renders) live, like AudioManager.is_frozen()
+        return track.frozen_audio
+
+    @staticmethod
+    def _plan_voices(track, notes, length_ticks):
+        """((cut_tick, fade_ms) or None, legato) per note: the live choke/mono rules over one loop."""
+        chokes = {}
+        if track.mode == "SAMPLER":
+            for p in {n.pitch for n in notes}:
+                pad = track.sampler_map.get(p)
+                chokes[p] = pad.get("choke", 0) if pad else 0
+        return VoiceAllocator.plan(track.mode, track.params.get("voice_mode", "POLY"),
+                                   [(n.tick, n.pitch, n.duration, chokes.get(n.pitch, 0)) for n in notes],
+                                   length_ticks)
+
+    def _bar_signature(self, track, notes, sigs):
+        """
+        What a bar sounds like: its notes + the source/pad params + the FX
+        chain. Works on a Track or a _TrackSnapshot; 'sigs' memoizes the
+        per-track parts across the bars of one scan.
+        """
+        if "fx" not in sigs:
+            sigs["fx"] = chain_signature(track.effects, self.factory)
+            sigs["tuning"] = track_tuning(track)
+        tuning = sigs["tuning"]
+        if track.mode == "SYNTH":
+            if "source" not in sigs:
+                sigs["source"] = self._source_sig(track.source_type, track.source_params, tuning)
+            sound_sig = sigs["source"]
+        else:
+            pitches = sorted({n[1] for n in notes})
+            for p in pitches:
+                if p not in sigs:
+                    pad = track.sampler_map.get(p)
+                    sigs[p] = self._source_sig(pad["engine"], pad["params"], pad.get("choke", 0),
+                                               pad.get("one_shot"), tuning) if pad else "null"
+            sound_sig = "|".join(sigs[p] for p in pitches)
+        return (track.mode, sound_sig, sigs["fx"], tuple(notes))
+
+    def _source_sig(self, engine_id, params, *extra):
+        """Source fingerprint from the params the plugin reads (all of them until known)."""
+        if self.voice_cache is not None:
+            deps = self.voice_cache.deps.get(engine_id, self.factory.get_plugin_hash(engine_id))
+            params = self.voice_cache.deps.project(params, deps)
+        return _sig([engine_id, params, *extra])
+
+    # --- RENDER + SPLICE (worker thread) ---
+    def _run_jobs(self, jobs):
+        # Track by track: all of a track's dirty bars are spliced with one loop copy
+        by_track = {}
+        for job in jobs:
+            by_track.setdefault(job[0], []).append(job)
+        for idx, track_jobs in by_track.items():
+            changes = []
+            for _, bar, signature, snapshot, notes, bpm in track_jobs:
+                if signature is None:
+                    changes.append((bar, None))
+                    continue
+                segment = self._render_segment(snapshot, bar, notes, bpm)
+                # The render recorded which params the plugins read: store the
+                # projected signature the next scan computes, not the full-params
+                # one (else every bar would re-render once for nothing)
+                signature = self._bar_signature(snapshot, notes, {})
+                changes.append((bar, (signature, ) + segment))
+                self.stats["bars_rendered"] += 1
+            self._splice(idx, changes)
+
+    def _render_segment(self, snapshot, bar, notes, bpm):
+        """Renders every voice starting in 'bar' into one buffer (with tails)."""
+        bar_start = self.tick_to_sample(bar * TICKS_PER_BAR, bpm)
+        voices = []
+        for tick, pitch, duration, velocity, cut, legato in notes:
+            # Legato notes skip their attack, like live (see VoiceAllocator)
+            buf = render_voice(self.factory, snapshot, Note(tick, pitch, duration, velocity), bpm, self.voice_cache,
+                               {"attack": 0.0} if legato else None)
+            if buf is None: continue
+            # Match the live path: clip per voice, then scale by velocity
+            voice = np.clip(buf, -1.0, 1.0).astype(np.float32) * (velocity / 127.0)
+            start = self.tick_to_sample(tick, bpm)
+            if cut is not None:
+                # Cut by a later note: fade out from there, like a released Channel
+                cut_tick, fade_ms = cut
+                keep = self.tick_to_sample(cut_tick, bpm) - start
+                fade = max(1, int(fade_ms * self.sample_rate / 1000))
+                if keep < len(voice):
+                    voice = voice[:keep + fade]
+                    ramp = voice[keep:]
+                    ramp *= np.linspace(1.0, 0.0, fade, endpoint=False, dtype=np.float32)[:len(ramp)]
+            voices.append((start - bar_start, voice))
+
+        seg_len = max((off + len(v) for off, v in voices), default=0)
+        segment = np.zeros(seg_len, dtype=np.float32)
+        for off, v in voices:
+            segment[off:off + len(v)] += v
+        return bar_start, segment
+
+    def _splice(self, idx, changes):
+        """
+        Swaps a track's changed segments ([(bar, segment or None)]) and re-sums
+        only the loop ranges they cover, in one copy of the loop.
+        """
+        with self._lock:
+            # Affected loop ranges = old spans U new spans
+            L = self.loop_len
+            dirty = []
+            for bar, new_segment in changes:
+                old_segment = self.segments.pop((idx, bar), None)
+                if new_segment is not None:
+                    self.segments[(idx, bar)] = new_segment
+                for seg in (old_segment, new_segment):
+                    if seg is not None and L > 0:
+                        dirty += [(lo, hi) for lo, hi, _ in self._pieces(seg[1], len(seg[2]), L)]
+            if L <= 0: return
+
+            loop = self.track_loops.get(idx)
+            loop = np.zeros(L, dtype=np.float32) if loop is None else loop.copy()
+            dirty = self._merge(dirty)
+            for lo, hi in dirty:
+                loop[lo:hi] = 0.0
+
+            # Rebuild those ranges from every segment of this track
+            for (t_idx, _), (_, start, buf) in self.segments.items():
+                if t_idx != idx: continue
+                for lo, hi, off in self._pieces(start, len(buf), L):
+                    for d_lo, d_hi in dirty:
+                        a, b = max(lo, d_lo), min(hi, d_hi)
+                        if a < b:
+                            loop[a:b] += buf[off + (a - lo):off + (b - lo)]
+
+            self.track_loops[idx] = loop
+
+    @staticmethod
+    def _merge(ranges):
+        """Collapses overlapping (lo, hi) ranges so nothing is summed twice."""
+        merged = []
+        for lo, hi in sorted(ranges):
+            if merged and lo <= merged[-1][1]:
+                merged[-1] = (merged[-1][0], max(merged[-1][1], hi))
+            else:
+                merged.append((lo, hi))
+        return merged
+
+    @staticmethod
+    def _pieces(start, length, L):
+        """Splits a (possibly wrapping) span into in-loop pieces: (lo, hi, buffer_offset)."""
+        pieces, offset, pos = [], 0, start % L
+        while offset < length:
+            n = min(L - pos, length - offset)
+            pieces.append((pos, pos + n, offset))
+            offset += n
+            pos = 0
+        return pieces
@@ -3,7 +3,18 @@ import pygame
 import numpy as np
 from audio_engine.bridge import CPPSynthBridge
 from audio_engine.plugin_factory import PluginFactory
-from constants import SAMPLE_RATE, NUM_TRACKS, TPQN
+from audio_engine.voice import render_voice, stream_voice, resample
+from audio_engine.loop_cache import LoopCache, _sig
+from audio_engine.voice_cache import VoiceCache
+from audio_engine.prewarm import CachePrewarmer
+from audio_engine.voice_allocator import VoiceAllocator
+from audio_engine.graph import return_node_name
+from utils import freeze_store, wav_export
+from constants import SAMPLE_RATE, TPQN, RENDER_QUALITIES, DEFAULT_QUALITY
+
+# Allocator 'track' used by the live return buses
+RETURN_TRACK = -1
+
 
 class AudioManager:
     """
@@ -14,14 +25,42 @@ class AudioManager:
         self.current_song_ref = song_ref
         self.bridge = CPPSynthBridge(SAMPLE_RATE)
         
-        # Every track gets a list of (pygame.Channel, original_note_velocity)
-        self.active_channels = {i: [] for i in range(NUM_TRACKS)}
+        # Owns every pygame Channel: per-track limits, stealing, polyphony growth
+        self.voices = VoiceAllocator()
         
         # 4.0 Plugin Loader: Translates strings in the model to logic objects
-        self.factory = PluginFactory(self.bridge)
+        # One loader (and bridge) per internal render rate: sample_rate -> PluginFactory
+        self._factories = {SAMPLE_RATE: PluginFactory(self.bridge)}
+        self.quality = DEFAULT_QUALITY
+        self.factory = self.get_factory(RENDER_QUALITIES[self.quality])
+
+        # Persistent voice cache: identical (engine, params, pitch) render once, ever
+        self.voice_cache = VoiceCache()
+
+        # Renders a freshly loaded project's voices in the background
+        self.prewarmer = CachePrewarmer(self.factory, self.voice_cache)
+
+        # Pre-rendered loop (offline path). Re-renders only the bars you edit.
+        # Always full quality: it is what frozen tracks are baked from.
+        self.loop_cache = LoopCache(self.get_factory(SAMPLE_RATE), voice_cache=self.voice_cache)
         
-        # High polyphony for dense MIDI handling
-        pygame.mixer.set_num_channels(64)
+        # Frozen tracks: track_idx -> (frozen_audio, pygame.Sound of a full pass)
+        self._frozen_sounds = {}
+
+        # Transport playback from the LoopCache: track_idx -> Voice playing its
+        # cached loop this pass, and track_idx -> (loop, pygame.Sound)
+        self._cached_voices = {}
+        self._loop_sounds = {}
+
+        # Output format of the opened device: float32 skips the int16 conversion
+        mixer_init = pygame.mixer.get_init()
+        self.float_output = bool(mixer_init) and abs(mixer_init[1]) == 32
+
+        # Live return buses: (signature, stereo loop, pygame.Sound)
+        self._returns_audio = None
+
+        # Long notes playing block by block: [Voice, blocks, gain, playing Sound, queued Sound]
+        self._streams = []
 
     def play_note(self, track_idx, track_model, note_model, bpm):
         # 0. PRE-GATE (Solo/Mute check)
@@ -29,62 +68,339 @@ class AudioManager:
         if track_model.params.get("mute") or (solo_active and not track_model.params.get("solo")):
             return 
 
-        # --- 4.1 WORKSTATION ROUTING ---
-        if track_model.mode == "SYNTH":
-            # Simple track: Use the track's global source
-            engine_id = track_model.source_type
-            source_params = track_model.source_params
-        else:
-            # Sampler track: Find the specific engine assigned to this MIDI pitch
-            pad_config = track_model.sampler_map.get(note_model.pitch)
-            if not pad_config: return
-            engine_id = pad_config["engine"]
-            source_params = pad_config["params"]
-
-        # 1. GENERATE SOURCE (Generic)
-        source = self.factory.get_source(engine_id)
-        if not source: return
-        
-        # New 4.1 Contract: Plugins must accept a raw params dict
-        buffer = source.generate_modular(source_params, note_model, bpm)
-
-        # 2. MODULAR FX LOOP (Processed track-wide after the source)
-        for fx in track_model.effects:
-            if fx["active"]:
-                processor = self.factory.get_effect(fx["type"])
-                if processor:
-                    buffer = processor.process(buffer, fx["params"])
-
-        # 3. CONVERSION & MIXER APPLICATION
         # Pull Mixer-level params
         track_vol = track_model.params.get("volume", 0.8)
         note_vol_scalar = note_model.velocity / 127.0
         final_gain = track_vol * note_vol_scalar
         pan = track_model.params.get("pan", 0.5)
 
-        # Convert float32 buffer to 16-bit stereo PCM
-        pcm_data = (np.clip(buffer, -1.0, 1.0) * 32767 * final_gain).astype(np.int16)
-        stereo_pcm = np.ascontiguousarray(np.stack((pcm_data, pcm_data), axis=-1))
-        sound = pygame.sndarray.make_sound(stereo_pcm)
+        # 0b. VOICE MODES: choke groups / mono cut what this note replaces
+        choke, overrides = self._cut_replaced_voices(track_idx, track_model, note_model)
 
-        # 4. CHANNEL ASSIGNMENT
-        channel = pygame.mixer.find_channel(True) # Force-find if necessary
-        if channel:
+        # 1-2. SOURCE + MODULAR FX (shared with the offline LoopCache)
+        # Long notes are streamed: only the first block is rendered now,
+        # the rest is generated by update() just ahead of the playhead.
+        blocks = None
+        if self.factory.sample_rate == SAMPLE_RATE:
+            blocks = stream_voice(self.factory, track_model, note_model, bpm, self.voice_cache, overrides)
+        if blocks is not None:
+            buffer = next(blocks, None)
+        else:
+            buffer = render_voice(self.factory, track_model, note_model, bpm, self.voice_cache, overrides)
+            # DRAFT: rendered at the internal rate, resampled once for the device
+            buffer = resample(buffer, self.factory.sample_rate, SAMPLE_RATE)
+        if buffer is None: return
+
+        # 3. CONVERSION & MIXER APPLICATION
+        sound = self._to_sound(buffer, final_gain)
+
+        # 4. VOICE ALLOCATION (may steal an old voice, or drop this one)
+        # The allocator keeps the voice for real-time update() calls (faders/mute/solo)
+        length = note_model.duration * 60.0 / (bpm * TPQN)
+        voice = self.voices.allocate(track_idx, note_model.pitch, amplitude=final_gain, note_vol=note_vol_scalar,
+                                     length=length, limit=track_model.params.get("max_voices"), choke=choke)
+        if voice:
             # Applying volume/pan hardware-side for smooth real-time fader response
-            channel.set_volume(final_gain * (1.0 - pan), final_gain * pan)
-            channel.play(sound)
-            
-            # Record this channel for real-time update() calls (faders/mute/solo)
-            self.active_channels[track_idx].append((channel, note_vol_scalar))
+            voice.channel.set_volume(final_gain * (1.0 - pan), final_gain * pan)
+            voice.channel.play(sound)
+            if blocks is not None:
+                self._streams.append([voice, blocks, final_gain, sound, None])
+                self._pump_stream(self._streams[-1])
+        elif blocks is not None:
+            blocks.close()
+
+    def _cut_replaced_voices(self, track_idx, track_model, note_model):
+        """
+        Applies choke groups (SAMPLER pads) and the track's voice_mode (the
+        rules live in VoiceAllocator, shared with offline renders).
+        Returns (choke_group, source param overrides) for the new note.
+        """
+        choke = 0
+        if track_model.mode == "SAMPLER":
+            pad = track_model.sampler_map.get(note_model.pitch) or {}
+            choke = pad.get("choke", 0)
+        mode = track_model.params.get("voice_mode", "POLY")
+        # Legato: overlapping note crossfades and skips the attack (no re-articulation)
+        if self.voices.cut_replaced(track_idx, track_model.mode, mode, note_model.pitch, choke):
+            return choke, {"attack": 0.0}
+        return choke, None
+
+    def _to_sound(self, buffer, gain):
+        """
+        Converts a float32 mono voice (or a stereo (n, 2) loop) to a pygame Sound.
+        The interleaved array is the only allocation: the voice is clipped and
+        scaled straight into its left column, then copied to the right one.
+        Pan/volume stay on the Channel (applied by the mixer at play time).
+        """
+        n = len(buffer)
+        if np.ndim(buffer) == 2:
+            stereo = np.clip(buffer, -1.0, 1.0) * gain
+            if not self.float_output:
+                stereo = (stereo * 32767).astype(np.int16)
+            return pygame.sndarray.make_sound(np.ascontiguousarray(stereo))
+        if self.float_output:
+            stereo = np.empty((n, 2), dtype=np.float32)
+            left = stereo[:, 0]
+            np.clip(buffer, -1.0, 1.0, out=left)
+            left *= gain
+        else:
+            # 16-bit device: one float scratch buffer for the scaling
+            stereo = np.empty((n, 2), dtype=np.int16)
+            left = stereo[:, 0]
+            left[:] = np.clip(buffer, -1.0, 1.0) * (32767 * gain)
+        stereo[:, 1] = left
+        return pygame.sndarray.make_sound(stereo)
+
+    # --- BLOCK STREAMING ---
+    def _pump_stream(self, stream):
+        """
+        Keeps one block queued behind the playing one.
+        Returns False once the stream is finished (or its channel was stolen).
+        """
+        voice, blocks, gain, playing, queued = stream
+        channel = voice.channel
+        if not voice.is_playing() or channel.get_sound() not in (playing, queued):
+            blocks.close()
+            return False
+        if channel.get_queue() is not None:
+            return True  # Next block still waiting its turn
+
+        # The queued block (if any) is now the one playing
+        if queued is not None:
+            stream[3] = queued
+        block = next(blocks, None)
+        if block is None:
+            stream[4] = None
+            return False
+        stream[4] = self._to_sound(block, gain)
+        channel.queue(stream[4])
+        return True
+
+    def _pump_streams(self):
+        self._streams = [s for s in self._streams if self._pump_stream(s)]
+
+    def _close_streams(self):
+        for stream in self._streams:
+            stream[1].close()
+        self._streams = []
+
+    # --- RENDER QUALITY ---
+    def get_factory(self, sample_rate):
+        """Returns the PluginFactory rendering at 'sample_rate' (created on first use)."""
+        if sample_rate not in self._factories:
+            self._factories[sample_rate] = PluginFactory(CPPSynthBridge(sample_rate))
+        return self._factories[sample_rate]
+
+    def set_quality(self, quality):
+        """
+        Switches live synthesis between RENDER_QUALITIES ("DRAFT" = half rate).
+        Frozen tracks and offline renders are not affected.
+        """
+        if quality not in RENDER_QUALITIES:
+            print(f"ERROR: Unknown render quality '{quality}'.")
+            return
+        self.quality = quality
+        self.factory = self.get_factory(RENDER_QUALITIES[quality])
+        self.prewarmer.factory = self.factory
+        print(f"Render quality: {quality} ({self.factory.sample_rate} Hz internal)")
+
+    def toggle_quality(self):
+        self.set_quality("HIGH" if self.quality == "DRAFT" else "DRAFT")
+        return self.quality
+
+    def render_offline(self, song, sample_rate=SAMPLE_RATE):
+        """
+        Full-quality bounce of one loop pass (Mixer applied) at any rate,
+        e.g. 48k/96k for a final export. Returns float32 (samples, 2).
+        """
+        if sample_rate == SAMPLE_RATE:
+            cache = self.loop_cache
+        else:
+            cache = LoopCache(self.get_factory(sample_rate), voice_cache=self.voice_cache)
+        cache.render(song)
+        return cache.mix(song)
+
+    def export_wav(self, song, path, sample_rate=SAMPLE_RATE):
+        """Bounces the song loop to a 16-bit stereo WAV file."""
+        return wav_export.write_wav(path, self.render_offline(song, sample_rate), sample_rate)
+
+    def prewarm(self, song):
+        """Starts filling the VoiceCache for 'song' (non-blocking)."""
+        return self.prewarmer.start(song)
+
+    # --- TRACK FREEZE ---
+    def toggle_freeze(self, track_idx, song):
+        track = song.tracks[track_idx]
+        if track.frozen:
+            self.unfreeze_track(track_idx, song)
+        else:
+            self.freeze_track(track_idx, song)
+
+    def freeze_track(self, track_idx, song):
+        """
+        Bakes one loop pass of the track (Source -> FX, pre-Mixer) to float32.
+        While frozen, the track skips generate_modular/process entirely.
+        """
+        track = song.tracks[track_idx]
+        self.loop_cache.render(song, tracks=[track_idx])
+        loop = self.loop_cache.get_track_loop(track_idx)
+        if loop is None:
+            # Nothing to bake (no notes): still freeze, as silence
+            loop = np.zeros(self.loop_cache.loop_len, dtype=np.float32)
+
+        track.frozen = True
+        track.frozen_audio = loop
+        track.freeze_info = {"bpm": song.bpm, "length_ticks": song.length_ticks, "sample_rate": SAMPLE_RATE}
+        if song.file_path:
+            freeze_store.write_sidecar(song.file_path, track)
+        song.is_dirty = True
+        print(f"Track {track.channel} frozen ({len(loop)} samples).")
+
+    def unfreeze_track(self, track_idx, song):
+        """Drops the baked audio and returns the track to live synthesis."""
+        track = song.tracks[track_idx]
+        self._stop_track(track_idx)
+        track.frozen = False
+        track.freeze_info = None
+        track.frozen_audio = None
+        self._frozen_sounds.pop(track_idx, None)
+        if song.file_path:
+            freeze_store.remove_sidecar(song.file_path, track)
+        song.is_dirty = True
+
+    def is_frozen(self, track, song):
+        """True only if the baked audio still matches the song's tempo/length."""
+        info = track.freeze_info
+        return bool(track.frozen and track.frozen_audio is not None and info
+                    and info["bpm"] == song.bpm and info["length_ticks"] == song.length_ticks
+                    and info["sample_rate"] == SAMPLE_RATE)
+
+    def play_frozen(self, track_idx, track_model, start_tick, bpm):
+        """Plays the baked loop from 'start_tick' (called at every loop start)."""
+        solo_active = any(t.params.get("solo", False) for t in self.current_song_ref.tracks)
+        if track_model.params.get("mute") or (solo_active and not track_model.params.get("solo")):
+            return
+        self._play_loop(track_idx, track_model, track_model.frozen_audio, start_tick, bpm, self._frozen_sounds)
+
+    def _play_loop(self, track_idx, track_model, audio, start_tick, bpm, sounds):
+        """Plays a pre-Mixer track loop from 'start_tick' on one Channel. Returns the Voice."""
+        offset = self.loop_cache.tick_to_sample(start_tick, bpm)
+        cached = sounds.get(track_idx)
+        if offset == 0 and cached and cached[0] is audio:
+            # Full passes reuse the same Sound: no conversion per loop
+            sound = cached[1]
+        else:
+            sound = self._to_sound(audio[offset:], 1.0)
+            if offset == 0:
+                sounds[track_idx] = (audio, sound)
+
+        track_vol = track_model.params.get("volume", 0.8)
+        pan = track_model.params.get("pan", 0.5)
+        voice = self.voices.allocate(track_idx, None, amplitude=track_vol, length=len(audio) / SAMPLE_RATE)
+        if voice:
+            voice.channel.set_volume(track_vol * (1.0 - pan), track_vol * pan)
+            voice.channel.play(sound)
+        return voice
+
+    # --- TRANSPORT PLAYBACK FROM THE LOOP CACHE ---
+    def start_pass(self, song, start_tick):
+        """
+        Called at every loop start (and when the transport starts). Refreshes
+        the LoopCache: only the bars edited since the last pass re-render, in
+        the background. Every track whose cached loop is current plays it as
+        one Sound (like a frozen track) and skips per-note synthesis; tracks
+        still re-rendering play note by note this pass. Then the returns.
+        """
+        self._cached_voices = {}
+        cache = self.loop_cache
+        dirty = cache.update(song)
+        if dirty is not None and cache.bpm == song.bpm and cache.length_ticks == song.length_ticks:
+            solo_active = any(t.params.get("solo", False) for t in song.tracks)
+            loops = cache.get_loops()
+            for idx, track in enumerate(song.tracks):
+                if idx in dirty or idx not in loops or self.is_frozen(track, song) or not track.notes:
+                    continue
+                if track.params.get("mute") or (solo_active and not track.params.get("solo")):
+                    continue
+                voice = self._play_loop(idx, track, loops[idx], start_tick, song.bpm, self._loop_sounds)
+                if voice:
+                    self._cached_voices[idx] = voice
+        self.play_returns(song, start_tick, refresh=False)
+
+    def plays_cached(self, track_idx):
+        """True while the track's cached loop covers this pass (its notes must not be triggered)."""
+        return track_idx in self._cached_voices
+
+    def update_loop_levels(self, song):
+        """A Mixer move mid-pass: the cached loops' Channels follow it (mute/solo stop them)."""
+        solo_active = any(t.params.get("solo", False) for t in song.tracks)
+        for idx, voice in self._cached_voices.items():
+            track = song.tracks[idx]
+            if track.params.get("mute") or (solo_active and not track.params.get("solo")):
+                self.voices.release(voice)
+                continue
+            track_vol = track.params.get("volume", 0.8)
+            pan = track.params.get("pan", 0.5)
+            voice.channel.set_volume(track_vol * (1.0 - pan), track_vol * pan)
+
+    def release_cached(self, track_idx):
+        """
+        The track was edited mid-pass: its cached loop is stale. It stops, and
+        the rest of the pass plays note by note (the next pass re-renders it).
+        """
+        voice = self._cached_voices.pop(track_idx, None)
+        if voice is not None and not voice.released:
+            self.voices.release(voice)
+
+    # --- SEND / RETURN BUSES (live) ---
+    def play_returns(self, song, start_tick, refresh=True):
+        """
+        Plays the song's return buses from 'start_tick' (called at every loop start).
+        The RenderGraph renders them from the LoopCache: one shared reverb for
+        every track that sends to it. The cache is refreshed in the background
+        (refresh=False: start_pass() just did), so edits reach the returns on a
+        following pass.
+        """
+        if not any(level > 0 for t in song.tracks for level in t.params.get("sends", {}).values()):
+            return
+        cache = self.loop_cache
+        if refresh:
+            cache.update(song)
+        if cache.is_busy or cache.bpm != song.bpm or cache.length_ticks != song.length_ticks:
+            return
+
+        loops = cache.get_loops()
+        loops_sig = tuple(id(loops.get(i)) for i in range(len(song.tracks)))
+        mixer_sig = _sig([[t.params for t in song.tracks], song.returns])
+        signature = (loops_sig, mixer_sig)
+        if self._returns_audio is None or self._returns_audio[0] != signature:
+            names = [return_node_name(r["name"]) for r in song.returns]
+            outputs = cache.render_graph(song, outputs=names)
+            stereo = sum(outputs.values()) if outputs else None
+            if stereo is None: return
+            self._returns_audio = (signature, stereo, self._to_sound(stereo, 1.0))
+
+        _, stereo, full_sound = self._returns_audio
+        offset = cache.tick_to_sample(start_tick, song.bpm)
+        sound = full_sound if offset == 0 else self._to_sound(stereo[offset:], 1.0)
+        voice = self.voices.allocate(RETURN_TRACK, None, length=len(stereo) / SAMPLE_RATE)
+        if voice:
+            voice.channel.set_volume(1.0, 1.0)
+            voice.channel.play(sound)
+
+    def _stop_track(self, track_idx):
+        self.voices.stop_track(track_idx)
 
     def update(self, song_model):
         """Processes real-time Mixer changes (Faders, Pans, Mutes)."""
+        # Generate the next block of every long note before its queue runs dry
+        self._pump_streams()
+
+        # Clean up voices that finished playing
+        self.voices.prune()
         solo_active = any(t.params.get("solo", False) for t in song_model.tracks)
         
         for i, track in enumerate(song_model.tracks):
-            # Clean up voices that finished playing
-            self.active_channels[i] = [(ch, nv) for ch, nv in self.active_channels[i] if ch.get_busy()]
-            
             # Calculate current 'Audibility'
             is_muted = track.params.get("mute", False)
             is_solo_muted = solo_active and not track.params.get("solo", False)
@@ -94,21 +410,24 @@ class AudioManager:
             pan = track.params.get("pan", 0.5)
 
             # Update every active voice for this track (allows moving faders mid-note)
-            for channel, note_vol_scalar in self.active_channels[i]:
-                v = mixer_vol * note_vol_scalar
-                channel.set_volume(v * (1.0 - pan), v * pan)
+            for voice in self.voices.voices(i):
+                v = mixer_vol * voice.note_vol
+                voice.channel.set_volume(v * (1.0 - pan), v * pan)
                 
                 # If muted, kill the channel instantly (stops buffer bleed)
                 if mixer_vol <= 0:
-                    channel.stop()
+                    self.voices.release(voice, fade_ms=0)
 
     def stop_all(self):
         """Instantly kills all active voices."""
-        for track_idx in self.active_channels:
-            for channel, _ in self.active_channels[track_idx]:
-                channel.stop()
-            self.active_channels[track_idx] = []
+        self._close_streams()
+        self._cached_voices = {}
+        self.voices.stop_all()
             
     def cleanup(self):
         """Final shutdown of C++ bridge."""
-        self.bridge.cleanup()
\ No newline at end of file
+        self._close_streams()
+        self.prewarmer.shutdown()
+        self.loop_cache.wait()
+        for factory in self._factories.values():
+            factory.bridge.cleanup()
\ No newline at end of file
@@ -0,0 +1,291 @@
+# Blooper4/audio_engine/params.py
+import json
+import os
+import threading
+from constants import DEFAULT_TUNING
+
+class Param:
+    """
+    One plugin parameter: its save-file key, type, range and default.
+    kind: float / int / str ('choices' lists the legal strings) / list.
+    """
+    def __init__(self, name, kind=float, default=0.0, lo=None, hi=None, choices=None):
+        self.name = name
+        self.kind = kind
+        self.default = default
+        self.lo = lo
+        self.hi = hi
+        self.choices = choices
+
+    def coerce(self, value):
+        """Save-file value -> typed, in-range value (bad values fall back to the default)."""
+        if value is None:
+            return self.default
+        if self.choices is not None:
+            return value if value in self.choices else self.default
+        if self.kind in (float, int):
+            try:
+                value = float(value)
+            except (TypeError, ValueError):
+                return self.default
+            if self.lo is not None: value = max(self.lo, value)
+            if self.hi is not None: value = min(self.hi, value)
+            return int(round(value)) if self.kind is int else value
+        return value
+
+
+class ParamStruct:
+    """
+    Base of the generated structs: fixed attributes (__slots__), no dict lookups.
+    The schema hands out one struct per set of values, so a struct (compared
+    by identity) is a valid cache key for everything it holds.
+    """
+    __slots__ = ()
+
+    def __repr__(self):
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"{type(self).__name__}({fields})"
+
+
+def _freeze(value):
+    """Hashable version of a param value (wavetables are lists)."""
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+class ParamSchema:
+    """
+    A plugin's parameters, declared once (Processor.SCHEMA).
+
+    COMPILING:
+    ----------
+    compile(params, sample_rate) turns a params dict into a __slots__ struct
+    holding every declared value (typed, clamped, defaulted) plus the
+    'derived' ones (pitch offsets, filter coefficients...) returned by
+    derive(struct, sample_rate). Structs are cached by the param values,
+    so derivations run once per edit, not once per note.
+
+    RECORDING:
+    ----------
+    Given a RecordingParams, the cache key is built from the raw dict (nothing
+    recorded) and the struct comes back wrapped: only the values the plugin
+    then reads are filed as dependencies. A derived value counts as every
+    param derive() reads. Reads must happen during the plugin call, like
+    reads of the dict itself.
+
+    The schema is also the single source of defaults() (new pads / old save
+    files) and of UI ranges (schema["filter_cutoff"].lo / .hi).
+    """
+    MAX_CACHED = 512
+
+    def __init__(self, name, params, derived=(), derive=None):
+        self.params = list(params)
+        self.by_name = {p.name: p for p in self.params}
+        self.derive = derive
+        slots = tuple(p.name for p in self.params) + tuple(derived)
+        self.struct_class = type(f"{name}Params", (ParamStruct,), {"__slots__": slots})
+        self._cache = {}
+        self._lock = threading.Lock()
+        self._derive_reads = frozenset()  # Params derive() has read (see RECORDING)
+
+    def __getitem__(self, name):
+        return self.by_name[name]
+
+    def defaults(self):
+        """A fresh params dict with every default (lists copied)."""
+        return {p.name: list(p.default) if isinstance(p.default, list) else p.default
+                for p in self.params}
+
+    def compile(self, params, sample_rate):
+        recorder = params if isinstance(params, RecordingParams) else None
+        raw = recorder._params if recorder is not None else params
+
+        # 1. Cache lookup: one .get per declared param, nothing recomputed
+        key = (sample_rate,) + tuple(_freeze(raw.get(p.name)) for p in self.params)
+        struct = self._cache.get(key)
+        if struct is None:
+            struct = self._build(raw, sample_rate, key)
+        if recorder is None:
+            return struct
+        return _RecordedStruct(struct, recorder.reads, self.by_name, self._derive_reads)
+
+    def _build(self, params, sample_rate, key):
+        # 2. Build the struct: typed values, then the derived ones
+        struct = self.struct_class()
+        for p in self.params:
+            setattr(struct, p.name, p.coerce(params.get(p.name)))
+        if self.derive:
+            tracker = _DeriveTracker(struct)
+            self.derive(tracker, sample_rate)
+            reads = frozenset(tracker.reads) & frozenset(self.by_name)
+        else:
+            reads = frozenset()
+
+        with self._lock:
+            self._derive_reads = self._derive_reads | reads
+            if len(self._cache) > self.MAX_CACHED:
+                self._cache.clear()  # Old edits: cheap to rebuild
+            self._cache[key] = struct
+        return struct
+
+
+class _DeriveTracker:
+    """Stands in for a struct during derive(): notes which attributes it reads."""
+    __slots__ = ("_struct", "reads")
+
+    def __init__(self, struct):
+        object.__setattr__(self, "_struct", struct)
+        object.__setattr__(self, "reads", set())
+
+    def __getattr__(self, name):
+        self.reads.add(name)
+        return getattr(self._struct, name)
+
+    def __setattr__(self, name, value):
+        setattr(self._struct, name, value)
+
+
+class _RecordedStruct:
+    """
+    A compiled struct handed out for a RecordingParams: each attribute read
+    files its param (a derived one, every param derive() reads). Hashes and
+    compares as the struct itself, so plugins can keep using it as a cache key.
+    """
+    __slots__ = ("_struct", "_reads", "_names", "_derive_reads")
+
+    def __init__(self, struct, reads, names, derive_reads):
+        self._struct = struct
+        self._reads = reads
+        self._names = names
+        self._derive_reads = derive_reads
+
+    def __getattr__(self, name):
+        if name in self._names:
+            self._reads.add(name)
+        else:
+            self._reads.update(self._derive_reads)
+        return getattr(self._struct, name)
+
+    def __hash__(self):
+        return hash(self._struct)
+
+    def __eq__(self, other):
+        return self._struct is getattr(other, "_struct", other)
+
+    def __repr__(self):
+        return repr(self._struct)
+
+
+def utility_params(length_name="length", length_default=0.5):
+    """
+    The knobs every Source shares: root, transpose, gain, length, plus the
+    tuning resolve_source() injects for MICROTONAL tracks (see tuning.py).
+    """
+    return [
+        Param("root_note", int, 60, 0, 127),
+        Param("transpose", int, 0, -24, 24),
+        Param("tuning", str, DEFAULT_TUNING),
+        Param("gain", float, 1.0, 0.0, 2.0),
+        Param(length_name, float, length_default, 0.01, 10.0),
+    ]
+
+
+class RecordingParams:
+    """
+    Read-only stand-in for a params dict that remembers every key read.
+    Handed to generate_modular() / effect compile() so cache keys can be
+    built from what the plugin really uses (see ParamDependencies).
+    """
+    __slots__ = ("_params", "reads")
+
+    def __init__(self, params):
+        self._params = params
+        self.reads = set()
+
+    def get(self, key, default=None):
+        self.reads.add(key)
+        return self._params.get(key, default)
+
+    def __getitem__(self, key):
+        self.reads.add(key)
+        return self._params[key]
+
+    def __contains__(self, key):
+        self.reads.add(key)
+        return key in self._params
+
+    def __iter__(self):
+        # Walking the dict depends on all of it
+        self.reads.update(self._params)
+        return iter(self._params)
+
+    def keys(self):
+        return list(iter(self))
+
+    def items(self):
+        return [(k, self._params[k]) for k in self]
+
+    def __len__(self):
+        self.reads.update(self._params)
+        return len(self._params)
+
+
+class ParamDependencies:
+    """
+    Which param keys each plugin version reads: the union of every
+    RecordingParams seen for (plugin id, plugin source hash).
+
+    WHY A UNION IS SAFE:
+    --------------------
+    A plugin's reads can branch on values (noise type...), but only on values
+    it already read. Two params dicts that agree on every key of the union
+    therefore take the same branches and read the same values: same audio.
+    A key read for the first time grows the union, which changes every key
+    built from it (old entries just miss, nothing stale is ever returned).
+    Unknown plugins (never rendered) have no dependencies: callers key on the
+    full params until the first render has been recorded.
+    """
+    def __init__(self, path=None):
+        self.path = path          # Optional JSON file (persists across sessions)
+        self._deps = {}           # "plugin_id:hash" -> frozenset of keys
+        self._lock = threading.Lock()
+        if path and os.path.exists(path):
+            try:
+                with open(path, "r") as f:
+                    self._deps = {k: frozenset(v) for k, v in json.load(f).items()}
+            except (OSError, ValueError) as e:
+                print(f"ParamDependencies: ignoring {path}: {e}")
+
+    def get(self, plugin_id, plugin_hash):
+        return self._deps.get(f"{plugin_id}:{plugin_hash}")
+
+    def record(self, plugin_id, plugin_hash, keys):
+        """Adds the keys a render read. Returns True if the dependency set grew."""
+        name = f"{plugin_id}:{plugin_hash}"
+        with self._lock:
+            old = self._deps.get(name, frozenset())
+            new = old | frozenset(keys)
+            if name in self._deps and new == old:
+                return False
+            self._deps[name] = new
+            snapshot = {k: sorted(v) for k, v in self._deps.items()}
+        self._save(snapshot)
+        return True
+
+    def _save(self, snapshot):
+        if not self.path: return
+        tmp = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp, "w") as f:
+                json.dump(snapshot, f)
+            os.replace(tmp, self.path)
+        except OSError as e:
+            print(f"ParamDependencies: cannot save {self.path}: {e}")
+
+    @staticmethod
+    def project(params, deps):
+        """The part of 'params' a plugin depends on (None = unknown: all of it)."""
+        if deps is None:
+            return params
+        return {k: params[k] for k in deps if k in params}
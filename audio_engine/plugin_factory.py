@@ -1,15 +1,27 @@
 # Blooper4/audio_engine/plugin_factory.py
+import hashlib
 import importlib
+import importlib.util
 import os
 import sys
+import threading
+from audio_engine.fx_chain import compile_chain, chain_signature
+from audio_engine.params import ParamDependencies
+
+# Plugins come in two halves with the same file name: the audio Processor
+# (numpy/scipy only, importable headless) and its pygame UI.
+PROCESSOR_PACKAGE = "components.builder_plugins"
+UI_PACKAGE = "components.plugin_ui"
 
 class PluginFactory:
     """
     The 4.0 Plugin Orchestrator.
     Dynamically loads plugin files and handles the 'Generic Contract'.
     """
-    def __init__(self, bridge):
+    def __init__(self, bridge, sample_rate=None):
         self.bridge = bridge
+        # Every Processor built here renders at this rate (must match the bridge)
+        self.sample_rate = int(sample_rate or bridge.sample_rate)
         
         # CATEGORIZED REGISTRY
         self.source_registry = {
@@ -24,7 +36,8 @@ class PluginFactory:
         self.effect_registry = {
             "EQ": "eq",
             "REVERB": "reverb",
-            "PLATE_REVERB": "plate_reverb"
+            "PLATE_REVERB": "plate_reverb",
+            "CONVOLUTION_REVERB": "convolution_reverb"
         }
         
         # Combine them for the internal loader
@@ -33,8 +46,23 @@ class PluginFactory:
         # Cache for instantiated Audio Processors (one instance per track-type)
         self.processor_cache = {}
 
-    def _get_module(self, plugin_id):
-        """Helper to dynamically import the plugin python file."""
+        # FX signature -> CompiledChain (rebuilt only when an FX list changes)
+        self.chain_cache = {}
+        # Which params each Effect reads (recorded while compiling chains)
+        self.param_deps = ParamDependencies()
+
+        # plugin_id -> sha1 of the plugin file (part of every VoiceCache key)
+        self.plugin_hashes = {}
+
+        # Plugins can be requested from background render threads (LoopCache),
+        # so module loading/instancing is serialized.
+        self._load_lock = threading.RLock()
+
+    def _get_module(self, plugin_id, package=PROCESSOR_PACKAGE):
+        """
+        Helper to dynamically import the plugin python file: the Processor half
+        from 'builder_plugins', the UI half (package=UI_PACKAGE) from 'plugin_ui'.
+        """
         filename = self.plugin_map.get(plugin_id)
         if not filename:
             print(f"ERROR: Plugin ID '{plugin_id}' not found in registry.")
@@ -42,7 +70,7 @@ class PluginFactory:
             
         try:
             # Construct the internal package path
-            module_path = f"components.builder_plugins.{filename}"
+            module_path = f"{package}.{filename}"
             
             # Use importlib to load the file
             if module_path in sys.modules:
@@ -51,42 +79,81 @@ class PluginFactory:
             
             return importlib.import_module(module_path)
         except ImportError as e:
-            print(f"CRITICAL: Failed to load plugin file '{filename}.py'. Error: {e}")
+            print(f"CRITICAL: Failed to load plugin file '{package}.{filename}'. Error: {e}")
             return None
 
     def get_source(self, plugin_id):
         """Returns the Audio logic instance for a Source (Synth/Drum)."""
         if plugin_id in self.processor_cache:
             return self.processor_cache[plugin_id]
-            
-        module = self._get_module(plugin_id)
-        # 4.0 CONTRACT: Every plugin MUST have a class named 'Processor'
-        if module and hasattr(module, 'Processor'):
-            # Sources receive the C++ bridge for machine-code oscillators
-            instance = module.Processor(self.bridge)
-            self.processor_cache[plugin_id] = instance
-            return instance
+
+        with self._load_lock:
+            if plugin_id in self.processor_cache:
+                return self.processor_cache[plugin_id]
+            module = self._get_module(plugin_id)
+            # 4.0 CONTRACT: Every plugin MUST have a class named 'Processor'
+            if module and hasattr(module, 'Processor'):
+                # Sources receive the C++ bridge for machine-code oscillators
+                instance = module.Processor(self.bridge)
+                instance.sample_rate = self.sample_rate
+                self.processor_cache[plugin_id] = instance
+                return instance
         return None
 
     def get_effect(self, plugin_id):
         """Returns the Audio logic instance for an Effect (EQ/Reverb)."""
         if plugin_id in self.processor_cache:
             return self.processor_cache[plugin_id]
-            
-        module = self._get_module(plugin_id)
-        if module and hasattr(module, 'Processor'):
-            # Effects are initialized without a bridge (usually Python math)
-            instance = module.Processor()
-            self.processor_cache[plugin_id] = instance
-            return instance
+
+        with self._load_lock:
+            if plugin_id in self.processor_cache:
+                return self.processor_cache[plugin_id]
+            module = self._get_module(plugin_id)
+            if module and hasattr(module, 'Processor'):
+                # Effects are initialized without a bridge (usually Python math)
+                instance = module.Processor()
+                instance.sample_rate = self.sample_rate
+                self.processor_cache[plugin_id] = instance
+                return instance
         return None
 
+    def get_chain(self, effects):
+        """Returns the CompiledChain for an FX list (compiled on first use / after edits)."""
+        signature = chain_signature(effects, self)
+        chain = self.chain_cache.get(signature)
+        if chain is None:
+            if len(self.chain_cache) > 256:
+                self.chain_cache.clear()  # Old edits: cheap to recompile
+            chain = compile_chain(self, effects, signature)
+            # Compiling recorded what each effect reads: file it under that
+            chain.signature = signature = chain_signature(effects, self)
+            self.chain_cache[signature] = chain
+        return chain
+
+    def get_plugin_hash(self, plugin_id):
+        """
+        Hash of the plugin's Processor file. Editing a plugin's audio code
+        changes its hash, which invalidates every cached voice it rendered
+        (UI-only edits live in plugin_ui/ and keep the cache).
+        """
+        if plugin_id not in self.plugin_hashes:
+            filename = self.plugin_map.get(plugin_id)
+            try:
+                # find_spec locates the file without (re)importing it
+                spec = importlib.util.find_spec(f"{PROCESSOR_PACKAGE}.{filename}")
+                with open(spec.origin, 'rb') as f:
+                    self.plugin_hashes[plugin_id] = hashlib.sha1(f.read()).hexdigest()
+            except (AttributeError, ImportError, OSError, TypeError):
+                self.plugin_hashes[plugin_id] = "unknown"
+        return self.plugin_hashes[plugin_id]
+
     def get_ui_class(self, plugin_id):
         """
         Returns the UI Class (not an instance).
         The BuilderView uses this to create unique UI boxes for each track.
         """
-        module = self._get_module(plugin_id)
+        with self._load_lock:
+            module = self._get_module(plugin_id, UI_PACKAGE)
         # 4.0 CONTRACT: Every plugin MUST have a class named 'UI'
         if module and hasattr(module, 'UI'):
             return module.UI
@@ -0,0 +1,126 @@
+# Blooper4/audio_engine/prewarm.py
+import copy
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from audio_engine.voice import resolve_source, render_source, voice_key, voice_note
+from models import Note
+
+class CachePrewarmer:
+    """
+    Fills the VoiceCache right after a project is loaded, so the first
+    playback pass is as fast as every other pass.
+
+    Finds every unique (engine, params, pitch, gate) that will actually sound
+    (tracks/pads WITH notes only), skips what is already cached, and renders
+    the rest on a small background pool while the UI stays usable. The scan
+    itself runs on the pool too: start() costs the UI thread nothing per note.
+    """
+    def __init__(self, factory, voice_cache, workers=None):
+        self.factory = factory
+        self.voice_cache = voice_cache
+        self.workers = workers or max(1, min(4, (os.cpu_count() or 2) - 1))
+
+        self._pool = None
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._scanning = False
+        self.done = 0
+        self.total = 0
+
+    @property
+    def is_running(self):
+        return self._scanning or self.done < self.total
+
+    @property
+    def progress(self):
+        """(voices rendered, voices to render) for the status bar."""
+        return self.done, self.total
+
+    def collect(self, song, generation=None):
+        """
+        Returns {cache_key: (engine_id, params_copy, note)} of voices to render.
+        Reads each track's note columns (never hydrating Note objects) and
+        only resolves each distinct (pitch, duration) once per track: the
+        velocity is not part of a voice. Stops early once 'generation' is stale.
+        """
+        jobs = {}
+        for track in song.tracks:
+            if generation is not None and generation != self._generation:
+                return {}
+            if track.frozen: continue  # Frozen tracks never synthesize
+            _, pitches, durations, velocities = [c.tolist() if hasattr(c, "tolist") else c
+                                                 for c in track.note_columns()]
+            # 1. Distinct voices of this track (first velocity seen)
+            distinct = {}
+            for pitch, duration, velocity in zip(pitches, durations, velocities):
+                distinct.setdefault((pitch, duration), velocity)
+
+            # 2. One key per distinct voice
+            for (pitch, duration), velocity in distinct.items():
+                engine_id, params = resolve_source(track, pitch)
+                if engine_id is None: continue
+                note = voice_note(self.factory, track, Note(0, pitch, duration, velocity))
+                key = voice_key(self.factory, self.voice_cache, engine_id, params, note, song.bpm)
+                if key is None:
+                    # Plugin never rendered yet: dedupe on the full params instead
+                    key = (engine_id, json.dumps(params, sort_keys=True, default=str), pitch, duration)
+                elif self.voice_cache.contains(key): continue
+                if key in jobs: continue
+                # Copy params: the user may start editing while we render
+                jobs[key] = (engine_id, copy.deepcopy(params), note)
+        return jobs
+
+    def start(self, song):
+        """Queues the scan + pre-warm in the background (returns at once)."""
+        with self._lock:
+            # A newer project supersedes any pre-warm still running
+            self._generation += 1
+            generation = self._generation
+            self.done, self.total = 0, 0
+            self._scanning = True
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="prewarm")
+        self._pool.submit(self._scan, generation, song)
+
+    def _scan(self, generation, song):
+        try:
+            jobs = self.collect(song, generation)
+        except Exception as e:
+            print(f"Pre-warm: scan failed: {e}")
+            jobs = {}
+        with self._lock:
+            if generation != self._generation:
+                return  # Cancelled by a newer start()
+            self.total = len(jobs)
+            self._scanning = False
+        pool = self._pool
+        if not jobs or pool is None:
+            return
+        try:
+            for engine_id, params, note in jobs.values():
+                pool.submit(self._render_one, generation, engine_id, params, note, song.bpm)
+        except RuntimeError:
+            return  # shutdown() while queueing
+        print(f"Pre-warm: {len(jobs)} voices queued on {self.workers} workers.")
+
+    def _render_one(self, generation, engine_id, params, note, bpm):
+        if generation != self._generation:
+            return  # Cancelled by a newer start()
+        try:
+            render_source(self.factory, engine_id, params, note, bpm, self.voice_cache)
+        except Exception as e:
+            print(f"Pre-warm: {engine_id} failed: {e}")
+        with self._lock:
+            if generation == self._generation:
+                self.done += 1
+
+    def shutdown(self):
+        with self._lock:
+            self._generation += 1
+            self.done = self.total = 0
+            self._scanning = False
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
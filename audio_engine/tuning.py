@@ -0,0 +1,138 @@
+# Blooper4/audio_engine/tuning.py
+import hashlib
+import os
+import re
+import threading
+import numpy as np
+from constants import TUNING_DIR, DEFAULT_TUNING, MICROTONAL_DEFAULT, EDO_TUNINGS
+
+class Tuning:
+    """
+    A repeating scale: 'steps' are the cents of degrees 1..N, the last one
+    being the period (1200 = octave). Degree 0 is the root (0 cents).
+
+    MIDI keys map to consecutive degrees: key root_note plays the plugin's
+    base frequency, root_note + 1 the next degree, and so on.
+    """
+    def __init__(self, name, steps, edo=None):
+        self.name = name
+        self.steps = list(steps)
+        self.edo = edo            # N for equal divisions of the octave (exact math)
+        self._tables = {}
+        self._lock = threading.Lock()
+        # What the plugins get as their 'tuning' param: .scl tunings carry a
+        # digest of their steps, so editing the file changes every key built on it
+        if edo:
+            self.key = name
+        else:
+            digest = hashlib.sha1(repr(self.steps).encode()).hexdigest()[:12]
+            self.key = f"{name}{KEY_SEP}{digest}"
+
+    @classmethod
+    def equal(cls, n):
+        return cls(f"{n}-EDO" if n != 12 else DEFAULT_TUNING, [1200.0 * (i + 1) / n for i in range(n)], edo=n)
+
+    @classmethod
+    def from_scl(cls, path):
+        """
+        Parses a Scala .scl file: '!' comments, a description line, the note
+        count, then one pitch per line as cents ('701.955') or a ratio ('3/2', '2').
+        """
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            lines = [l.strip() for l in f if not l.strip().startswith("!")]
+        count = int(lines[1].split()[0])
+        steps = []
+        for line in lines[2:2 + count]:
+            token = line.split()[0]
+            if "." in token:
+                steps.append(float(token))
+            else:
+                num, _, den = token.partition("/")
+                steps.append(float(1200.0 * np.log2(int(num) / int(den or 1))))
+        if len(steps) != count or count == 0:
+            raise ValueError(f"expected {count} pitches, found {len(steps)}")
+        return cls(os.path.basename(path), steps)
+
+    def ratio(self, degree):
+        """Frequency ratio of 'degree' steps above (or below) the root."""
+        if self.edo:
+            return 2.0 ** (degree / self.edo)
+        n = len(self.steps)
+        period, idx = divmod(degree, n)
+        cents = period * self.steps[-1] + (self.steps[idx - 1] if idx else 0.0)
+        return 2.0 ** (cents / 1200.0)
+
+    def table(self, root_note, transpose=0):
+        """
+        The 128-entry MIDI pitch -> frequency multiplier table for one
+        root/transpose (read-only, built once and shared).
+        """
+        key = (root_note, transpose)
+        table = self._tables.get(key)
+        if table is None:
+            table = np.array([self.ratio(pitch - root_note + transpose) for pitch in range(128)])
+            table.setflags(write=False)
+            with self._lock:
+                self._tables[key] = table
+        return table
+
+
+KEY_SEP = "|"    # Tuning.key = "<file.scl>|<steps digest>"
+
+_lock = threading.Lock()
+_tunings = {}   # (name, file mtime) -> Tuning
+
+
+def list_tunings():
+    """Every tuning the MICROTONAL mode can use: N-EDOs + .scl files in TUNING_DIR."""
+    names = [f"{n}-EDO" for n in EDO_TUNINGS]
+    if os.path.isdir(TUNING_DIR):
+        names += sorted(f for f in os.listdir(TUNING_DIR) if f.lower().endswith(".scl"))
+    return names
+
+
+def get_tuning(name):
+    """
+    '12-TET', 'N-EDO', a .scl file name or a Tuning.key.
+    Unknown/broken names fall back to 12-TET.
+    """
+    name = name.partition(KEY_SEP)[0]
+    path = os.path.join(TUNING_DIR, name) if name.lower().endswith(".scl") else None
+    try:
+        mtime = os.path.getmtime(path) if path else 0
+    except OSError:
+        mtime = 0
+    key = (name, mtime)
+    tuning = _tunings.get(key)
+    if tuning is not None:
+        return tuning
+
+    edo = re.fullmatch(r"(\d+)-(EDO|TET)", name)
+    if edo and int(edo.group(1)) > 0:
+        tuning = Tuning.equal(int(edo.group(1)))
+    elif path:
+        try:
+            tuning = Tuning.from_scl(path)
+        except (OSError, ValueError, IndexError, ZeroDivisionError) as e:
+            print(f"Tuning: cannot load '{name}': {e}")
+    if tuning is None:
+        tuning = Tuning.equal(12)
+
+    with _lock:
+        _tunings[key] = tuning
+    return tuning
+
+
+def pitch_table(name, root_note, transpose=0):
+    """Shortcut used by the plugin schemas (derived once per edit)."""
+    return get_tuning(name).table(root_note, transpose)
+
+
+def track_tuning(track):
+    """
+    The tuning a track plays in, as its Tuning.key (what the plugins get as
+    their 'tuning' param). Only MICROTONAL tracks leave 12-TET.
+    """
+    if getattr(track, "piano_roll_scale", "CHROMATIC") != "MICROTONAL":
+        return DEFAULT_TUNING
+    return get_tuning(getattr(track, "tuning", MICROTONAL_DEFAULT)).key
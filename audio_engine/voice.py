@@ -0,0 +1,185 @@
+# Blooper4/audio_engine/voice.py
+from math import gcd
+import numpy as np
+from scipy.signal import resample_poly
+from audio_engine.base_processor import BaseProcessor
+from audio_engine.params import RecordingParams
+from audio_engine.tuning import track_tuning
+from constants import DEFAULT_TUNING
+from constants import STREAM_MIN_SECONDS, STREAM_BLOCK
+from models import OneShotNote
+
+def resolve_source(track_model, pitch):
+    """
+    4.1 Workstation Routing: Finds which engine + params play a given pitch.
+    Returns (engine_id, params) or (None, None) if the pad is empty.
+    MICROTONAL tracks get their tuning as an extra 'tuning' param (the
+    plugins' pitch tables are built from it, and it is part of the cache key:
+    a Tuning.key, so editing a .scl file invalidates its voices).
+    """
+    if track_model.mode == "SYNTH":
+        # Simple track: Use the track's global source
+        engine_id, params = track_model.source_type, track_model.source_params
+    else:
+        # Sampler track: Find the specific engine assigned to this MIDI pitch
+        pad_config = track_model.sampler_map.get(pitch)
+        if not pad_config:
+            return None, None
+        engine_id, params = pad_config["engine"], pad_config["params"]
+
+    tuning = track_tuning(track_model)
+    if tuning != DEFAULT_TUNING:
+        params = {**params, "tuning": tuning}
+    return engine_id, params
+
+
+def voice_note(factory, track_model, note_model):
+    """
+    The note as the source should play it. SAMPLER pads on one-shot engines
+    (drums) ignore note-off and ring out; a pad's "one_shot" key overrides
+    the engine default. SYNTH tracks are always gated.
+    """
+    if track_model.mode == "SYNTH" or note_model.one_shot:
+        return note_model
+    pad_config = track_model.sampler_map.get(note_model.pitch)
+    if not pad_config:
+        return note_model
+    one_shot = pad_config.get("one_shot")
+    if one_shot is None:
+        source = factory.get_source(pad_config["engine"])
+        one_shot = bool(source and source.one_shot)
+    if not one_shot:
+        return note_model
+    return OneShotNote(note_model.tick, note_model.pitch, note_model.duration, note_model.velocity)
+
+
+def voice_key(factory, cache, engine_id, source_params, note_model, bpm):
+    """
+    The VoiceCache key for one Source render (what makes two voices identical).
+    Only the params the plugin reads are part of it. Returns None while that
+    is unknown (plugin never rendered): such a voice cannot be looked up yet.
+    """
+    plugin_hash = factory.get_plugin_hash(engine_id)
+    deps = cache.deps.get(engine_id, plugin_hash)
+    if deps is None:
+        return None
+    # Voices are gated, so the note-off time is part of the sound (one-shots: no note-off)
+    gate = None if note_model.one_shot else round(BaseProcessor.gate_seconds(note_model, bpm), 4)
+    return cache.make_key(engine_id, plugin_hash, cache.deps.project(source_params, deps), note_model.pitch,
+                          gate, factory.sample_rate)
+
+
+def render_source(factory, engine_id, source_params, note_model, bpm, cache=None):
+    """
+    Runs one Source plugin for one note, going through the VoiceCache
+    (if given) so identical voices are only ever synthesized once.
+    """
+    if cache is not None:
+        key = voice_key(factory, cache, engine_id, source_params, note_model, bpm)
+        buffer = cache.get(key) if key is not None else None
+        if buffer is not None:
+            return buffer
+
+    source = factory.get_source(engine_id)
+    if not source:
+        return None
+    if cache is None:
+        # New 4.1 Contract: Plugins must accept a raw params dict
+        return source.generate_modular(source_params, note_model, bpm)
+
+    # Record what the plugin reads: that (not the whole dict) keys the voice
+    recorder = RecordingParams(source_params)
+    buffer = source.generate_modular(recorder, note_model, bpm)
+    cache.deps.record(engine_id, factory.get_plugin_hash(engine_id), recorder.reads)
+    if buffer is not None:
+        cache.put(voice_key(factory, cache, engine_id, source_params, note_model, bpm), buffer)
+    return buffer
+
+
+def render_voice(factory, track_model, note_model, bpm, cache=None, overrides=None):
+    """
+    Renders one note through Source -> Modular FX (no Mixer stage).
+    Shared by the live AudioManager and the offline LoopCache so both
+    paths produce the exact same buffer for the same note.
+    'overrides' patches source params for this note only (e.g. LEGATO: no attack).
+    Returns a float32 buffer, or None if nothing should sound.
+    """
+    engine_id, source_params = resolve_source(track_model, note_model.pitch)
+    if engine_id is None:
+        return None
+    if overrides:
+        source_params = {**source_params, **overrides}
+    note_model = voice_note(factory, track_model, note_model)
+
+    # 1. GENERATE SOURCE (Generic, cached)
+    buffer = render_source(factory, engine_id, source_params, note_model, bpm, cache)
+    if buffer is None:
+        return None
+
+    # 2. MODULAR FX (compiled chain: identity FX dropped, IIR stages fused)
+    chain = factory.get_chain(track_model.effects)
+    if chain and chain.tail_samples:
+        # Room for the convolution tail to ring out past the dry voice
+        # (the stages keep their input length), then drop what stays silent
+        buffer = np.concatenate([buffer, np.zeros(chain.tail_samples, dtype=np.float32)])
+        buffer = BaseProcessor.trim_tail(chain.process(buffer))
+    elif chain:
+        buffer = chain.process(buffer)
+    return buffer
+
+
+def stream_voice(factory, track_model, note_model, bpm, cache=None, overrides=None):
+    """
+    Block-streamed alternative to render_voice() for LONG notes.
+    Returns a generator of float32 blocks, or None when the voice should be
+    rendered whole instead: short notes, sources without native streaming,
+    tracks whose FX chain needs whole buffers (anything but IIR stages such
+    as the EQ, see CompiledChain.streamable), one-shots and cached voices.
+    """
+    if BaseProcessor.gate_seconds(note_model, bpm) <= STREAM_MIN_SECONDS:
+        return None
+    chain = factory.get_chain(track_model.effects)
+    if chain and not chain.streamable:
+        return None
+
+    engine_id, source_params = resolve_source(track_model, note_model.pitch)
+    if engine_id is None:
+        return None
+    if overrides:
+        source_params = {**source_params, **overrides}
+    source = factory.get_source(engine_id)
+    if not source or not source.supports_streaming:
+        return None
+    if voice_note(factory, track_model, note_model).one_shot:
+        return None  # Drum hits are short: rendered whole
+    # Already rendered once: playing the cached buffer is cheaper still
+    if cache is not None:
+        key = voice_key(factory, cache, engine_id, source_params, note_model, bpm)
+        if key is not None and cache.contains(key):
+            return None
+    blocks = source.generate_blocks(source_params, note_model, bpm)
+    return _stream_chain(chain, blocks) if chain else blocks
+
+
+def _stream_chain(chain, blocks):
+    """
+    Runs a streamable chain over a voice's blocks; the filter state lives with
+    the voice. Once the source ends, silence is fed for chain.tail_samples so
+    the convolution tail rings out like it does in render_voice().
+    """
+    state = chain.new_state()
+    for block in blocks:
+        yield chain.process_block(block, state)
+    for start in range(0, chain.tail_samples, STREAM_BLOCK):
+        yield chain.process_block(np.zeros(min(STREAM_BLOCK, chain.tail_samples - start), dtype=np.float32), state)
+
+
+def resample(buffer, from_rate, to_rate):
+    """
+    Converts a rendered voice between internal and device rates
+    (DRAFT playback renders low and is brought back up once, at the mixer).
+    """
+    if buffer is None or from_rate == to_rate:
+        return buffer
+    g = gcd(int(from_rate), int(to_rate))
+    return resample_poly(buffer, int(to_rate) // g, int(from_rate) // g).astype(np.float32)
@@ -0,0 +1,271 @@
+# Blooper4/audio_engine/voice_allocator.py
+import time
+from constants import (POLYPHONY, MAX_POLYPHONY, POLYPHONY_STEP, VOICE_HEADROOM,
+                       VOICES_PER_TRACK, STEAL_POLICY, STEAL_FADE_MS, LEGATO_FADE_MS)
+
+class Voice:
+    """One sounding note: which channel plays it, and what it is."""
+    def __init__(self, channel, index, track_idx, pitch, amplitude, note_vol, length, choke=0):
+        self.channel = channel
+        self.index = index            # Channel number (pygame Channels have no identity)
+        self.track_idx = track_idx
+        self.pitch = pitch
+        self.amplitude = amplitude    # Peak level at note-on (voice peak * gain)
+        self.note_vol = note_vol      # Velocity scalar (the Mixer multiplies faders by it)
+        self.length = length          # Seconds
+        self.choke = choke            # Sampler choke group (0 = none)
+        self.start_time = time.perf_counter()
+        self.released = False         # Fading out / stopped by the allocator
+
+    def level(self, now):
+        """Estimated current level: most voices decay, so fade the peak over the length."""
+        if self.length <= 0: return 0.0
+        return self.amplitude * max(0.0, 1.0 - (now - self.start_time) / self.length)
+
+    def is_playing(self):
+        return not self.released and self.channel.get_busy()
+
+
+class VoiceAllocator:
+    """
+    Hands out pygame Channels to notes and decides who gets cut under load.
+
+    LIMITS:
+    -------
+    - polyphony: voices before anything is stolen. Grows by POLYPHONY_STEP
+      (up to MAX_POLYPHONY) when the song keeps hitting it.
+    - per track: a track can never hold more than its limit (track param
+      'max_voices', default VOICES_PER_TRACK), so one busy hi-hat track
+      cannot starve the pads.
+
+    STEALING:
+    ---------
+    "OLDEST" or "QUIETEST" voice is faded out over STEAL_FADE_MS. The fade
+    keeps its channel busy, so VOICE_HEADROOM spare channels exist on top of
+    the polyphony for the new voice. "NONE" drops the new voice instead.
+
+    VOICE MODES:
+    ------------
+    Choke groups (SAMPLER pads) and the track's voice_mode decide which older
+    voices a new note cuts (replaces()). Live playback applies them with
+    cut_replaced(); offline renders (LoopCache: cache, freeze, export,
+    headless, batch) lay the same cuts out in time with plan(), so every
+    path sounds alike. Only _resize() needs pygame: the planning half of
+    this module imports without it.
+    """
+    def __init__(self, polyphony=POLYPHONY, max_polyphony=MAX_POLYPHONY, per_track=VOICES_PER_TRACK,
+                 policy=STEAL_POLICY, fade_ms=STEAL_FADE_MS):
+        self.polyphony = polyphony
+        self.max_polyphony = max_polyphony
+        self.per_track = per_track
+        self.policy = policy
+        self.fade_ms = fade_ms
+
+        self._voices = []
+        self._channels = []
+        self.stats = {"allocated": 0, "stolen": 0, "dropped": 0, "grown": 0, "peak": 0, "cut": 0}
+        self._resize()
+
+    def _resize(self):
+        """pygame Channels are plain handles (no identity), so we index our own list."""
+        import pygame
+        n = self.polyphony + VOICE_HEADROOM
+        pygame.mixer.set_num_channels(n)
+        self._channels = [pygame.mixer.Channel(i) for i in range(n)]
+
+    # --- QUERIES ---
+    def prune(self):
+        """Forgets voices that finished (or were faded out)."""
+        self._voices = [v for v in self._voices if v.is_playing()]
+
+    def voices(self, track_idx=None):
+        if track_idx is None:
+            return list(self._voices)
+        return [v for v in self._voices if v.track_idx == track_idx]
+
+    @property
+    def active_count(self):
+        return len(self._voices)
+
+    # --- ALLOCATION ---
+    def allocate(self, track_idx, pitch, amplitude=1.0, note_vol=1.0, length=1.0, limit=None, choke=0):
+        """
+        Returns a Voice with a free Channel for a new note, or None if the
+        note was dropped. The caller plays the Sound on voice.channel.
+        """
+        self.prune()
+        limit = limit or self.per_track
+
+        # 1. Per-track limit: the track steals from itself
+        track_voices = self.voices(track_idx)
+        while len(track_voices) >= limit:
+            if not self._steal(track_voices):
+                return None
+            track_voices = self.voices(track_idx)
+
+        # 2. Global polyphony: grow first, steal once at the ceiling
+        if len(self._voices) >= self.polyphony:
+            if self.polyphony < self.max_polyphony:
+                self.polyphony = min(self.max_polyphony, self.polyphony + POLYPHONY_STEP)
+                self._resize()
+                self.stats["grown"] += 1
+                print(f"VoiceAllocator: polyphony raised to {self.polyphony}")
+            elif not self._steal(self._voices):
+                return None
+
+        # 3. A channel that is really idle (fading voices keep theirs)
+        index = self._free_channel()
+        if index is None:
+            index = self._hard_steal()
+        if index is None:
+            self.stats["dropped"] += 1
+            return None
+
+        voice = Voice(self._channels[index], index, track_idx, pitch, amplitude, note_vol, length, choke)
+        self._voices.append(voice)
+        self.stats["allocated"] += 1
+        self.stats["peak"] = max(self.stats["peak"], len(self._voices))
+        return voice
+
+    def _pick_victim(self, candidates):
+        if not candidates:
+            return None
+        if self.policy == "QUIETEST":
+            now = time.perf_counter()
+            return min(candidates, key=lambda v: v.level(now))
+        return min(candidates, key=lambda v: v.start_time)
+
+    def _steal(self, candidates):
+        """Fades out one victim. Returns False if the new voice must be dropped."""
+        victim = self._pick_victim(candidates) if self.policy != "NONE" else None
+        if victim is None:
+            self.stats["dropped"] += 1
+            return False
+        self.release(victim)
+        self.stats["stolen"] += 1
+        return True
+
+    def _free_channel(self):
+        owned = {v.index for v in self._voices}
+        for i, channel in enumerate(self._channels):
+            if i not in owned and not channel.get_busy():
+                return i
+        return None
+
+    def _hard_steal(self):
+        """Every channel is busy (headroom used up by fades): cut a fading one, then a live one."""
+        owned = {v.index for v in self._voices}
+        for i, channel in enumerate(self._channels):
+            if i not in owned:
+                channel.stop()
+                return i
+        victim = self._pick_victim(self._voices) if self.policy != "NONE" else None
+        if victim is None:
+            return None
+        victim.channel.stop()
+        victim.released = True
+        self._voices.remove(victim)
+        self.stats["stolen"] += 1
+        return victim.index
+
+    # --- RELEASE ---
+    def release(self, voice, fade_ms=None):
+        """Fades a voice out (short fade, no click) and forgets it."""
+        fade_ms = self.fade_ms if fade_ms is None else fade_ms
+        if fade_ms > 0:
+            voice.channel.fadeout(fade_ms)
+        else:
+            voice.channel.stop()
+        voice.released = True
+        if voice in self._voices:
+            self._voices.remove(voice)
+
+    # --- VOICE MODES ---
+    @staticmethod
+    def replaces(track_mode, voice_mode, pitch, choke, old_pitch, old_choke):
+        """
+        True if a new note (pitch, choke group) cuts an older voice of the same
+        track: its choke group, the same pad (SAMPLER mono: a roll retriggers
+        instead of stacking), or any voice (SYNTH mono/legato).
+        """
+        if track_mode == "SAMPLER":
+            if choke and old_choke == choke:
+                return True
+            return voice_mode != "POLY" and old_pitch == pitch
+        return voice_mode != "POLY"
+
+    @staticmethod
+    def cut_fade_ms(track_mode, voice_mode):
+        """Legato crossfades into the next note; every other cut is a steal-style fade."""
+        return LEGATO_FADE_MS if track_mode == "SYNTH" and voice_mode == "LEGATO" else STEAL_FADE_MS
+
+    def cut_replaced(self, track_idx, track_mode, voice_mode, pitch, choke=0):
+        """
+        Live: releases the voices a new note replaces. Returns True if the new
+        note plays legato (LEGATO track, and a cut voice was still inside its
+        gate: no re-articulation, so the caller skips the attack).
+        """
+        now = time.perf_counter()
+        victims = [v for v in self.voices(track_idx) if v.is_playing()
+                   and self.replaces(track_mode, voice_mode, pitch, choke, v.pitch, v.choke)]
+        fade_ms = self.cut_fade_ms(track_mode, voice_mode)
+        overlap = False
+        for v in victims:
+            overlap = overlap or now - v.start_time < v.length
+            self.release(v, fade_ms)
+        self.stats["cut"] += len(victims)
+        return overlap and track_mode == "SYNTH" and voice_mode == "LEGATO"
+
+    @classmethod
+    def plan(cls, track_mode, voice_mode, notes, length_ticks):
+        """
+        Offline: the same cuts laid out over one loop pass. 'notes' are
+        (tick, pitch, duration, choke) sorted by tick; the loop repeats, so a
+        note can be cut by one after the wrap (tick + length_ticks, possibly
+        its own next pass). Returns one (cut or None, legato) per note, with
+        cut = (cut_tick, fade_ms).
+        """
+        n = len(notes)
+        if n == 0 or (voice_mode == "POLY" and not any(note[3] for note in notes)):
+            return [(None, False)] * n
+
+        cuts = [None] * n
+        legato = [False] * n
+        next_any, next_pitch, next_choke = None, {}, {}
+        # 1. Walk two passes backwards: each note meets the first later note replacing it
+        for k in range(2 * n - 1, -1, -1):
+            i = k % n
+            tick, pitch, duration, choke = notes[i]
+            if k >= n:
+                tick += length_ticks
+            else:
+                if track_mode == "SAMPLER":
+                    candidates = []
+                    if choke and choke in next_choke:
+                        candidates.append(next_choke[choke])
+                    if voice_mode != "POLY" and pitch in next_pitch:
+                        candidates.append(next_pitch[pitch])
+                    cuts[i] = min(candidates) if candidates else None
+                elif voice_mode != "POLY":
+                    cuts[i] = next_any
+                    # 2. The next note is legato if this one is still inside its gate
+                    if voice_mode == "LEGATO":
+                        legato[(i + 1) % n] = tick + duration > next_any
+            next_any = tick
+            next_pitch[pitch] = tick
+            if choke:
+                next_choke[choke] = tick
+        fade_ms = cls.cut_fade_ms(track_mode, voice_mode)
+        return [((c, fade_ms) if c is not None else None, l) for c, l in zip(cuts, legato)]
+
+    def stop_track(self, track_idx):
+        for voice in self.voices(track_idx):
+            voice.channel.stop()
+            voice.released = True
+        self._voices = [v for v in self._voices if v.track_idx != track_idx]
+
+    def stop_all(self):
+        for voice in self._voices:
+            voice.channel.stop()
+            voice.released = True
+        self._voices = []
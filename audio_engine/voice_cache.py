@@ -0,0 +1,200 @@
+# Blooper4/audio_engine/voice_cache.py
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+import numpy as np
+from constants import VOICE_CACHE_DIR, VOICE_CACHE_MAX_MB
+from audio_engine.params import ParamDependencies
+
+class VoiceCache:
+    """
+    Content-addressed, on-disk cache of rendered Source voices.
+
+    KEY:    sha1(engine id + plugin source hash + params + pitch + gate + rate)
+            'params' are only the keys the plugin reads (self.deps, recorded
+            at render time and kept in <cache_dir>/param_deps.json).
+    VALUE:  raw float32 file  <cache_dir>/<k[:2]>/<k>.f32, memory-mapped on read
+
+    Shared across sessions (and across processes: writes are atomic renames),
+    so re-opening a project or rendering it in CI is mostly cache hits.
+    Total size is capped; the least recently used files are evicted first.
+    File mtimes double as the LRU clock so the order survives restarts: a
+    hit bumps the file's mtime at most once a minute, and eviction scans
+    write every pending bump before deleting anything.
+    Buffers handed out are read-only (memory maps, or a private copy of what
+    put() stored), so a caller can never alter a cached voice.
+    """
+    EXT = ".f32"
+
+    def __init__(self, cache_dir=VOICE_CACHE_DIR, max_mb=VOICE_CACHE_MAX_MB, memory_items=256):
+        self.cache_dir = cache_dir
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.enabled = True
+
+        # Open memory maps for the hottest voices (avoids re-opening files)
+        self._memory = OrderedDict()
+        self._memory_items = memory_items
+
+        # Disk index: key -> [size_bytes, last_used, mtime on disk]. Built lazily on first use.
+        self._index = None
+        self._total_bytes = 0
+        self._lock = threading.RLock()
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+        except OSError as e:
+            print(f"VoiceCache: disabled, cannot create {self.cache_dir}: {e}")
+            self.enabled = False
+
+        # Which params each Source plugin actually reads (persisted with the cache)
+        self.deps = ParamDependencies(os.path.join(self.cache_dir, "param_deps.json") if self.enabled else None)
+
+    # --- KEYS ---
+    @staticmethod
+    def make_key(engine_id, plugin_hash, params, pitch, gate=None, sample_rate=None):
+        payload = json.dumps([engine_id, plugin_hash, params, pitch, gate, sample_rate], sort_keys=True, default=str)
+        return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key[:2], key + self.EXT)
+
+    # --- LOOKUP ---
+    def contains(self, key):
+        """Cheap presence check (no file is opened)."""
+        if not self.enabled:
+            return False
+        with self._lock:
+            return key in self._memory or key in self._get_index()
+
+    def get(self, key):
+        """Returns a read-only float32 buffer, or None on a miss."""
+        if not self.enabled:
+            return None
+        with self._lock:
+            buf = self._memory.get(key)
+            if buf is not None:
+                self._memory.move_to_end(key)
+                self._touch(key)
+                self.stats["hits"] += 1
+                return buf
+
+            index = self._get_index()
+            if key not in index:
+                self.stats["misses"] += 1
+                return None
+            try:
+                buf = np.memmap(self._path(key), dtype=np.float32, mode='r')
+            except (OSError, ValueError):
+                # Evicted by another process, or a broken file: treat as a miss
+                self._forget(key)
+                self.stats["misses"] += 1
+                return None
+            self._remember(key, buf)
+            self._touch(key)
+            self.stats["hits"] += 1
+            return buf
+
+    def put(self, key, buffer):
+        """Stores a rendered voice. Empty buffers are never cached."""
+        if not self.enabled or buffer is None or len(buffer) == 0:
+            return
+        data = np.ascontiguousarray(buffer, dtype=np.float32)
+        path = self._path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Atomic publish: other sessions never see half a file
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            data.tofile(tmp_path)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"VoiceCache: write failed ({e})")
+            return
+
+        with self._lock:
+            index = self._get_index()
+            if key in index:
+                self._total_bytes -= index[key][0]
+            now = time.time()
+            index[key] = [data.nbytes, now, now]
+            self._total_bytes += data.nbytes
+            # A private read-only copy: the caller keeps (and may reuse) its array
+            stored = data.copy()
+            stored.flags.writeable = False
+            self._remember(key, stored)
+            self._evict()
+
+    def clear(self):
+        """Deletes every cached voice."""
+        with self._lock:
+            for key in list(self._get_index().keys()):
+                self._delete(key)
+            self._memory.clear()
+
+    # --- LRU BOOKKEEPING ---
+    def _get_index(self):
+        if self._index is None:
+            self._index = {}
+            self._total_bytes = 0
+            for root, _, files in os.walk(self.cache_dir):
+                for name in files:
+                    if not name.endswith(self.EXT): continue
+                    try:
+                        st = os.stat(os.path.join(root, name))
+                    except OSError:
+                        continue
+                    self._index[name[:-len(self.EXT)]] = [st.st_size, st.st_mtime, st.st_mtime]
+                    self._total_bytes += st.st_size
+        return self._index
+
+    def _remember(self, key, buf):
+        self._memory[key] = buf
+        self._memory.move_to_end(key)
+        while len(self._memory) > self._memory_items:
+            self._memory.popitem(last=False)
+
+    def _touch(self, key):
+        now = time.time()
+        entry = self._get_index().get(key)
+        if entry is None: return
+        entry[1] = now
+        # Only hit the filesystem once a minute per voice (measured from the
+        # last write, so a voice used every few seconds still gets bumped)
+        if now - entry[2] > 60.0:
+            self._write_mtime(key, entry)
+
+    def _write_mtime(self, key, entry):
+        try:
+            os.utime(self._path(key), (entry[1], entry[1]))
+            entry[2] = entry[1]
+        except OSError:
+            pass
+
+    def _evict(self):
+        if self._total_bytes <= self.max_bytes:
+            return
+        # 1. Survivors keep their order next session: flush pending mtimes
+        for key, entry in self._index.items():
+            if entry[1] > entry[2]:
+                self._write_mtime(key, entry)
+        # 2. Least recently used first
+        for key, _ in sorted(self._index.items(), key=lambda kv: kv[1][1]):
+            if self._total_bytes <= self.max_bytes: break
+            self._delete(key)
+            self.stats["evictions"] += 1
+
+    def _forget(self, key):
+        entry = self._get_index().pop(key, None)
+        if entry:
+            self._total_bytes -= entry[0]
+        self._memory.pop(key, None)
+
+    def _delete(self, key):
+        self._forget(key)
+        try:
+            os.remove(self._path(key))
+        except OSError:
+            pass
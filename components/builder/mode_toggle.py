@@ -6,6 +6,8 @@ from constants import scale, UI_SCALE, COLOR_ACCENT, COLOR_PANEL
 
 class ModeToggleUI(BaseUIElement):
     """Radio button toggle: [PIANO ROLL | SAMPLE PADS]"""
+    # Track attributes a toggle sets (the BuilderView journals them as one edit)
+    EDITS = ("mode", "is_drum", "source_type", "last_synth_source")
 
     def __init__(self, x, y):
         super().__init__(x, y, scale(280), scale(40))
@@ -3,6 +3,7 @@
 import pygame
 from components.base_element import BaseUIElement
 from constants import *
+from audio_engine.tuning import list_tunings
 
 class PianoRollSettingsUI(BaseUIElement):
     """Scale mode selector for piano roll. Matches sampler_brain style."""
@@ -15,6 +16,7 @@ class PianoRollSettingsUI(BaseUIElement):
         self.chromatic_rect = None
         self.modal_rect = None
         self.microtonal_rect = None
+        self.voice_mode_rect = None
 
     def draw(self, screen, track, x, y, scale_f):
         """Draw scale mode selector with modular frame."""
@@ -52,7 +54,9 @@ class PianoRollSettingsUI(BaseUIElement):
         buttons = [
             (self.chromatic_rect, "CHROMATIC", scale_mode == 'CHROMATIC'),
             (self.modal_rect, "MODAL", scale_mode == 'MODAL'),
-            (self.microtonal_rect, "MICROTONAL", scale_mode == 'MICROTONAL')
+            # Active MICROTONAL shows its tuning; clicking it again cycles tunings
+            (self.microtonal_rect, f"MICROTONAL: {track.tuning}" if scale_mode == 'MICROTONAL' else "MICROTONAL",
+             scale_mode == 'MICROTONAL')
         ]
 
         for rect, label, is_active in buttons:
@@ -63,6 +67,18 @@ class PianoRollSettingsUI(BaseUIElement):
             screen.blit(txt_surf, (rect.centerx - txt_surf.get_width()//2,
                                    rect.centery - txt_surf.get_height()//2))
 
+        # Voice mode (POLY / MONO / LEGATO), click to cycle
+        screen.blit(self.font.render("VOICE MODE:", True, WHITE),
+                    (self.rect.x + scale(20), start_y + scale(190)))
+        self.voice_mode_rect = pygame.Rect(
+            self.rect.x + scale(20), start_y + scale(215),
+            button_width, scale(40)
+        )
+        pygame.draw.rect(screen, (50, 50, 55), self.voice_mode_rect, border_radius=scale(5))
+        txt_surf = self.font.render(track.params.get("voice_mode", "POLY"), True, WHITE)
+        screen.blit(txt_surf, (self.voice_mode_rect.centerx - txt_surf.get_width()//2,
+                               self.voice_mode_rect.centery - txt_surf.get_height()//2))
+
     def handle_event(self, event, track_model):
         """Handle scale mode selection."""
         if self.chromatic_rect is None:
@@ -77,6 +93,15 @@ class PianoRollSettingsUI(BaseUIElement):
                     track_model.piano_roll_scale = 'MODAL'
                     return "SCALE_CHANGED"
                 elif self.microtonal_rect.collidepoint(event.pos):
-                    track_model.piano_roll_scale = 'MICROTONAL'
-                    return "SCALE_CHANGED"
+                    if track_model.piano_roll_scale != 'MICROTONAL':
+                        track_model.piano_roll_scale = 'MICROTONAL'
+                        return "SCALE_CHANGED"
+                    tunings = list_tunings()
+                    idx = tunings.index(track_model.tuning) if track_model.tuning in tunings else -1
+                    track_model.tuning = tunings[(idx + 1) % len(tunings)]
+                    return "TUNING_CHANGED"
+                elif self.voice_mode_rect and self.voice_mode_rect.collidepoint(event.pos):
+                    mode = track_model.params.get("voice_mode", "POLY")
+                    track_model.params["voice_mode"] = VOICE_MODES[(VOICE_MODES.index(mode) + 1) % len(VOICE_MODES)]
+                    return "VOICE_MODE_CHANGED"
         return None
@@ -19,6 +19,10 @@ class SamplerBrainUI(BaseUIElement):
         self.btn_prev = Button(0, 0, 40, 25, "<", (60, 60, 70))
         self.btn_next = Button(0, 0, 40, 25, ">", (60, 60, 70))
 
+        # Voice control: active pad's choke group + track voice mode
+        self.btn_choke = Button(0, 0, 125, 30, "CHOKE: OFF", (60, 60, 70))
+        self.btn_mode = Button(0, 0, 125, 30, "POLY", (60, 60, 70))
+
     def _get_pad_rect(self, n, track, scale_f):
         # Calculate grid position (4x4) relative to current base note
         local_idx = n - track.sampler_base_note
@@ -42,6 +46,14 @@ class SamplerBrainUI(BaseUIElement):
         self.btn_prev.draw(screen, self.font)
         self.btn_next.draw(screen, self.font)
 
+        choke = track.sampler_map.get(track.active_pad, {}).get("choke", 0)
+        self.btn_choke.text = f"CHOKE: {choke if choke else 'OFF'}"
+        self.btn_mode.text = track.params.get("voice_mode", "POLY")
+        self.btn_choke.move_to(self.rect.x + scale(20), self.rect.y + scale(85), scale(125), scale(30))
+        self.btn_mode.move_to(self.rect.x + scale(155), self.rect.y + scale(85), scale(125), scale(30))
+        self.btn_choke.draw(screen, self.font)
+        self.btn_mode.draw(screen, self.font)
+
         # Draw the 16-pad selection grid
         for n in range(track.sampler_base_note, track.sampler_base_note + 16):
             if n > 127: break
@@ -58,6 +70,8 @@ class SamplerBrainUI(BaseUIElement):
             # Display truncated engine name (e.g., 'NOIS')
             eng_name = pad_cfg["engine"][:4]
             screen.blit(self.font.render(eng_name, True, GRAY), (p_rect.x + 5, p_rect.y + 25))
+            if pad_cfg.get("choke"):
+                screen.blit(self.font.render(f"C{pad_cfg['choke']}", True, COLOR_ACCENT), (p_rect.right - 22, p_rect.y + 5))
 
     def handle_event(self, event, track):
         if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
@@ -69,6 +83,17 @@ class SamplerBrainUI(BaseUIElement):
                 track.sampler_base_note = min(112, track.sampler_base_note + 16)
                 return
 
+            # Cycle the active pad's choke group (OFF, 1..CHOKE_GROUPS)
+            if self.btn_choke.is_clicked(event.pos):
+                pad = track.sampler_map[track.active_pad]
+                pad["choke"] = (pad.get("choke", 0) + 1) % (CHOKE_GROUPS + 1)
+                return "CHOKE_CHANGED"
+            # Cycle the track voice mode (mono/legato = one voice per pad)
+            if self.btn_mode.is_clicked(event.pos):
+                mode = track.params.get("voice_mode", "POLY")
+                track.params["voice_mode"] = VOICE_MODES[(VOICE_MODES.index(mode) + 1) % len(VOICE_MODES)]
+                return "VOICE_MODE_CHANGED"
+
             # Click a pad to "Focus" the rack on that specific engine
             for n in range(track.sampler_base_note, track.sampler_base_note + 16):
                 if n > 127: break
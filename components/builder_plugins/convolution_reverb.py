@@ -0,0 +1,27 @@
+# Blooper4/components/builder_plugins/convolution_reverb.py
+from constants import *
+from audio_engine.base_processor import BaseProcessor
+from audio_engine.params import Param, ParamSchema
+from audio_engine.convolution import ConvolutionStage, get_spectra
+
+class Processor(BaseProcessor):
+    """
+    Convolution Reverb - plays the input through a recorded space (IR WAV file).
+    Uses partitioned FFT convolution: IR spectra are computed once per
+    (IR, block size, rate) and shared by every track that loads the same IR,
+    so seconds-long tails are cheap enough for live buses.
+    """
+    SCHEMA = ParamSchema("ConvolutionReverb", [
+        Param("ir", str, BUILTIN_IR),
+        Param("mix", float, 0.3, 0.0, 1.0),
+    ])
+
+    def is_identity(self, params):
+        return self.compile_params(params).mix == 0.0
+
+    def compile(self, params):
+        p = self.compile_params(params)
+        return ConvolutionStage(get_spectra(p.ir, CONV_BLOCK, self.sample_rate), p.mix)
+
+    def process(self, data, params):
+        return self.compile(params)(data)
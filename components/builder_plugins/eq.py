@@ -1,56 +1,67 @@
 # Blooper4/components/builder_plugins/eq.py
-import pygame
+from functools import lru_cache
 import numpy as np
-from scipy.signal import butter, lfilter
+from scipy.signal import sosfilt
 from constants import *
 from audio_engine.base_processor import BaseProcessor
-from components.base_element import BaseUIElement
-from ui_components import Slider
+from audio_engine.params import Param, ParamSchema
+
+EQ_Q = 1.0          # Bandwidth of every band (about 1.4 octaves)
+EQ_MIN_DB = -24.0   # Where a fully pulled-down slider lands (0.0 would be -inf)
+
+@lru_cache(maxsize=1024)
+def peaking_section(center, gain, sample_rate):
+    """
+    One RBJ-cookbook peaking biquad as an SOS row (b0 b1 b2 1 a1 a2).
+    Cached per band setting: moving one slider only designs that one band.
+    """
+    db = max(EQ_MIN_DB, 20.0 * np.log10(gain)) if gain > 0 else EQ_MIN_DB
+    A = 10.0 ** (db / 40.0)
+    w0 = 2.0 * np.pi * center / sample_rate
+    alpha = np.sin(w0) / (2.0 * EQ_Q)
+    cos_w0 = np.cos(w0)
+    a0 = 1.0 + alpha / A
+    return ((1.0 + alpha * A) / a0, -2.0 * cos_w0 / a0, (1.0 - alpha * A) / a0,
+            1.0, -2.0 * cos_w0 / a0, (1.0 - alpha / A) / a0)
+
+
+FREQS = [60, 150, 400, 1000, 2400, 5000, 10000, 16000]
+
+def _derive(p, sample_rate):
+    """Per-edit math: the stacked SOS cascade (None when flat)."""
+    sections = []
+    for i, center in enumerate(FREQS):
+        gain = getattr(p, f"band_{i}")
+        if gain == 1.0: continue
+        if center >= 0.45 * sample_rate: continue # Band above Nyquist (low internal rate)
+        sections.append(peaking_section(center, gain, sample_rate))
+    p.sos = np.array(sections) if sections else None
 
 class Processor(BaseProcessor):
+    """
+    8-band parametric EQ: one peaking biquad per band that is off unity,
+    stacked into a single SOS cascade.
+
+    PERFORMANCE:
+    ------------
+    - Flat bands cost nothing (no section), a flat EQ is dropped from the chain.
+    - The whole EQ is one to_sos() cascade, so compile_chain fuses it with
+      neighbouring IIR effects into one sosfilt pass.
+    - In streamed / bus use the chain carries the biquad state between
+      blocks (CompiledChain.process_block), so there are no boundary clicks.
+    """
+    FREQS = FREQS
+    SCHEMA = ParamSchema("EQ", [Param(f"band_{i}", float, 1.0, 0.0, 2.0) for i in range(8)],
+                         derived=("sos",), derive=_derive)
+
     def process(self, data, params):
-        freqs = [60, 150, 400, 1000, 2400, 5000, 10000, 16000]
-        output = np.zeros_like(data)
-        nyq = 0.5 * SAMPLE_RATE
-        for i, center in enumerate(freqs):
-            gain = params.get(f"band_{i}", 1.0)
-            if gain == 1.0: continue
-            low, high = center * 0.5, min(center * 1.5, nyq * 0.95)
-            b, a = butter(1, [low/nyq, high/nyq], btype='band')
-            output += lfilter(b, a, data) * gain
-        return output if np.any(output) else data
-
-class UI(BaseUIElement):
-    def __init__(self, x, y, font):
-        super().__init__(x, y, 300, 400)
-        self.font, self.title = font, "8-BAND EQ"
-        self.active = True
-        self.sliders = [Slider(0, 0, 20, 140, 0, 2, 1, "", vertical=True) for _ in range(8)]
-        self.labels = ["60", "150", "400", "1k", "2k", "5k", "10k", "16k"]
-
-    def draw(self, screen, fx_data, x, y, scale_f):
-        self.rect.topleft = (x, y)
-        self.update_layout(scale_f)
-        self.draw_modular_frame(screen, self.font, self.title, self.active, scale_f)
-        
-        for i, s in enumerate(self.sliders):
-            s.move_to(self.rect.x + int(25 * scale_f + i * 32 * scale_f), self.rect.y + int(60 * scale_f), int(20 * scale_f), int(140 * scale_f))
-            s.val = fx_data["params"].get(f"band_{i}", 1.0)
-            s.draw(screen, self.font)
-            lbl = self.font.render(self.labels[i], True, (100, 100, 110))
-            screen.blit(lbl, (s.rect.x, s.rect.bottom + 5))
-
-    def handle_event(self, event, fx_data):
-        # Only check button interactions on actual clicks, not hover
-        if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1 and hasattr(event, 'pos'):
-            action = self.check_standard_interactions(event.pos, UI_SCALE)
-            if action == "TOGGLE": self.active = not self.active
-            if action == "DELETE": return "DELETE"
-
-        for i, s in enumerate(self.sliders):
-            val = s.handle_event(event)
-            if val is not None: fx_data["params"][f"band_{i}"] = val
-        return None
-
-    def global_release(self):
-        for s in self.sliders: s.grabbed = False
\ No newline at end of file
+        sos = self.to_sos(params)
+        if sos is None:
+            return data
+        return sosfilt(sos, data).astype(np.float32)
+
+    def is_identity(self, params):
+        return self.compile_params(params).sos is None
+
+    def to_sos(self, params):
+        return self.compile_params(params).sos
@@ -14,6 +14,7 @@ class ChannelStrip(BaseUIElement):
         # We define logical offsets (unscaled) for internal UI
         # These will be multiplied by the scale factor during draw()
         self.logical_pan_y = 35
+        self.logical_send_y = 52
         self.logical_fader_y = 60
         self.logical_btns_y = h - 40
 
@@ -30,6 +31,13 @@ class ChannelStrip(BaseUIElement):
         color = COLOR_ACCENT if is_active else WHITE
         txt_num = font.render(str(track.channel), True, color)
         screen.blit(txt_num, (self.rect.x + int(5 * scale_f), self.rect.y + int(5 * scale_f)))
+
+        # 3b. Freeze Toggle (Blue when the track is baked to audio)
+        freeze_rect = self._freeze_rect(scale_f)
+        f_col = BLUE if getattr(track, "frozen", False) else (60, 60, 65)
+        pygame.draw.rect(screen, f_col, freeze_rect, border_radius=3)
+        f_txt = font.render("F", True, WHITE)
+        screen.blit(f_txt, (freeze_rect.centerx - f_txt.get_width() // 2, freeze_rect.centery - f_txt.get_height() // 2))
         
         # 4. Pan Slider (Scalable)
         pan_rect = pygame.Rect(self.rect.x + int(10 * scale_f), 
@@ -41,6 +49,14 @@ class ChannelStrip(BaseUIElement):
         handle_x = pan_rect.x + (pan_val * pan_rect.width)
         pygame.draw.rect(screen, WHITE, (handle_x - 2, pan_rect.y - 2, 4, int(12 * scale_f)))
 
+        # 4b. Send to the first return bus ("A": shared reverb)
+        send_rect = self._send_rect(scale_f)
+        pygame.draw.rect(screen, (10, 10, 10), send_rect, border_radius=int(2 * scale_f))
+        send_val = track.params.get("sends", {}).get(DEFAULT_RETURNS[0], 0.0)
+        if send_val > 0:
+            pygame.draw.rect(screen, BLUE, (send_rect.x, send_rect.y, int(send_val * send_rect.width), send_rect.height),
+                             border_radius=int(2 * scale_f))
+
         # 5. Volume Fader (Scalable)
         fader_area = pygame.Rect(self.rect.x + int(self.rect.width // 2 - 5), 
                                  self.rect.y + int(self.logical_fader_y * scale_f), 
@@ -65,6 +81,14 @@ class ChannelStrip(BaseUIElement):
         screen.blit(font.render("M", True, WHITE), (mute_rect.x + int(8 * scale_f), mute_rect.y + 5))
         screen.blit(font.render("S", True, BLACK if track.params.get("solo", False) else WHITE), (solo_rect.x + int(8 * scale_f), solo_rect.y + 5))
 
+    def _send_rect(self, scale_f):
+        return pygame.Rect(self.rect.x + int(10 * scale_f), self.rect.y + int(self.logical_send_y * scale_f),
+                           self.rect.width - int(20 * scale_f), int(5 * scale_f))
+
+    def _freeze_rect(self, scale_f):
+        size = int(18 * scale_f)
+        return pygame.Rect(self.rect.right - size - int(5 * scale_f), self.rect.y + int(5 * scale_f), size, size)
+
     def handle_event(self, event, track, scale_f):
         # We re-calculate hitboxes during event handling to match current scale
         btn_w = (self.rect.width // 2) - int(5 * scale_f)
@@ -72,15 +96,20 @@ class ChannelStrip(BaseUIElement):
         solo_rect = pygame.Rect(self.rect.x + (self.rect.width // 2), self.rect.y + int(self.logical_btns_y * scale_f), btn_w, int(25 * scale_f))
         pan_rect = pygame.Rect(self.rect.x + int(10 * scale_f), self.rect.y + int(self.logical_pan_y * scale_f), self.rect.width - int(20 * scale_f), int(15 * scale_f))
         fader_area = pygame.Rect(self.rect.x + int(self.rect.width // 2 - 15), self.rect.y + int(self.logical_fader_y * scale_f), int(30 * scale_f), self.rect.height - int(130 * scale_f))
+        send_rect = self._send_rect(scale_f).inflate(0, int(6 * scale_f))
 
         if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
+            if self._freeze_rect(scale_f).collidepoint(event.pos):
+                # main.py owns the AudioManager, which does the actual bake
+                return "FREEZE"
             if mute_rect.collidepoint(event.pos):
                 track.params["mute"] = not track.params.get("mute", False)
                 return "UPDATE"
             if solo_rect.collidepoint(event.pos):
                 track.params["solo"] = not track.params.get("solo", False)
                 return "UPDATE"
-            if self.rect.collidepoint(event.pos) and not fader_area.collidepoint(event.pos) and not pan_rect.collidepoint(event.pos):
+            if self.rect.collidepoint(event.pos) and not fader_area.collidepoint(event.pos) and not pan_rect.collidepoint(event.pos) \
+                    and not send_rect.collidepoint(event.pos):
                 return "SELECT"
 
         if pygame.mouse.get_pressed()[0]:
@@ -93,4 +122,9 @@ class ChannelStrip(BaseUIElement):
                 rel_x = m_pos[0] - pan_rect.x
                 track.params["pan"] = max(0.0, min(1.0, rel_x / pan_rect.width))
                 return "UPDATE"
+            if send_rect.collidepoint(m_pos):
+                rel_x = m_pos[0] - send_rect.x
+                sends = track.params.setdefault("sends", {})
+                sends[DEFAULT_RETURNS[0]] = round(max(0.0, min(1.0, rel_x / send_rect.width)), 2)
+                return "UPDATE"
         return None
\ No newline at end of file
@@ -0,0 +1,52 @@
+# Blooper4/components/plugin_ui/convolution_reverb.py
+import os
+import pygame
+from constants import *
+from audio_engine.convolution import list_irs
+from components.base_element import BaseUIElement
+from ui_components import Slider, Dropdown
+
+class UI(BaseUIElement):
+    def __init__(self, x, y, font):
+        super().__init__(x, y, 300, 400)
+        self.font, self.title = font, "CONVOLUTION REVERB"
+        self.active = True
+        self.ir_drop = Dropdown(0, 0, 240, 30, list_irs(), BUILTIN_IR)
+        self.mix_slider = Slider(0, 0, 240, 15, 0, 1, 0.3, "WET MIX")
+
+    def draw(self, screen, fx_data, x, y, scale_f):
+        self.rect.topleft = (x, y)
+        self.update_layout(scale_f)
+        self.draw_modular_frame(screen, self.font, self.title, self.active, scale_f)
+
+        self.mix_slider.move_to(self.rect.x + int(30 * scale_f), self.rect.y + int(150 * scale_f), int(240 * scale_f), int(15 * scale_f))
+        self.mix_slider.val = fx_data["params"].get("mix", 0.3)
+        self.mix_slider.draw(screen, self.font)
+
+        # Dropdown last: its open list draws over the slider
+        self.ir_drop.move_to(self.rect.x + int(30 * scale_f), self.rect.y + int(70 * scale_f), int(240 * scale_f), int(30 * scale_f))
+        self.ir_drop.set_label(os.path.splitext(fx_data["params"].get("ir", BUILTIN_IR))[0][:22])
+        self.ir_drop.draw(screen, self.font)
+
+    def handle_event(self, event, fx_data):
+        # Only check button interactions on actual clicks, not hover
+        if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1 and hasattr(event, 'pos'):
+            action = self.check_standard_interactions(event.pos, UI_SCALE)
+            if action == "TOGGLE": self.active = not self.active
+            if action == "DELETE": return "DELETE"
+
+        choice = self.ir_drop.handle_event(event)
+        if choice == "TOGGLE" and self.ir_drop.is_open:
+            self.ir_drop.options = list_irs()  # Pick up WAVs dropped into the folder
+        elif choice is not None and choice != "TOGGLE":
+            fx_data["params"]["ir"] = choice
+            return None
+        if self.ir_drop.is_open:
+            return None  # The open list covers the slider
+
+        m = self.mix_slider.handle_event(event)
+        if m is not None: fx_data["params"]["mix"] = m
+        return None
+
+    def global_release(self):
+        self.mix_slider.grabbed = False
@@ -0,0 +1,40 @@
+# Blooper4/components/plugin_ui/eq.py
+import pygame
+from constants import *
+from components.base_element import BaseUIElement
+from ui_components import Slider
+
+class UI(BaseUIElement):
+    def __init__(self, x, y, font):
+        super().__init__(x, y, 300, 400)
+        self.font, self.title = font, "8-BAND EQ"
+        self.active = True
+        self.sliders = [Slider(0, 0, 20, 140, 0, 2, 1, "", vertical=True) for _ in range(8)]
+        self.labels = ["60", "150", "400", "1k", "2k", "5k", "10k", "16k"]
+
+    def draw(self, screen, fx_data, x, y, scale_f):
+        self.rect.topleft = (x, y)
+        self.update_layout(scale_f)
+        self.draw_modular_frame(screen, self.font, self.title, self.active, scale_f)
+        
+        for i, s in enumerate(self.sliders):
+            s.move_to(self.rect.x + int(25 * scale_f + i * 32 * scale_f), self.rect.y + int(60 * scale_f), int(20 * scale_f), int(140 * scale_f))
+            s.val = fx_data["params"].get(f"band_{i}", 1.0)
+            s.draw(screen, self.font)
+            lbl = self.font.render(self.labels[i], True, (100, 100, 110))
+            screen.blit(lbl, (s.rect.x, s.rect.bottom + 5))
+
+    def handle_event(self, event, fx_data):
+        # Only check button interactions on actual clicks, not hover
+        if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1 and hasattr(event, 'pos'):
+            action = self.check_standard_interactions(event.pos, UI_SCALE)
+            if action == "TOGGLE": self.active = not self.active
+            if action == "DELETE": return "DELETE"
+
+        for i, s in enumerate(self.sliders):
+            val = s.handle_event(event)
+            if val is not None: fx_data["params"][f"band_{i}"] = val
+        return None
+
+    def global_release(self):
+        for s in self.sliders: s.grabbed = False
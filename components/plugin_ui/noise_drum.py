@@ -0,0 +1,102 @@
+# Blooper4/components/plugin_ui/noise_drum.py
+import pygame
+from constants import *
+from components.base_element import BaseUIElement
+from ui_components import Slider, RadioGroup, Dropdown, Knob
+
+# =============================================================================
+# THE UI COMPONENT (Standardized 400px Layout)
+# =============================================================================
+class UI(BaseUIElement):
+    def __init__(self, x, y, font):
+        super().__init__(x, y, 300, 400)
+        self.font = font
+        self.plugin_id = "NOISE_DRUM"
+        self.title = "NOISE DRUM"
+        self.active = True
+        
+        # 1. Pro Drum Presets
+        self.presets = {
+            "808 KICK":    {"type": "DRUM",  "color": "BROWN", "pitch_hpf": 45,  "length": 0.45, "gain": 1.5},
+            "PUNCHY TOM":  {"type": "DRUM",  "color": "PINK",  "pitch_hpf": 120, "length": 0.35, "gain": 1.2},
+            "LIGHT SNARE": {"type": "SNARE", "color": "WHITE", "pitch_hpf": 240, "length": 0.15, "gain": 1.0},
+            "HEAVY SNARE": {"type": "SNARE", "color": "PINK",  "pitch_hpf": 180, "length": 0.28, "gain": 1.3},
+            "HI-HAT":      {"type": "CYMBAL","color": "WHITE", "pitch_hpf": 800, "length": 0.08, "gain": 0.9},
+            "CRASH":       {"type": "CYMBAL","color": "WHITE", "pitch_hpf": 300, "length": 1.80, "gain": 1.0},
+            "RIDE":        {"type": "CYMBAL","color": "PINK",  "pitch_hpf": 600, "length": 1.20, "gain": 1.1}
+        }
+        self.preset_drop = Dropdown(0, 0, 260, 30, list(self.presets.keys()), "SELECT PRESET")
+
+        # 2. Core Control Sliders
+        self.pitch_slider = Slider(0, 0, 260, 10, 20, 1000, 60, "FREQ / HPF")
+        self.color_sel = RadioGroup(0, 0, ["WHITE", "PINK", "BROWN"], font, cols=3)
+        self.type_sel = RadioGroup(0, 0, ["DRUM", "SNARE", "CYMBAL"], font, cols=3)
+        
+        # 3. Standard Utility Knobs
+        self.knob_trans = Knob(0, 0, 40, -24, 24, 0, "PITCH")
+        self.knob_gain = Knob(0, 0, 40, 0, 2.0, 1.0, "GAIN")
+        self.knob_len = Knob(0, 0, 40, 0.01, 10.0, 0.3, "LEN", is_log=True)
+
+    def draw(self, screen, track_or_proxy, x, y, scale_f):
+        self.rect.topleft = (x, y)
+        self.update_layout(scale_f)
+        self.draw_modular_frame(screen, self.font, self.title, self.active, scale_f)
+        params = track_or_proxy.source_params
+
+        cx = self.rect.x + scale(20)
+        
+        # 1. Preset Dropdown
+        self.preset_drop.move_to(cx, self.rect.y + scale(45))
+        
+        # 2. Type and Color Selectors (Stacked)
+        self.type_sel.move_to(self.rect.x + scale(12), self.rect.y + scale(90))
+        self.color_sel.move_to(self.rect.x + scale(12), self.rect.y + scale(135))
+        
+        # 3. Main Slider
+        self.pitch_slider.move_to(cx, self.rect.y + scale(200), scale(260), scale(10))
+        self.pitch_slider.val = params.get("pitch_hpf", 60)
+        
+        # 4. Utility Row
+        util_y = self.rect.y + scale(285)
+        self.knob_trans.move_to(self.rect.x + scale(40), util_y)
+        self.knob_gain.move_to(self.rect.x + scale(120), util_y)
+        self.knob_len.move_to(self.rect.x + scale(200), util_y)
+
+        # Sync visual state
+        self.type_sel.selected = params.get("type", "DRUM")
+        self.color_sel.selected = params.get("color", "WHITE")
+        self.knob_trans.val = params.get("transpose", 0)
+        self.knob_gain.val = params.get("gain", 1.0)
+        self.knob_len.val = params.get("length", 0.3)
+
+        # Draw
+        self.type_sel.draw(screen, self.font)
+        self.color_sel.draw(screen, self.font)
+        self.pitch_slider.draw(screen, self.font)
+        self.knob_trans.draw(screen, self.font, scale_f)
+        self.knob_gain.draw(screen, self.font, scale_f)
+        self.knob_len.draw(screen, self.font, scale_f)
+        
+        self.preset_drop.draw(screen, self.font)
+
+    def handle_event(self, event, track_or_proxy):
+        params = track_or_proxy.source_params
+        
+        choice = self.preset_drop.handle_event(event)
+        if choice and choice in self.presets:
+            for k, v in self.presets[choice].items(): params[k] = v
+            return
+            
+        if self.preset_drop.is_open: return
+
+        if t := self.type_sel.handle_event(event): params["type"] = t
+        if c := self.color_sel.handle_event(event): params["color"] = c
+        if p := self.pitch_slider.handle_event(event): params["pitch_hpf"] = p
+
+        if (tr := self.knob_trans.handle_event(event)) is not None: params["transpose"] = int(tr)
+        if (g := self.knob_gain.handle_event(event)) is not None: params["gain"] = g
+        if (l := self.knob_len.handle_event(event)) is not None: params["length"] = l
+
+    def global_release(self):
+        self.pitch_slider.grabbed = False
+        self.knob_trans.grabbed = self.knob_gain.grabbed = self.knob_len.grabbed = False
@@ -0,0 +1,70 @@
+# Blooper4/components/plugin_ui/plate_reverb.py
+import pygame
+from constants import *
+from components.base_element import BaseUIElement
+from ui_components import Slider
+
+class UI(BaseUIElement):
+    def __init__(self, x, y, font):
+        super().__init__(x, y, 300, 400)
+        self.font, self.title = font, "PLATE REVERB"
+        self.active = True
+        self.mix_slider = Slider(0, 0, 240, 15, 0, 1, 0.2, "WET MIX")
+        self.decay_slider = Slider(0, 0, 240, 15, 0, 1, 0.6, "DECAY")
+        self.damping_slider = Slider(0, 0, 240, 15, 0, 1, 0.7, "DAMPING")
+        self.predelay_slider = Slider(0, 0, 240, 15, 0, 0.1, 0.01, "PRE-DELAY")
+
+    def draw(self, screen, fx_data, x, y, scale_f):
+        self.rect.topleft = (x, y)
+        self.update_layout(scale_f)
+        self.draw_modular_frame(screen, self.font, self.title, self.active, scale_f)
+
+        # Position sliders vertically
+        y_offset = 80
+        self.mix_slider.move_to(self.rect.x + int(30 * scale_f), self.rect.y + int(y_offset * scale_f), int(240 * scale_f), int(15 * scale_f))
+        y_offset += 70
+        self.decay_slider.move_to(self.rect.x + int(30 * scale_f), self.rect.y + int(y_offset * scale_f), int(240 * scale_f), int(15 * scale_f))
+        y_offset += 70
+        self.damping_slider.move_to(self.rect.x + int(30 * scale_f), self.rect.y + int(y_offset * scale_f), int(240 * scale_f), int(15 * scale_f))
+        y_offset += 70
+        self.predelay_slider.move_to(self.rect.x + int(30 * scale_f), self.rect.y + int(y_offset * scale_f), int(240 * scale_f), int(15 * scale_f))
+
+        # Sync slider values from track data
+        self.mix_slider.val = fx_data["params"].get("mix", 0.2)
+        self.decay_slider.val = fx_data["params"].get("decay", 0.6)
+        self.damping_slider.val = fx_data["params"].get("damping", 0.7)
+        self.predelay_slider.val = fx_data["params"].get("predelay", 0.01)
+
+        # Draw all sliders
+        self.mix_slider.draw(screen, self.font)
+        self.decay_slider.draw(screen, self.font)
+        self.damping_slider.draw(screen, self.font)
+        self.predelay_slider.draw(screen, self.font)
+
+    def handle_event(self, event, fx_data):
+        # Only check button interactions on actual clicks, not hover
+        if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1 and hasattr(event, 'pos'):
+            action = self.check_standard_interactions(event.pos, UI_SCALE)
+            if action == "TOGGLE": self.active = not self.active
+            if action == "DELETE": return "DELETE"
+
+        # Handle slider events
+        m = self.mix_slider.handle_event(event)
+        if m is not None: fx_data["params"]["mix"] = m
+
+        d = self.decay_slider.handle_event(event)
+        if d is not None: fx_data["params"]["decay"] = d
+
+        dmp = self.damping_slider.handle_event(event)
+        if dmp is not None: fx_data["params"]["damping"] = dmp
+
+        pre = self.predelay_slider.handle_event(event)
+        if pre is not None: fx_data["params"]["predelay"] = pre
+
+        return None
+
+    def global_release(self):
+        self.mix_slider.grabbed = False
+        self.decay_slider.grabbed = False
+        self.damping_slider.grabbed = False
+        self.predelay_slider.grabbed = False
@@ -0,0 +1,44 @@
+# Blooper4/components/plugin_ui/reverb.py
+import pygame
+from constants import *
+from components.base_element import BaseUIElement
+from ui_components import Slider
+
+class UI(BaseUIElement):
+    def __init__(self, x, y, font):
+        super().__init__(x, y, 300, 400)
+        self.font, self.title = font, "REVERB"
+        self.active = True
+        self.mix_slider = Slider(0, 0, 240, 15, 0, 1, 0.1, "WET MIX")
+        self.size_slider = Slider(0, 0, 240, 15, 0, 1, 0.5, "ROOM SIZE")
+
+    def draw(self, screen, fx_data, x, y, scale_f):
+        self.rect.topleft = (x, y)
+        self.update_layout(scale_f)
+        self.draw_modular_frame(screen, self.font, self.title, self.active, scale_f)
+        
+        self.mix_slider.move_to(self.rect.x + int(30 * scale_f), self.rect.y + int(80 * scale_f), int(240 * scale_f), int(15 * scale_f))
+        self.size_slider.move_to(self.rect.x + int(30 * scale_f), self.rect.y + int(150 * scale_f), int(240 * scale_f), int(15 * scale_f))
+        
+        self.mix_slider.val = fx_data["params"].get("mix", 0.1)
+        self.size_slider.val = fx_data["params"].get("size", 0.5)
+        
+        self.mix_slider.draw(screen, self.font)
+        self.size_slider.draw(screen, self.font)
+
+    def handle_event(self, event, fx_data):
+        # Only check button interactions on actual clicks, not hover
+        if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1 and hasattr(event, 'pos'):
+            action = self.check_standard_interactions(event.pos, UI_SCALE)
+            if action == "TOGGLE": self.active = not self.active
+            if action == "DELETE": return "DELETE"
+
+        m = self.mix_slider.handle_event(event)
+        if m is not None: fx_data["params"]["mix"] = m
+        s = self.size_slider.handle_event(event)
+        if s is not None: fx_data["params"]["size"] = s
+        return None
+
+    def global_release(self):
+        self.mix_slider.grabbed = False
+        self.size_slider.grabbed = False
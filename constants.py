@@ -1,5 +1,5 @@
 # Blooper4/constants.py
-import pygame
+import os
 
 # --- VERSION ---
 VERSION = "4.0.0"
@@ -19,9 +19,88 @@ def scale(val):
 # --- AUDIO STANDARDS ---
 SAMPLE_RATE = 44100
 BUFFER_SIZE = 512       # Low latency buffer
+MIXER_SAMPLE_SIZE = 32  # float32 device format (main.py falls back to 16-bit)
 TPQN = 480              # Ticks Per Quarter Note
+TICKS_PER_BAR = TPQN * 4 # 4/4 bars (LoopCache segment size)
 NUM_TRACKS = 16
 
+# --- RENDER QUALITY ---
+# Sources/FX synthesize at the quality's internal rate; live playback is
+# resampled to SAMPLE_RATE once at the mixer. Offline renders pick any
+# EXPORT_SAMPLE_RATES entry.
+RENDER_QUALITIES = {"DRAFT": 22050, "HIGH": SAMPLE_RATE}
+DEFAULT_QUALITY = "HIGH"
+EXPORT_SAMPLE_RATES = (44100, 48000, 96000)
+
+# --- VOICE GATING ---
+# Voices stop at note-off + a short release, and silent tails are trimmed
+VOICE_RELEASE = 0.03          # Seconds of fade after note-off
+VOICE_SILENCE_THRESHOLD = 1e-4 # ~ -80 dBFS: anything quieter is cut from the tail
+
+# --- VOICE ALLOCATION ---
+POLYPHONY = 56            # Voices before the allocator grows/steals
+MAX_POLYPHONY = 128       # Ceiling when polyphony grows with load
+POLYPHONY_STEP = 16
+VOICE_HEADROOM = 8        # Spare channels for voices fading out after a steal
+VOICES_PER_TRACK = 24     # Default per-track limit (track param 'max_voices')
+STEAL_POLICY = "OLDEST"   # "OLDEST", "QUIETEST" or "NONE" (drop the new note)
+STEAL_FADE_MS = 10
+
+# --- VOICE MODES & CHOKE GROUPS ---
+# Track param 'voice_mode'. SYNTH: MONO/LEGATO keep one voice per track.
+# SAMPLER: MONO/LEGATO keep one voice per pad (rolls/808s stop stacking).
+VOICE_MODES = ["POLY", "MONO", "LEGATO"]
+CHOKE_GROUPS = 4          # Pad 'choke' 1..N: a pad cuts every voice of its group (0 = off)
+LEGATO_FADE_MS = 25       # Crossfade into the next note, which skips its attack
+
+# --- RENDER GRAPH ---
+GRAPH_BLOCK = 65536       # Samples per graph block (~1.5s: bus FX pad each block)
+FX_TAIL_SECONDS = 0.25    # Bus FX padding: ring-out carried into the next block
+DEFAULT_RETURNS = ["A"]   # Send/return buses of a new project (shared PLATE_REVERB)
+
+# --- TUNING ---
+# CHROMATIC/MODAL tracks play 12-TET. MICROTONAL tracks play Track.tuning:
+# an N-EDO or a Scala .scl file from TUNING_DIR.
+TUNING_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Tunings")
+DEFAULT_TUNING = "12-TET"
+MICROTONAL_DEFAULT = "24-EDO"      # Quarter tones
+EDO_TUNINGS = [19, 22, 24, 31, 53]
+
+# --- CONVOLUTION REVERB ---
+# Impulse responses are WAV files in IR_DIR; BUILTIN_IR needs no file.
+IR_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Impulse_Responses")
+BUILTIN_IR = "BUILTIN HALL"
+CONV_BLOCK = 512          # Partition size: latency and cost per block (~12ms @ 44.1k)
+
+# --- BLOCK STREAMING ---
+# Notes longer than STREAM_MIN_SECONDS are generated and played block by block.
+# One block must outlast a couple of frames (FPS) so the queue never runs dry.
+STREAM_BLOCK = 4096            # Samples per block (~93ms @ 44.1k)
+STREAM_MIN_SECONDS = 1.0
+
+# --- SAVING ---
+# Saves are serialized and written on a background thread (atomic rename).
+# Autosave writes a recovery copy next to the project (untitled songs: in
+# AUTOSAVE_DIR) every AUTOSAVE_SECONDS, only if the song changed since the
+# last save or autosave (Song.autosave_pending). Autosaves keep Song.is_dirty.
+AUTOSAVE_SECONDS = 120
+AUTOSAVE_SUFFIX = ".autosave.bloopz"
+AUTOSAVE_DIR = os.path.join(os.path.expanduser("~"), ".blooper4", "autosave")
+
+# --- UNDO ---
+UNDO_LIMIT = 500          # Journal entries kept (each one holds only the changed values)
+
+# --- VOICE CACHE (Persistent, shared across sessions) ---
+# Override the location with BLOOPER_VOICE_CACHE (e.g. a CI cache folder)
+VOICE_CACHE_DIR = os.environ.get("BLOOPER_VOICE_CACHE",
+                                 os.path.join(os.path.expanduser("~"), ".blooper4", "voice_cache"))
+VOICE_CACHE_MAX_MB = 512
+
+# --- BATCH RENDER ---
+# utils/batch_render.py records what every WAV was rendered from (project
+# content hash + hashes of the plugins it used) and skips it while unchanged.
+BATCH_MANIFEST = os.path.join(os.path.expanduser("~"), ".blooper4", "batch_render.json")
+
 # --- MIDI DRUM RANGE ---
 MIDI_RANGE = 128
 DRUM_NOTE_START = 34
@@ -6,6 +6,8 @@ from components.builder.sampler_brain import SamplerBrainUI
 from components.builder.mode_toggle import ModeToggleUI
 from components.builder.piano_roll_settings import PianoRollSettingsUI
 from ui_components import Dropdown
+from utils.history import AttrEdit, AttrsEdit, DictEdit, ListEdit
+from models import FrozenDict
 
 class BuilderView(BaseView):
     def __init__(self, font, factory):
@@ -43,15 +45,17 @@ class BuilderView(BaseView):
             data["SAMPLER_BRAIN"] = SamplerBrainUI(0, 0, self.font)
 
         # 2. Sync Source UI
-        target_source = track.source_type if track.mode == "SYNTH" else track.sampler_map[track.active_pad]["engine"]
+        # Reads go through .get(): a pad is only copied when something edits it
+        target_source = track.source_type if track.mode == "SYNTH" else track.sampler_map.get(track.active_pad)["engine"]
         if not data["SOURCE"] or data["SOURCE"].plugin_id != target_source:
             ui_class = self.factory.get_ui_class(target_source)
             if ui_class:
                 data["SOURCE"] = ui_class(0, 0, self.font)
                 data["SOURCE"].plugin_id = target_source
 
-        # 3. Sync FX Chain
-        if len(data["FX"]) != len(track.effects):
+        # 3. Sync FX Chain (types too: undo can swap the chain under us)
+        if len(data["FX"]) != len(track.effects) or \
+                any(ui.plugin_id != fx["type"] for ui, fx in zip(data["FX"], track.effects)):
             data["FX"] = []
             for fx in track.effects:
                 ui_class = self.factory.get_ui_class(fx["type"])
@@ -87,10 +91,14 @@ class BuilderView(BaseView):
             self.source_dropdown.move_to(right_x, curr_y, scale(280), scale(40))
             self.source_dropdown.set_label(f"SOURCE: {track.source_type}")
         else:  # SAMPLER mode - show active pad's engine
-            active_engine = track.sampler_map[track.active_pad]["engine"]
+            active_engine = track.sampler_map.get(track.active_pad)["engine"]
             self.source_dropdown.move_to(right_x, curr_y, scale(280), scale(40))
             self.source_dropdown.set_label(f"ENGINE: {active_engine}")
 
+        if track.frozen:
+            notice = self.font.render("TRACK FROZEN - UNFREEZE (F) IN MIXER TO EDIT", True, BLUE)
+            screen.blit(notice, (right_x + scale(300), curr_y + scale(14)))
+
         curr_y = self.mode_toggle_ui.rect.bottom + scale(10)
 
         # --- ROW 2: MAIN CONTENT (TWO COLUMNS) ---
@@ -111,10 +119,10 @@ class BuilderView(BaseView):
             if track.mode == "SYNTH":
                 ui_data["SOURCE"].draw(screen, track, curr_x, curr_y, UI_SCALE)
             else:
-                # Sampler mode: Pass proxy for active pad
+                # Sampler mode: Pass proxy for active pad (read-only view: drawing edits nothing)
                 class PadProxy: pass
                 proxy = PadProxy()
-                proxy.source_params = track.sampler_map[track.active_pad]["params"]
+                proxy.source_params = track.sampler_map.get(track.active_pad)["params"]
                 proxy.drum_pads = track.drum_pads
                 ui_data["SOURCE"].draw(screen, proxy, curr_x, curr_y, UI_SCALE)
 
@@ -161,9 +169,18 @@ class BuilderView(BaseView):
         if not hasattr(event, 'pos'):
             return
 
+        # Frozen tracks are read-only until unfrozen from the mixer
+        if track.frozen:
+            return
+
         # 0. ROUTE TO MODE TOGGLE (highest priority, always visible)
+        before = {name: getattr(track, name) for name in self.mode_toggle_ui.EDITS}
         result = self.mode_toggle_ui.handle_event(event, track)
         if result == "MODE_CHANGED":
+            # The toggle sets several attributes: one undo step for all of them
+            changes = {name: (old, getattr(track, name)) for name, old in before.items()
+                       if old != getattr(track, name)}
+            song.history.record(AttrsEdit(track, track, changes, "Track mode"))
             self._sync_ui_instances(track, active_idx)
             return
 
@@ -173,12 +190,13 @@ class BuilderView(BaseView):
             # User selected a new source plugin/engine
             if track.mode == "SYNTH":
                 if result != track.source_type:
+                    song.history.record(AttrEdit(track, track, "source_type", track.source_type, result, "Source"))
                     track.source_type = result
                     self._sync_ui_instances(track, active_idx)
             else:  # SAMPLER mode
                 # Update the active pad's engine
-                if result != track.sampler_map[track.active_pad]["engine"]:
-                    track.sampler_map[track.active_pad]["engine"] = result
+                if result != track.sampler_map.get(track.active_pad)["engine"]:
+                    self._set_pad_engine(song, track, result)
                     self._sync_ui_instances(track, active_idx)
             return
 
@@ -186,13 +204,30 @@ class BuilderView(BaseView):
         if track.mode == "SAMPLER":
             # Check if click is within sampler brain bounds
             if self.sampler_brain_ui.rect.collidepoint(event.pos):
-                self.sampler_brain_ui.handle_event(event, track)
+                choke = track.sampler_map.get(track.active_pad).get("choke", 0)
+                voice_mode = track.params.get("voice_mode", "POLY")
+                result = self.sampler_brain_ui.handle_event(event, track)
+                if result == "CHOKE_CHANGED":
+                    pad = track.sampler_map[track.active_pad]
+                    song.history.record(DictEdit(track, pad, {"choke": (choke, pad["choke"])},
+                                                 f"Pad {track.active_pad} choke"))
+                elif result == "VOICE_MODE_CHANGED":
+                    self._record_voice_mode(song, track, voice_mode)
                 return  # Don't cascade to source if sampler handled it
         else:  # SYNTH mode
             # Check if click is within piano roll settings bounds
             if self.piano_roll_settings_ui.rect.collidepoint(event.pos):
+                scale_mode, tuning = track.piano_roll_scale, track.tuning
+                voice_mode = track.params.get("voice_mode", "POLY")
                 result = self.piano_roll_settings_ui.handle_event(event, track)
-                if result == "SCALE_CHANGED":
+                if result == "SCALE_CHANGED" and scale_mode != track.piano_roll_scale:
+                    song.history.record(AttrEdit(track, track, "piano_roll_scale", scale_mode,
+                                                 track.piano_roll_scale, "Scale"))
+                elif result == "TUNING_CHANGED" and tuning != track.tuning:
+                    song.history.record(AttrEdit(track, track, "tuning", tuning, track.tuning, "Tuning"))
+                elif result == "VOICE_MODE_CHANGED":
+                    self._record_voice_mode(song, track, voice_mode)
+                if result in ("SCALE_CHANGED", "TUNING_CHANGED", "VOICE_MODE_CHANGED"):
                     return
 
         # 3. ROUTE TO SOURCE (with collision check)
@@ -200,22 +235,48 @@ class BuilderView(BaseView):
             if track.mode == "SAMPLER":
                 class PadProxy: pass
                 proxy = PadProxy()
-                proxy.source_params = track.sampler_map[track.active_pad]["params"]
+                pad = track.sampler_map.get(track.active_pad)
+                label = f"Pad {track.active_pad} params"
+                # Hovering a shared default pad must not copy it: the UI gets a
+                # scratch dict, and the pad only gets its own copy on a click
+                # or once the UI really changed something
+                shared = isinstance(pad, FrozenDict) and event.type != pygame.MOUSEBUTTONDOWN
+                if shared:
+                    proxy.source_params = dict(pad["params"])
+                else:
+                    proxy.source_params = track.sampler_map[track.active_pad]["params"]  # The UI edits these
+                    song.history.watch(track, proxy.source_params, label)
                 proxy.drum_pads = track.drum_pads
-                proxy.source_type = track.sampler_map[track.active_pad]["engine"]
+                proxy.source_type = pad["engine"]
                 ui_data["SOURCE"].handle_event(event, proxy)
-                track.sampler_map[track.active_pad]["engine"] = proxy.source_type
+                if not shared:
+                    song.history.end_watch()
+                elif proxy.source_params != pad["params"]:
+                    params = track.sampler_map[track.active_pad]["params"]
+                    song.history.watch(track, params, label)
+                    params.update(proxy.source_params)
+                    song.history.end_watch()
+                if proxy.source_type != track.sampler_map.get(track.active_pad)["engine"]:
+                    self._set_pad_engine(song, track, proxy.source_type)
+                return
             else:
+                song.history.watch(track, track.source_params, "Source params")
                 ui_data["SOURCE"].handle_event(event, track)
+            # Only the keys the UI changed are journaled (a drag = one entry)
+            song.history.end_watch()
             return
 
         # 4. ROUTE TO FX CHAIN (with collision check and DELETE handling)
         for i, fx_ui in enumerate(ui_data["FX"]):
             if fx_ui.rect.collidepoint(event.pos):
+                song.history.watch(track, track.effects[i]["params"], f"{track.effects[i]['type']} params")
                 result = fx_ui.handle_event(event, track.effects[i])
+                song.history.end_watch()
                 if result == "DELETE":
                     # Remove the effect from the track
+                    old_chain = list(track.effects)
                     track.effects.pop(i)
+                    song.history.record(ListEdit(track, track.effects, old_chain, list(track.effects), "Delete FX"))
                     # Resync UI to rebuild FX chain
                     self._sync_ui_instances(track, active_idx)
                 return
@@ -223,8 +284,25 @@ class BuilderView(BaseView):
         # 5. HANDLE FX DROPDOWN (Add new effects)
         result = self.fx_dropdown.handle_event(event)
         if result and result != "TOGGLE":
-            # User selected an effect type to add
-            track.add_effect(result)
+            # User selected an effect type to add (defaults from its schema)
+            processor = self.factory.get_effect(result)
+            schema = getattr(processor, "SCHEMA", None)
+            old_chain = list(track.effects)
+            track.add_effect(result, schema.defaults() if schema else None)
+            song.history.record(ListEdit(track, track.effects, old_chain, list(track.effects), "Add FX"))
             # Resync UI to show the new FX module
             self._sync_ui_instances(track, active_idx)
-            return
\ No newline at end of file
+            return
+
+    @staticmethod
+    def _set_pad_engine(song, track, engine):
+        """Journaled engine swap for the active pad (params stay, like before)."""
+        pad = track.sampler_map[track.active_pad]  # Mutation: the pad gets its own copy
+        song.history.record(DictEdit(track, pad, {"engine": (pad["engine"], engine)}, f"Pad {track.active_pad} engine"))
+        pad["engine"] = engine
+
+    @staticmethod
+    def _record_voice_mode(song, track, old):
+        """Journals a voice_mode click (the panels cycle track.params in place)."""
+        song.history.record(DictEdit(track, track.params, {"voice_mode": (old, track.params["voice_mode"])},
+                                     "Voice mode"))
@@ -5,6 +5,7 @@ from containers.base_view import BaseView
 from components.note_type_toolbar import NoteTypeToolbar
 from components.piano_roll import PianoRoll
 from components.drum_roll import DrumRoll
+from utils.history import NoteAdd, NoteRemove, NoteResize
 
 class EditorView(BaseView):
     def __init__(self, font):
@@ -99,16 +100,22 @@ class EditorView(BaseView):
                     grid.scroll_y = max(0, min(127 * scale(GRID_HEIGHT), grid.scroll_y - event.y * scroll_speed))
                     
             if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
+                if track.frozen:
+                    # Baked audio would no longer match: unfreeze first
+                    self.toolbar.log("Frozen: unfreeze (F) to edit")
+                    return
                 tick, pitch = grid.get_tick_at(mx), grid.get_pitch_at(my)
                 q = QUANT_MAP[self.quantize]
                 quant_tick = (tick // q) * q
                 existing = next((n for n in track.notes if n.pitch == pitch and n.tick <= tick < n.tick + n.duration), None)
                 if existing:
                     track.notes.remove(existing)
+                    song.history.record(NoteRemove(track, existing))
                     self.toolbar.log(f"Del: {pitch}")
                 else:
                     grid.is_dragging = True
                     grid.current_note = track.add_note(quant_tick, pitch, q, velocity=int(self.input_velocity))
+                    song.history.record(NoteAdd(track, grid.current_note))
                     self.toolbar.log(f"Add: {pitch}")
                 song.is_dirty = True
 
@@ -117,7 +124,12 @@ class EditorView(BaseView):
                 if pygame.mouse.get_pressed()[0]: # Verified hold
                     q = QUANT_MAP[self.quantize]
                     mouse_tick = grid.get_tick_at(mx)
-                    grid.current_note.duration = max(q, ((mouse_tick // q) + 1) * q - grid.current_note.tick)
+                    note = grid.current_note
+                    new_duration = max(q, ((mouse_tick // q) + 1) * q - note.tick)
+                    if new_duration != note.duration:
+                        # Merges with the previous resize while the button is held
+                        song.history.record(NoteResize(track, note, note.duration, new_duration))
+                        note.duration = new_duration
                 else:
                     # Safety reset if we somehow missed the MOUSEBUTTONUP
                     grid.is_dragging = False
\ No newline at end of file
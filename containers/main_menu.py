@@ -23,6 +23,7 @@ class MainMenu(BaseView):
             "LOAD":       Button(0, 0, 250, 45, "LOAD PROJECT", GRAY),
             "SAVE":       Button(0, 0, 250, 45, "SAVE PROJECT", GRAY),
             "VIDEO":      Button(0, 0, 250, 45, "VIDEO SETTINGS", GRAY),
+            "QUALITY":    Button(0, 0, 250, 45, f"QUALITY: {DEFAULT_QUALITY}", GRAY),
             "EXIT":       Button(0, 0, 250, 45, "EXIT DAW", (150, 50, 50))
         }
 
@@ -34,6 +35,10 @@ class MainMenu(BaseView):
             "BACK":       Button(0, 0, 250, 50, "BACK", GRAY)
         }
 
+    def set_quality_label(self, quality):
+        """Shows the current render quality (DRAFT = cheaper live synthesis)."""
+        self.main_buttons["QUALITY"].text = f"QUALITY: {quality}"
+
     def _layout_buttons(self):
         """Centers buttons based on current UI_SCALE."""
         cx = WINDOW_W // 2
@@ -91,6 +96,7 @@ class MainMenu(BaseView):
                 if self.main_buttons["NEW"].is_clicked(event.pos): return "NEW"
                 if self.main_buttons["LOAD"].is_clicked(event.pos): return "LOAD"
                 if self.main_buttons["SAVE"].is_clicked(event.pos): return "SAVE"
+                if self.main_buttons["QUALITY"].is_clicked(event.pos): return "TOGGLE_QUALITY"
                 
                 if self.main_buttons["VIDEO"].is_clicked(event.pos): 
                     self.state = "VIDEO"
@@ -0,0 +1,143 @@
+# Blooper4/headless.py
+import threading
+from audio_engine.bridge import CPPSynthBridge
+from audio_engine.plugin_factory import PluginFactory
+from audio_engine.loop_cache import LoopCache
+from audio_engine.voice_cache import VoiceCache
+from audio_engine.graph import track_node_name
+from constants import SAMPLE_RATE, TICKS_PER_BAR
+from models import Song
+from utils.project_manager import ProjectManager
+from utils import wav_export
+
+# Scripting API: load, edit and render songs with no window, no mixer device
+# and no dialogs (servers, batch jobs, tests). Nothing here imports pygame,
+# tkinter or a plugin UI; sources and FX are the same Processors the DAW runs.
+#
+#   import headless
+#   song = headless.load_song("demo.bloopz")          # .bloopz / .bloop / .mid
+#   lead = song.tracks[0]
+#   headless.set_source(lead, "WAVETABLE_SYNTH", gain=0.8)
+#   lead.add_note(0, 60, 480, velocity=100)           # tick, pitch, duration
+#   headless.add_effect(lead, "PLATE_REVERB", mix=0.3)
+#   audio = headless.render(song)                     # float32 (samples, 2)
+#   headless.render_to_file(song, "demo.wav", sample_rate=48000)
+#   headless.save_song(song, "demo_edit.bloopz")
+#
+# Renders are one loop pass with the Mixer applied, exactly what
+# AudioManager.render_offline() bounces from the DAW.
+
+
+def new_song(bpm=120, bars=1):
+    song = Song()
+    song.bpm = bpm
+    song.length_ticks = bars * TICKS_PER_BAR
+    return song
+
+
+def load_song(path):
+    """Reads a project (or imports a .mid) with every track hydrated, ready to edit."""
+    song = ProjectManager.read(path)
+    song.hydrate()
+    return song
+
+
+def save_song(song, path):
+    """Synchronous save; the extension picks the format. Returns the timing stats."""
+    return ProjectManager.write(path, song)
+
+
+def set_source(track, plugin_id, **params):
+    """
+    Makes 'track' a SYNTH track played by 'plugin_id', starting from the
+    plugin's schema defaults ('params' override them).
+    """
+    processor = get_renderer().factory.get_source(plugin_id)
+    if processor is None:
+        raise ValueError(f"unknown source plugin '{plugin_id}'")
+    schema = getattr(processor, "SCHEMA", None)
+    # The three mode fields change together (see Track)
+    track.mode = "SYNTH"
+    track.is_drum = False
+    track.source_type = track.last_synth_source = plugin_id
+    track.source_params = {**(schema.defaults() if schema else {}), **params}
+
+
+def add_effect(track, effect_type, **params):
+    """Appends an effect (schema defaults + 'params') to the track's FX chain. Returns its dict."""
+    processor = get_renderer().factory.get_effect(effect_type)
+    if processor is None:
+        raise ValueError(f"unknown effect plugin '{effect_type}'")
+    schema = getattr(processor, "SCHEMA", None)
+    count = len(track.effects)
+    track.add_effect(effect_type, {**(schema.defaults() if schema else {}), **params})
+    if len(track.effects) == count:
+        raise ValueError("FX chain is full (8 effects)")
+    return track.effects[-1]
+
+
+class Renderer:
+    """
+    The offline half of AudioManager at one sample rate: PluginFactory +
+    LoopCache + RenderGraph, without pygame.
+
+    RE-RENDERING:
+    -------------
+    The LoopCache keeps every bar it rendered. Rendering the same song again
+    after an edit only re-synthesizes the bars the edit touched, so a script
+    tweaking one track in a loop pays for that track only. Use one Renderer
+    per song being edited (the cache follows whichever song was rendered last).
+    """
+    def __init__(self, sample_rate=SAMPLE_RATE, voice_cache=None):
+        self.sample_rate = int(sample_rate)
+        self.factory = PluginFactory(CPPSynthBridge(self.sample_rate))
+        # Optional VoiceCache: identical voices render once, across runs
+        self.voice_cache = voice_cache
+        self.loop_cache = LoopCache(self.factory, voice_cache=voice_cache)
+        self._lock = threading.Lock()
+
+    def render(self, song):
+        """One loop pass of the master: float32 (samples, 2)."""
+        with self._lock:
+            self.loop_cache.render(song)
+            return self.loop_cache.mix(song)
+
+    def render_stems(self, song):
+        """{track index: float32 (samples, 2)} post-fader, for every track with notes."""
+        with self._lock:
+            self.loop_cache.render(song)
+            used = [i for i, t in enumerate(song.tracks) if t.notes]
+            nodes = self.loop_cache.render_graph(song, [track_node_name(i) for i in used])
+        return {i: nodes[track_node_name(i)] for i in used}
+
+    def render_to_file(self, song, path):
+        """Bounces one loop pass to a 16-bit stereo WAV. Returns the path (None on failure)."""
+        return wav_export.write_wav(path, self.render(song), self.sample_rate)
+
+
+_RENDERERS = {}            # sample_rate -> shared Renderer (see get_renderer)
+_RENDERERS_LOCK = threading.Lock()
+
+
+def get_renderer(sample_rate=SAMPLE_RATE):
+    """
+    The shared Renderer for 'sample_rate' (created on first use). It uses the
+    on-disk VoiceCache like the DAW does; build a Renderer() directly for none.
+    """
+    with _RENDERERS_LOCK:
+        if sample_rate not in _RENDERERS:
+            _RENDERERS[sample_rate] = Renderer(sample_rate, voice_cache=VoiceCache())
+        return _RENDERERS[sample_rate]
+
+
+def render(song, sample_rate=SAMPLE_RATE):
+    """The song's loop with the Mixer applied: float32 (samples, 2) at 'sample_rate'."""
+    return get_renderer(sample_rate).render(song)
+
+
+def render_stems(song, sample_rate=SAMPLE_RATE):
+    return get_renderer(sample_rate).render_stems(song)
+
+
+def render_to_file(song, path, sample_rate=SAMPLE_RATE):
+    return get_renderer(sample_rate).render_to_file(song, path)
@@ -12,7 +12,7 @@ from models import Song
 from ui_components import MenuButton, Button
 from components.mixer_strip import ChannelStrip
 from audio_engine.manager import AudioManager
-from utils.project_manager import ProjectManager
+from utils.project_manager import ProjectManager, Autosaver, SAVER
 
 # 2. View Containers
 from containers.editor_view import EditorView
@@ -24,7 +24,11 @@ class Blooper4:
         pygame.init()
         self.screen = pygame.display.set_mode((WINDOW_W, WINDOW_H))
         pygame.display.set_caption(f"Blooper {VERSION}")
-        pygame.mixer.init(frequency=SAMPLE_RATE, size=-16, channels=2, buffer=BUFFER_SIZE)
+        try:
+            # float32 output: voices go to the mixer without an int16 conversion
+            pygame.mixer.init(frequency=SAMPLE_RATE, size=MIXER_SAMPLE_SIZE, channels=2, buffer=BUFFER_SIZE)
+        except pygame.error:
+            pygame.mixer.init(frequency=SAMPLE_RATE, size=-16, channels=2, buffer=BUFFER_SIZE)
         
         self.font = pygame.font.SysFont("Consolas", 12, bold=True)
         self.clock = pygame.time.Clock()
@@ -32,6 +36,7 @@ class Blooper4:
         # Core Engines
         self.song = Song()
         self.audio = AudioManager(self.song)
+        self.autosaver = Autosaver()
         
         # State
         self.view_mode = "EDITOR" 
@@ -74,9 +79,15 @@ class Blooper4:
                     self._check_and_trigger(prev_tick, self.song.length_ticks)
                     self.current_tick %= self.song.length_ticks
                     prev_tick = 0.0
+                    self._trigger_frozen(0)
                 self._check_and_trigger(prev_tick, self.current_tick)
+            # Edited tracks leave their (now stale) cached loop and play live
+            for track in self.song.history.pop_touched():
+                if track in self.song.tracks:
+                    self.audio.release_cached(self.song.tracks.index(track))
 
             self.audio.update(self.song)
+            self.autosaver.tick(self.song)  # Snapshot only; written on the saver thread
 
             # --- 2. UNIVERSAL EVENTS ---
             for event in pygame.event.get():
@@ -84,6 +95,7 @@ class Blooper4:
                 if event.type == pygame.MOUSEBUTTONUP:
                     for comp in ACTIVE_COMPONENTS: 
                         if hasattr(comp, 'global_release'): comp.global_release()
+                    self.song.history.end_gesture()  # Next edit = new undo step
 
                 # ROUTE: MENU
                 if self.view_mode == "MENU":
@@ -102,12 +114,28 @@ class Blooper4:
                         self.is_playing = not self.is_playing
                         if not self.is_playing:
                             self.audio.stop_all() # Kills sound on stop
+                        else:
+                            self._trigger_frozen(self.current_tick)
                     if event.key == pygame.K_TAB: self.view_mode = "BUILDER" if self.view_mode == "EDITOR" else "EDITOR"
-
+                    if event.key in (pygame.K_z, pygame.K_y) and event.mod & pygame.KMOD_CTRL:
+                        redo = event.key == pygame.K_y or event.mod & pygame.KMOD_SHIFT
+                        label = self.song.history.redo() if redo else self.song.history.undo()
+                        if label:  # The History marks the song dirty
+                            print(f"{'Redo' if redo else 'Undo'}: {label}")
                 # ROUTE: MIXER & CONTENT
+                # A strip only reacts to the mouse over it: skip (and don't watch) the others
+                mouse = [pygame.mouse.get_pos()] + ([event.pos] if hasattr(event, "pos") else [])
                 for i, strip in enumerate(self.mixer_strips):
-                    if strip.handle_event(event, self.song.tracks[i], UI_SCALE) == "SELECT":
+                    if not any(strip.rect.collidepoint(pos) for pos in mouse): continue
+                    # Mixer moves are journaled without a track: undoable even when frozen
+                    self.song.history.watch(None, self.song.tracks[i].params, f"Mixer {i + 1}")
+                    result = strip.handle_event(event, self.song.tracks[i], UI_SCALE)
+                    if self.song.history.end_watch():
+                        self.audio.update_loop_levels(self.song)
+                    if result == "SELECT":
                         self.active_track_idx = i
+                    elif result == "FREEZE":
+                        self.audio.toggle_freeze(i, self.song)
 
                 if self.view_mode == "EDITOR": self.editor_view.handle_event(event, self.song, self.active_track_idx)
                 elif self.view_mode == "BUILDER": self.builder_view.handle_event(event, self.song, self.active_track_idx)
@@ -132,8 +160,12 @@ class Blooper4:
             if new_song:
                 self.song = new_song
                 self.audio.current_song_ref = self.song
+                # Render every voice in the background while the UI is usable
+                self.audio.prewarm(self.song)
                 self.view_mode = "EDITOR"
         elif action == "TOGGLE_FS": self._toggle_fullscreen()
+        elif action == "TOGGLE_QUALITY":
+            self.main_menu.set_quality_label(self.audio.toggle_quality())
         elif action == "REBUILD_UI": self._refresh_layout()
 
     def _render_ui(self):
@@ -154,14 +186,26 @@ class Blooper4:
             self.btn_builder_tab.draw(self.screen, self.font)
             
             status = f"{'PLAY' if self.is_playing else 'STOP'} | BPM: {self.song.bpm} | TRACK: {self.active_track_idx+1}"
+            if self.audio.prewarmer.is_running:
+                done, total = self.audio.prewarmer.progress
+                status += f" | WARMING VOICES {done}/{total}"
             self.screen.blit(self.font.render(status, True, WHITE), (320, 25))
 
     def _check_and_trigger(self, start, end):
         for i, track in enumerate(self.song.tracks):
+            # Frozen and cached tracks play their loop instead (see _trigger_frozen)
+            if self.audio.is_frozen(track, self.song) or self.audio.plays_cached(i): continue
             for note in track.notes:
                 if start <= note.tick < end:
                     self.audio.play_note(i, track, note, self.song.bpm)
 
+    def _trigger_frozen(self, start_tick):
+        for i, track in enumerate(self.song.tracks):
+            if self.audio.is_frozen(track, self.song):
+                self.audio.play_frozen(i, track, start_tick, self.song.bpm)
+        # Unedited tracks play their cached loop, then the send/return buses
+        self.audio.start_pass(self.song, start_tick)
+
     def _toggle_fullscreen(self):
         import constants
         self.is_fullscreen = not self.is_fullscreen
@@ -181,6 +225,7 @@ class Blooper4:
         self.main_menu.rect = pygame.Rect(0, 0, WINDOW_W, WINDOW_H)
 
     def _quit_app(self):
+        SAVER.wait()  # Let a running save reach the disk
         self.audio.cleanup()
         pygame.quit(); sys.exit()
 
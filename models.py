@@ -1,8 +1,16 @@
 # Blooper4/models.py
-from constants import TPQN, NUM_TRACKS, DRUM_NOTE_START, DRUM_NOTE_END, SAMPLER_DEFAULT_START
+import copy
+import threading
+from collections.abc import MutableMapping
+from utils.history import History
+from constants import (TPQN, NUM_TRACKS, DRUM_NOTE_START, DRUM_NOTE_END, SAMPLER_DEFAULT_START, DEFAULT_RETURNS,
+                       BUILTIN_IR, MICROTONAL_DEFAULT)
 
 class Note:
     """Represents a single MIDI note event in the 4.0 schema."""
+    __slots__ = ("tick", "pitch", "duration", "velocity")  # Projects hold 100k+ of these
+    one_shot = False  # See OneShotNote
+
     def __init__(self, tick, pitch, duration, velocity=100):
         self.tick = tick
         self.pitch = pitch
@@ -18,6 +26,159 @@ class Note:
         """Factory method to recreate a note from a dictionary."""
         return cls(data['t'], data['p'], data['d'], data['v'])
 
+class OneShotNote(Note):
+    """
+    A note that plays to its natural end: note-off is ignored (drum pads).
+    Only built at render time (audio_engine/voice.py), never stored.
+    """
+    __slots__ = ()
+    one_shot = True
+
+class FrozenDict(dict):
+    """
+    A shared, read-only default (pad configs). Writing to it raises instead of
+    silently editing every track that shares it; copies are plain dicts.
+    """
+    __slots__ = ()
+
+    def _read_only(self, *args, **kwargs):
+        raise TypeError("shared default config is read-only (edit through track.sampler_map[pitch])")
+
+    __setitem__ = __delitem__ = update = pop = popitem = setdefault = clear = _read_only
+
+    def __reduce__(self):
+        return (dict, (dict(self),))   # deepcopy / pickle -> editable plain dict
+
+    def __reduce_ex__(self, protocol):
+        return self.__reduce__()
+
+
+def _freeze(value):
+    if isinstance(value, dict):
+        return FrozenDict({k: _freeze(v) for k, v in value.items()})
+    return value
+
+
+def _default_pad(p):
+    """A new pad: default Noise Drum settings."""
+    return {
+        "engine": "NOISE_DRUM",
+        "params": {
+            "pitch_hpf": 60,
+            "length": 0.3,
+            "type": "DRUM",
+            "gain": 1.0,
+            "transpose": 0,
+            "color": "WHITE",
+            "root_note": p  # CRITICAL: Neutral is the Pad number itself
+        },
+        "label": "",
+        "choke": 0  # Choke group (0 = none): closed hat cuts open hat
+    }
+
+
+# Flyweights: built once, shared by every track of every song
+DEFAULT_PADS = tuple(_freeze(_default_pad(p)) for p in range(128))
+LEGACY_DRUM_PADS = _freeze({p: {"type": "DRUM", "pitch": 60, "length": 0.3}
+                            for p in range(DRUM_NOTE_START, DRUM_NOTE_END + 1)})
+
+
+def _merge(default, data):
+    """'data' over 'default', nested dicts merged (old/partial pad configs)."""
+    result = copy.deepcopy(default)
+    for k, v in data.items():
+        result[k] = _merge(result[k], v) if isinstance(v, dict) and isinstance(result.get(k), dict) else v
+    return result
+
+
+class SamplerMap(MutableMapping):
+    """
+    The 128 pads of a SAMPLER track, copy-on-write.
+
+    COPY-ON-WRITE:
+    --------------
+    Untouched pads are the shared DEFAULT_PADS (read-only). Only edited pads
+    own a private config:
+      - get(p) / items() read: they may return the shared default. Never edit it.
+      - sampler_map[p] is the edit path: it copies the default on first access,
+        so 'track.sampler_map[p]["params"]["gain"] = 0.5' touches one track only.
+      - del sampler_map[p] resets a pad to its default.
+    edited() is what gets saved: pads that really differ from their default.
+    """
+    __slots__ = ("_own",)
+
+    def __init__(self, pads=None):
+        self._own = {}
+        for p, cfg in (pads or {}).items():
+            self.load_pad(int(p), cfg)
+
+    def load_pad(self, p, cfg):
+        """Saved pad (possibly partial / from an older version) -> owned only if it differs."""
+        default = DEFAULT_PADS[p] if 0 <= p < 128 else {}
+        cfg = _merge(default, cfg)
+        if cfg != default:
+            self._own[p] = cfg
+
+    def get(self, p, default=None):
+        cfg = self._own.get(p)
+        if cfg is not None:
+            return cfg
+        return DEFAULT_PADS[p] if isinstance(p, int) and 0 <= p < 128 else default
+
+    def __getitem__(self, p):
+        cfg = self._own.get(p)
+        if cfg is None:
+            if not (isinstance(p, int) and 0 <= p < 128):
+                raise KeyError(p)
+            cfg = self._own[p] = copy.deepcopy(DEFAULT_PADS[p])
+        return cfg
+
+    def __setitem__(self, p, cfg):
+        self._own[p] = cfg
+
+    def __delitem__(self, p):
+        self._own.pop(p, None)
+
+    def __contains__(self, p):
+        return p in self._own or (isinstance(p, int) and 0 <= p < 128)
+
+    def __iter__(self):
+        yield from range(128)
+        yield from sorted(p for p in self._own if not (isinstance(p, int) and 0 <= p < 128))
+
+    def __len__(self):
+        return 128 + sum(1 for p in self._own if not (isinstance(p, int) and 0 <= p < 128))
+
+    def items(self):
+        return [(p, self.get(p)) for p in self]
+
+    def values(self):
+        return [self.get(p) for p in self]
+
+    def snapshot(self, p):
+        """Render-thread copy of a pad (shared defaults are immutable: no copy needed)."""
+        cfg = self._own.get(p)
+        return copy.deepcopy(cfg) if cfg is not None else self.get(p)
+
+    def edited(self):
+        """Pads that differ from their default (what a save file stores)."""
+        return {p: cfg for p, cfg in self._own.items()
+                if not (0 <= p < 128 and cfg == DEFAULT_PADS[p])}
+
+
+def _column_lists(columns):
+    """t/p/d/v columns (numpy arrays or lists) -> plain Python lists."""
+    return [c.tolist() if hasattr(c, "tolist") else c for c in columns]
+
+
+def note_dicts(columns):
+    """t/p/d/v columns -> the note dicts to_dict() writes."""
+    return [{"t": t, "p": p, "d": d, "v": v} for t, p, d, v in zip(*_column_lists(columns))]
+
+
+_HYDRATE_LOCK = threading.Lock()   # UI, audio and loader threads may hydrate the same track
+
+
 class Track:
     """A 4.1 Mixer Channel. Can operate as a single Synth or a Multi-Instrument Sampler.
 
@@ -39,8 +200,17 @@ class Track:
       track.source_type = "PLUGIN_ID"     # Which plugin to display
 
     The 'mode' field is the authoritative source of truth for track behavior.
+
+    LAZY HYDRATION:
+    ---------------
+    from_dict() only reads the small fields (name, mode, mixer params...).
+    The saved notes and pads are kept raw and turned into Note objects /
+    a SamplerMap the first time 'notes' / 'sampler_map' is used, or earlier
+    by Song.hydrate_async(). Opening a project costs nothing per note.
     """
     def __init__(self, channel, is_drum=False):
+        self._raw_notes = None   # Saved notes not built yet (list of dicts or t/p/d/v columns)
+        self._raw_pads = None    # Saved sampler_map not built yet
         self.channel = channel
         self.name = "Sampler" if is_drum else f"Track {channel}"
 
@@ -79,12 +249,12 @@ class Track:
 
         # Piano roll settings (used in SYNTH mode)
         self.piano_roll_scale = "CHROMATIC"  # "CHROMATIC", "MODAL", or "MICROTONAL"
+        self.tuning = MICROTONAL_DEFAULT     # Played in MICROTONAL: "N-EDO" or a .scl file
 
         # ===== SAMPLER MODE DATA (NEW 4.1 ARCHITECTURE) =====
         # Used ONLY when mode == "SAMPLER"
         # Each MIDI pitch [0-127] has its own independent engine + parameters
-        self.sampler_map = {}  # Populated by _init_sampler_map()
-        self._init_sampler_map()
+        self.sampler_map = SamplerMap()  # Shared defaults until a pad is edited
 
         # ===== MIXER PARAMS (ALWAYS USED) =====
         # Applied regardless of mode (final stage of signal chain)
@@ -93,6 +263,8 @@ class Track:
             "pan": 0.5,
             "mute": False,
             "solo": False,
+            "voice_mode": "POLY",  # POLY / MONO / LEGATO (see VOICE_MODES)
+            "sends": {},           # Return bus name -> post-fader send level
         }
 
         # ===== LEGACY DRUM DATA (BACKWARD COMPATIBILITY) =====
@@ -100,33 +272,77 @@ class Track:
         # New code should use sampler_map instead
         # Keep this populated for backward compatibility with existing .bloop files
         # TODO: Eventually migrate noise_drum.py to use sampler_map directly
-        from constants import DRUM_NOTE_START, DRUM_NOTE_END
-        self.drum_pads = {
-            p: {"type": "DRUM", "pitch": 60, "length": 0.3}
-            for p in range(DRUM_NOTE_START, DRUM_NOTE_END + 1)
-        }
+        # Nothing edits these any more: one read-only table shared by all tracks
+        self.drum_pads = LEGACY_DRUM_PADS
 
         self.effects = [] 
         self.notes = []
 
-    def _init_sampler_map(self):
-        """Initializes all 128 pads with default Noise Drum settings."""
-        for p in range(0, 128):
-            self.sampler_map[p] = {
-                "engine": "NOISE_DRUM",
-                "params": {
-                    "pitch_hpf": 60, 
-                    "length": 0.3, 
-                    "type": "DRUM", 
-                    "gain": 1.0, 
-                    "transpose": 0,
-                    "color": "WHITE",
-                    "root_note": p  # CRITICAL: Neutral is the Pad number itself
-                },
-                "label": "" 
-            }
-    def to_dict(self):
-        """Standardized 4.1 serialization."""
+        # ===== FREEZE (BAKED AUDIO) =====
+        # A frozen track plays 'frozen_audio' (one pre-Mixer loop pass) instead
+        # of running its source + FX. freeze_info records what it was baked at.
+        # frozen_audio is runtime-only; on disk it is a sidecar .f32 file.
+        self.frozen = False
+        self.freeze_info = None
+        self.frozen_audio = None
+
+    # --- Lazily built state -------------------------------------------------
+    @property
+    def notes(self):
+        if self._raw_notes is not None:
+            self._hydrate_notes()
+        return self._notes
+
+    @notes.setter
+    def notes(self, value):
+        self._raw_notes = None
+        self._notes = value
+
+    @property
+    def sampler_map(self):
+        if self._raw_pads is not None:
+            self._hydrate_pads()
+        return self._sampler_map
+
+    @sampler_map.setter
+    def sampler_map(self, value):
+        self._raw_pads = None
+        self._sampler_map = value
+
+    @property
+    def hydrated(self):
+        return self._raw_notes is None and self._raw_pads is None
+
+    def _hydrate_notes(self):
+        with _HYDRATE_LOCK:
+            raw = self._raw_notes
+            if raw is None:
+                return  # Another thread got there first
+            if isinstance(raw, tuple):
+                # Columns (.bloopz / snapshot): t, p, d, v arrays or lists
+                notes = [Note(t, p, d, v) for t, p, d, v in zip(*_column_lists(raw))]
+            else:
+                notes = [Note.from_dict(n) for n in raw]
+            notes.sort(key=lambda x: x.tick)
+            self._notes = notes
+            self._raw_notes = None
+
+    def _hydrate_pads(self):
+        with _HYDRATE_LOCK:
+            raw = self._raw_pads
+            if raw is None:
+                return
+            # Missing pads are defaults (older files list all 128)
+            self._sampler_map = SamplerMap(raw)
+            self._raw_pads = None
+
+    def hydrate(self):
+        """Builds everything from_dict() deferred."""
+        if self._raw_notes is not None: self._hydrate_notes()
+        if self._raw_pads is not None: self._hydrate_pads()
+
+    def _settings_dict(self):
+        """Everything to_dict() saves except the notes."""
         return {
             "name": self.name,
             "is_drum": self.is_drum,
@@ -135,12 +351,45 @@ class Track:
             "last_synth_source": getattr(self, 'last_synth_source', self.source_type),  # Backward compat
             "source_params": self.source_params,
             "piano_roll_scale": getattr(self, 'piano_roll_scale', 'CHROMATIC'),
-            "sampler_map": {str(k): v for k, v in self.sampler_map.items()},
+            "tuning": self.tuning,
+            "sampler_map": {str(k): v for k, v in self.sampler_map.edited().items()},  # Edited pads only
             "params": self.params,
             "effects": self.effects,
-            "notes": [n.to_dict() for n in self.notes]
+            "frozen": self.frozen,
+            "freeze_info": self.freeze_info,
         }
-    
+
+    def to_dict(self):
+        """Standardized 4.1 serialization."""
+        data = self._settings_dict()
+        data["notes"] = [n.to_dict() for n in self.notes]
+        return data
+
+    def snapshot(self):
+        """
+        A copy of to_dict() another thread can serialize while the user keeps
+        editing: settings deep-copied (small), notes as 'note_columns'
+        (t, p, d, v lists) instead of one dict per note.
+        """
+        data = copy.deepcopy(self._settings_dict())
+        data["note_columns"] = self.note_columns()
+        return data
+
+    def note_columns(self):
+        """
+        The notes as (ticks, pitches, durations, velocities) columns, without
+        building Note objects: loaded columns are returned as they are, saved
+        note dicts are read straight into columns. Safe off the UI thread.
+        """
+        raw = self._raw_notes
+        if isinstance(raw, tuple):
+            return raw  # Never hydrated: the loaded arrays are still exact
+        if raw is not None:
+            return ([n['t'] for n in raw], [n['p'] for n in raw], [n['d'] for n in raw], [n['v'] for n in raw])
+        notes = list(self._notes)
+        return ([n.tick for n in notes], [n.pitch for n in notes],
+                [n.duration for n in notes], [n.velocity for n in notes])
+
     def from_dict(self, data):
         """Reconstructs track state from dictionary."""
         self.name = data.get('name', self.name)
@@ -149,27 +398,37 @@ class Track:
         self.source_type = data.get('source_type', self.source_type)
         self.last_synth_source = data.get('last_synth_source', self.source_type)  # Backward compat
         self.piano_roll_scale = data.get('piano_roll_scale', 'CHROMATIC')
+        self.tuning = data.get('tuning', MICROTONAL_DEFAULT)
 
         # Merge dictionaries to preserve default keys if the save file is from an older version
         self.source_params.update(data.get('source_params', {}))
         self.params.update(data.get('params', {}))
         self.effects = data.get('effects', [])
+        self.frozen = data.get('frozen', False)
+        self.freeze_info = data.get('freeze_info')
         
+        # Heavy parts: kept raw until first use (see LAZY HYDRATION)
         if 'sampler_map' in data:
-            s_map = data['sampler_map']
-            self.sampler_map = {int(k): v for k, v in s_map.items()}
-            
-        self.notes = [Note.from_dict(n) for n in data.get('notes', [])]
-        self.notes.sort(key=lambda x: x.tick)
-        
-    def add_effect(self, effect_type):
+            self.sampler_map = SamplerMap()
+            self._raw_pads = data['sampler_map']
+        self.notes = []
+        if 'note_columns' in data:
+            self._raw_notes = tuple(data['note_columns'])
+        elif data.get('notes'):
+            self._raw_notes = data['notes']
+
+    def add_effect(self, effect_type, params=None):
+        """'params': the plugin's schema defaults (PluginFactory), else the built-in table."""
         if len(self.effects) < 8:
             defaults = {
                 "EQ": {f"band_{i}": 1.0 for i in range(8)},
                 "REVERB": {"mix": 0.1, "size": 0.5},
-                "PLATE_REVERB": {"mix": 0.2, "decay": 0.6, "damping": 0.7, "predelay": 0.01}
+                "PLATE_REVERB": {"mix": 0.2, "decay": 0.6, "damping": 0.7, "predelay": 0.01},
+                "CONVOLUTION_REVERB": {"ir": BUILTIN_IR, "mix": 0.3}
             }
-            self.effects.append({"type": effect_type, "params": defaults.get(effect_type, {}), "active": True})
+            if params is None:
+                params = defaults.get(effect_type, {})
+            self.effects.append({"type": effect_type, "params": params, "active": True})
 
     def add_note(self, tick, pitch, duration, velocity=100):
         new_note = Note(tick, pitch, duration, velocity)
@@ -185,19 +444,76 @@ class Song:
         self.tracks = [Track(i+1, is_drum=(i==9)) for i in range(NUM_TRACKS)]
         self.is_dirty = False
         self.file_path = None
+        # Undo journal (runtime only, never saved); every journaled edit dirties the song
+        self.history = History(on_change=self.mark_dirty)
+
+        # Send/Return buses: one shared effect chain fed by every track's send
+        self.returns = [self.make_return(name) for name in DEFAULT_RETURNS]
+
+    # --- Unsaved changes ---
+    # is_dirty: differs from the file (cleared by a real save).
+    # autosave_pending: changed since the last recovery copy (cleared by any save).
+    @property
+    def is_dirty(self):
+        return self._dirty
+
+    @is_dirty.setter
+    def is_dirty(self, value):
+        self._dirty = value
+        self.autosave_pending = value
+
+    def mark_dirty(self):
+        self.is_dirty = True
+
+    @staticmethod
+    def make_return(name, effect_type="PLATE_REVERB"):
+        """A return bus running one 100% wet effect."""
+        defaults = {
+            "PLATE_REVERB": {"mix": 1.0, "decay": 0.6, "damping": 0.7, "predelay": 0.01},
+            "REVERB": {"mix": 1.0, "size": 0.5},
+            "CONVOLUTION_REVERB": {"ir": BUILTIN_IR, "mix": 1.0},
+        }
+        return {
+            "name": name,
+            "effects": [{"type": effect_type, "params": defaults.get(effect_type, {}), "active": True}],
+            "params": {"volume": 0.8, "pan": 0.5, "mute": False},
+        }
     
-    def to_dict(self):
-        """Master serialization for .bloop file saving."""
+    def _settings_dict(self):
         return {
             "version": "4.1.0",
             "bpm": self.bpm,
             "length_ticks": self.length_ticks,
-            "tracks": [t.to_dict() for t in self.tracks]
+            "returns": self.returns,
         }
 
+    def to_dict(self):
+        """Master serialization for .bloop file saving."""
+        data = self._settings_dict()
+        data["tracks"] = [t.to_dict() for t in self.tracks]
+        return data
+
+    def snapshot(self):
+        """to_dict() for background saving (see Track.snapshot)."""
+        data = copy.deepcopy(self._settings_dict())
+        data["tracks"] = [t.snapshot() for t in self.tracks]
+        return data
+
     def from_dict(self, data):
         self.bpm = data.get('bpm', 120)
         self.length_ticks = data.get('length_ticks', TPQN * 4)
+        if 'returns' in data:
+            self.returns = data['returns']
         for i, t_data in enumerate(data.get('tracks', [])):
             if i < len(self.tracks):
-                self.tracks[i].from_dict(t_data)
\ No newline at end of file
+                self.tracks[i].from_dict(t_data)
+
+    def hydrate(self):
+        for track in self.tracks:
+            track.hydrate()
+
+    def hydrate_async(self):
+        """Builds every track's notes/pads on a background thread (first use still works meanwhile)."""
+        worker = threading.Thread(target=self.hydrate, name="SongHydrate", daemon=True)
+        worker.start()
+        return worker
\ No newline at end of file
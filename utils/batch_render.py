@@ -0,0 +1,255 @@
+# Blooper4/utils/batch_render.py
+# Renders a folder of projects to WAV across a process pool.
+# Run from the project root:
+#   python -m utils.batch_render Save_Files/                 (every project in a folder)
+#   python -m utils.batch_render "songs/*.bloop" --out renders --workers 4 --rate 48000
+# Unchanged projects are skipped (see BATCH_MANIFEST); --force renders everything.
+import argparse
+import glob
+import hashlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import headless
+from constants import BATCH_MANIFEST, SAMPLE_RATE
+from audio_engine.plugin_factory import PluginFactory
+from utils.project_manager import ProjectManager
+from utils import wav_export
+
+PROJECT_EXTENSIONS = (".bloopz", ".bloop", ".mid", ".midi")
+
+try:
+    import resource   # Not on Windows: peak memory is reported as n/a there
+except ImportError:
+    resource = None
+
+
+# --- WORKER SIDE (one per process, reused for every file it gets) ---
+_RENDERER = None
+
+
+def _init_worker(sample_rate):
+    """
+    Pool initializer: one Renderer per worker, with every plugin module
+    loaded up front. Its VoiceCache and LoopCache stay warm across files.
+    """
+    global _RENDERER
+    _RENDERER = headless.get_renderer(sample_rate)
+    factory = _RENDERER.factory
+    for plugin_id in factory.source_registry:
+        factory.get_source(plugin_id)
+    for plugin_id in factory.effect_registry:
+        factory.get_effect(plugin_id)
+
+
+def _peak_mb():
+    """This process' RSS high-water mark in MB (None where unsupported)."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KB, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def used_plugins(song):
+    """Every plugin id the song renders with: sources that play notes, FX, returns."""
+    ids = set()
+    for track in song.tracks:
+        ids.update(fx["type"] for fx in track.effects)
+        if not track.notes:
+            continue
+        if track.mode == "SYNTH":
+            ids.add(track.source_type)
+        else:
+            for pitch in {n.pitch for n in track.notes}:
+                pad = track.sampler_map.get(pitch)
+                if pad:
+                    ids.add(pad["engine"])
+    for ret in song.returns:
+        ids.update(fx["type"] for fx in ret.get("effects", []))
+    return ids
+
+
+def render_file(path, wav_path):
+    """
+    Worker job: load + render + write one project. Returns a result dict
+    (the same keys on failure, with 'error' set).
+    """
+    result = {"path": path, "wav": wav_path, "error": None, "plugins": {}}
+    start = time.perf_counter()
+    try:
+        song = headless.load_song(path)
+        audio = _RENDERER.render(song)
+        if wav_export.write_wav(wav_path, audio, _RENDERER.sample_rate) is None:
+            raise OSError(f"could not write {wav_path}")
+        factory = _RENDERER.factory
+        result["plugins"] = {pid: factory.get_plugin_hash(pid) for pid in sorted(used_plugins(song))}
+        result["audio_s"] = len(audio) / _RENDERER.sample_rate
+    except Exception as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+    result["time_s"] = time.perf_counter() - start
+    result["peak_mb"] = _peak_mb()
+    return result
+
+
+# --- MAIN PROCESS ---
+def find_projects(patterns):
+    """Files, folders (every project inside) and globs -> sorted unique project paths."""
+    paths = []
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            matches = [os.path.join(pattern, f) for f in os.listdir(pattern)]
+        else:
+            # Globs are expanded here too (Windows shells pass them through)
+            matches = [m for m in glob.glob(pattern) if os.path.isfile(m)]
+            if not matches:
+                print(f"No project matches '{pattern}'")
+        paths += [m for m in matches if m.lower().endswith(PROJECT_EXTENSIONS)
+                  and ".autosave." not in os.path.basename(m)]
+    return sorted(set(os.path.abspath(p) for p in paths))
+
+
+def wav_path_for(path, out_dir=None):
+    name = os.path.splitext(os.path.basename(path))[0] + ".wav"
+    return os.path.join(out_dir or os.path.dirname(path), name)
+
+
+def content_hash(path):
+    with open(path, 'rb') as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+
+def load_manifest(path=BATCH_MANIFEST):
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_manifest(manifest, path=BATCH_MANIFEST):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    ProjectManager.write_atomic(path, json.dumps(manifest, indent=1, sort_keys=True).encode("utf-8"))
+
+
+def is_up_to_date(entry, project_hash, sample_rate, wav_path, plugin_hash):
+    """The WAV exists and was rendered from these exact bytes with today's plugin code."""
+    return (entry is not None and os.path.exists(wav_path)
+            and entry.get("project") == project_hash
+            and entry.get("sample_rate") == sample_rate
+            and all(plugin_hash(pid) == h for pid, h in entry.get("plugins", {}).items()))
+
+
+def print_summary(results, skipped, wall_s):
+    rows = sorted(results, key=lambda r: r["path"])
+    width = max([len(os.path.basename(r["path"])) for r in rows + skipped] + [7])
+    print(f"\n{'PROJECT':{width}}  STATUS    TIME s  AUDIO s    RTF  PEAK MB")
+    for r in rows:
+        name = os.path.basename(r["path"])
+        peak = f"{r['peak_mb']:8.1f}" if r["peak_mb"] is not None else "     n/a"
+        if r["error"]:
+            print(f"{name:{width}}  ERROR   {r['time_s']:7.2f}        -      -  {peak}   {r['error']}")
+        else:
+            rtf = r["time_s"] / r["audio_s"] if r["audio_s"] else 0.0
+            print(f"{name:{width}}  OK      {r['time_s']:7.2f}  {r['audio_s']:7.2f}  {rtf:5.2f}  {peak}")
+    for r in skipped:
+        print(f"{os.path.basename(r['path']):{width}}  SKIPPED (unchanged)")
+    done = [r for r in rows if not r["error"]]
+    audio_s = sum(r["audio_s"] for r in done)
+    print(f"\n{len(done)} rendered, {len(skipped)} skipped, {len(rows) - len(done)} failed "
+          f"in {wall_s:.2f} s wall ({audio_s:.1f} s of audio"
+          f"{f', {wall_s / audio_s:.2f}x real time overall' if audio_s else ''})")
+    print("RTF = render time / audio length (below 1 is faster than real time); "
+          "PEAK MB = the worker process' memory high-water mark.")
+
+
+def batch_render(patterns, out_dir=None, workers=None, sample_rate=SAMPLE_RATE, force=False,
+                 manifest_path=BATCH_MANIFEST):
+    """
+    Renders every project matched by 'patterns' to WAV. Returns the list of
+    result dicts (skipped files excluded).
+
+    SKIPPING:
+    ---------
+    The manifest maps each WAV to the sha1 of the project file it came from
+    and the hashes of the plugins that rendered it. A project is skipped when
+    its bytes, the sample rate and those plugins are all unchanged (and the
+    WAV is still there). Frozen tracks are re-synthesized like any other.
+    """
+    start = time.perf_counter()
+    projects = find_projects(patterns)
+    if not projects:
+        print("No projects found.")
+        return []
+    if out_dir:
+        os.makedirs(out_dir, exist_ok=True)
+
+    # 1. Plugin hashes only hash the Processor files: no bridge needed here
+    hashes = PluginFactory(None, sample_rate)
+    manifest = load_manifest(manifest_path)
+    jobs, skipped = [], []
+    for path in projects:
+        wav_path = os.path.abspath(wav_path_for(path, out_dir))
+        project_hash = content_hash(path)
+        if not force and is_up_to_date(manifest.get(wav_path), project_hash, sample_rate,
+                                       wav_path, hashes.get_plugin_hash):
+            skipped.append({"path": path, "wav": wav_path})
+            continue
+        jobs.append((path, wav_path, project_hash))
+
+    if not jobs:
+        print_summary([], skipped, time.perf_counter() - start)
+        return []
+
+    # 2. Biggest files first: the pool finishes on small jobs, not one long one
+    jobs.sort(key=lambda job: os.path.getsize(job[0]), reverse=True)
+    workers = max(1, min(workers or os.cpu_count() or 1, len(jobs)))
+    print(f"Rendering {len(jobs)} project(s) at {sample_rate} Hz on {workers} worker(s), "
+          f"{len(skipped)} unchanged.")
+
+    results = []
+
+    def finished(result, project_hash):
+        results.append(result)
+        if result["error"]:
+            print(f"ERROR {os.path.basename(result['path'])}: {result['error']}")
+            manifest.pop(result["wav"], None)
+        else:
+            manifest[result["wav"]] = {"project": project_hash, "sample_rate": sample_rate,
+                                       "plugins": result["plugins"], "source": result["path"]}
+        save_manifest(manifest, manifest_path)   # After every file: Ctrl+C keeps the progress
+
+    # 3. One worker: render in this process (no pool start-up)
+    if workers == 1:
+        _init_worker(sample_rate)
+        for path, wav_path, project_hash in jobs:
+            finished(render_file(path, wav_path), project_hash)
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(sample_rate,)) as pool:
+            futures = {pool.submit(render_file, path, wav_path): project_hash
+                       for path, wav_path, project_hash in jobs}
+            for future in as_completed(futures):
+                finished(future.result(), futures[future])
+
+    print_summary(results, skipped, time.perf_counter() - start)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m utils.batch_render",
+                                     description="Render Blooper projects to WAV across a process pool.")
+    parser.add_argument("projects", nargs="+", help="project files, folders or globs")
+    parser.add_argument("--out", help="folder for the WAVs (default: next to each project)")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--rate", type=int, default=SAMPLE_RATE, help=f"sample rate (default: {SAMPLE_RATE})")
+    parser.add_argument("--force", action="store_true", help="render unchanged projects too")
+    args = parser.parse_args(argv)
+    results = batch_render(args.projects, args.out, args.workers, args.rate, args.force)
+    return 1 if any(r["error"] for r in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
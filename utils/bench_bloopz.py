@@ -0,0 +1,61 @@
+# Blooper4/utils/bench_bloopz.py
+# Save/open/load time and file size: .bloop (JSON) vs .bloopz.
+# Run from the project root:  python -m utils.bench_bloopz [project files...]
+import os
+import sys
+import random
+import tempfile
+import time
+from constants import TPQN
+from models import Song
+from utils.project_manager import ProjectManager
+
+def build_large_song(notes_per_track=5000, seed=1):
+    """A busy project: every track full of notes, edited pads and FX."""
+    rng = random.Random(seed)
+    song = Song()
+    song.length_ticks = TPQN * 4 * 256
+    for track in song.tracks:
+        for _ in range(notes_per_track):
+            track.add_note(rng.randrange(song.length_ticks), rng.randrange(24, 108),
+                           rng.choice([TPQN // 4, TPQN // 2, TPQN]), rng.randrange(40, 128))
+        track.source_params["volume"] = round(rng.uniform(0.2, 1.0), 2)
+        for pad in rng.sample(sorted(track.sampler_map), 12):
+            track.sampler_map[pad]["params"]["gain"] = round(rng.uniform(0.2, 1.5), 2)
+        track.add_effect("REVERB")
+        track.add_effect("EQ")
+    return song
+
+def _best_of(runs, fn):
+    best = float("inf")
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def bench(song, label, runs=3):
+    """
+    Prints save ms, open ms (lazy: until the UI can show the project), full
+    load ms (every track hydrated) and size per format; checks round-trips.
+    """
+    expected = song.to_dict()
+    print(f"--- {label} ({sum(len(t.notes) for t in song.tracks)} notes) ---")
+    with tempfile.TemporaryDirectory() as folder:
+        for ext in (".bloop", ".bloopz"):
+            path = os.path.join(folder, "bench" + ext)
+            save_s = _best_of(runs, lambda: ProjectManager.write(path, song))
+            open_s = _best_of(runs, lambda: ProjectManager.read(path))
+            load_s = _best_of(runs, lambda: ProjectManager.read(path).hydrate())
+            same = ProjectManager.read(path).to_dict() == expected
+            print(f"{ext:8} save {save_s * 1000:7.1f} ms   open {open_s * 1000:6.1f} ms   "
+                  f"full load {load_s * 1000:7.1f} ms   size {os.path.getsize(path) / 1024:9.1f} KB   round-trip {'OK' if same else 'MISMATCH'}")
+    song.file_path = None
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        for path in sys.argv[1:]:
+            bench(ProjectManager.read(path), os.path.basename(path))
+    else:
+        bench(Song(), "empty project")
+        bench(build_large_song(), "16 tracks x 5000 notes")
@@ -0,0 +1,162 @@
+# Blooper4/utils/bloopz.py
+import io
+import json
+import zipfile
+import numpy as np
+from models import Song
+
+# .bloopz = a zip (deflate) holding:
+#   header.json        song dict WITHOUT notes, as a patch against defaults.json
+#   defaults.json      the baseline the patch was made against: Song() defaults
+#                      of the Blooper that saved it (format 2+), so a later
+#                      version with other defaults still reads it back exactly
+#   notes/<col>.i32    one little-endian int32 array per note column, every
+#                      track's notes back to back (header 'note_counts' splits them).
+#                      't' is stored as deltas: notes are tick-sorted, so the
+#                      deltas are small and deflate much better than raw ticks.
+FORMAT = "bloopz"
+FORMAT_VERSION = 2                    # 2: defaults.json (1: patched against the running Song())
+NOTE_COLUMNS = ("t", "p", "d", "v")   # Same keys as Note.to_dict()
+_DELETED = "__deleted__"              # Patch entry: keys the default has but the project dropped
+_SAME = object()                      # _diff(): nothing to store
+
+
+def _diff(default, value):
+    """
+    Patch turning 'default' into 'value'. Dicts are patched key by key (only
+    what differs is stored); anything else is replaced whole.
+    """
+    if isinstance(default, dict) and isinstance(value, dict):
+        patch = {}
+        for k, v in value.items():
+            p = _diff(default[k], v) if k in default else _literal(v)
+            if p is not _SAME:
+                patch[k] = p
+        removed = [k for k in default if k not in value]
+        if removed:
+            patch[_DELETED] = removed
+        return patch if patch else _SAME
+    if type(default) is type(value) and default == value:
+        return _SAME
+    return _literal(value)
+
+
+def _literal(value):
+    """A new value as a patch: dicts are patched onto {} by _patch()."""
+    if isinstance(value, dict):
+        patch = _diff({}, value)
+        return {} if patch is _SAME else patch
+    return value
+
+
+def _as_patch(patch):
+    return {} if patch is _SAME else patch
+
+
+def _patch(default, patch):
+    if not isinstance(patch, dict):
+        return patch
+    result = dict(default) if isinstance(default, dict) else {}
+    for k in patch.get(_DELETED, []):
+        result.pop(k, None)
+    for k, p in patch.items():
+        if k != _DELETED:
+            result[k] = _patch(result.get(k), p)
+    return result
+
+
+def _defaults():
+    """
+    The baseline every project is diffed against: a new, empty Song, its
+    tracks split out (each track is patched against the same new track).
+    """
+    data = Song().to_dict()
+    tracks = data.pop("tracks")
+    for t in tracks:
+        t.pop("notes", None)
+    return data, tracks
+
+
+def encode(data):
+    """Song.to_dict() or Song.snapshot() -> .bloopz bytes."""
+    # 1. Notes leave the dict and become columns (snapshots already have them)
+    tracks = [dict(t) for t in data.get("tracks", [])]
+    counts = []
+    parts = {c: [] for c in NOTE_COLUMNS}
+    for t in tracks:
+        notes = t.pop("notes", None) or []
+        columns = t.pop("note_columns", None)
+        if columns is None:
+            columns = [[n[c] for n in notes] for c in NOTE_COLUMNS]
+        counts.append(len(columns[0]))
+        for c, values in zip(NOTE_COLUMNS, columns):
+            parts[c].append(np.asarray(values, dtype=np.float64))
+    song = {k: v for k, v in data.items() if k != "tracks"}
+
+    # 2. Everything else: only what differs from a new project (the baseline
+    # travels with the file, see defaults.json)
+    default_song, default_tracks = _defaults()
+    header = {
+        "format": FORMAT,
+        "format_version": FORMAT_VERSION,
+        "note_counts": counts,
+        "song": _as_patch(_diff(default_song, song)),
+        "tracks": [_as_patch(_diff(default_tracks[i] if i < len(default_tracks) else {}, t))
+                   for i, t in enumerate(tracks)],
+    }
+
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED, compresslevel=6) as zf:
+        zf.writestr("header.json", json.dumps(header, separators=(",", ":")))
+        zf.writestr("defaults.json", json.dumps({"song": default_song, "tracks": default_tracks},
+                                                separators=(",", ":")))
+        for c in NOTE_COLUMNS:
+            # Ticks are integers (TPQN grid); rint guards against float drift
+            col = np.rint(np.concatenate(parts[c] or [np.zeros(0)])).astype(np.int64)
+            if c == "t":
+                col = np.diff(col, prepend=0)
+            zf.writestr(f"notes/{c}.i32", col.astype("<i4").tobytes())
+    return buffer.getvalue()
+
+
+def decode(blob, lazy=False):
+    """
+    .bloopz bytes -> a dict Song.from_dict() accepts. lazy=True hands each
+    track its int32 column slices ('note_columns') instead of note dicts:
+    Track builds its Notes from them on first use.
+    """
+    with zipfile.ZipFile(io.BytesIO(blob)) as zf:
+        header = json.loads(zf.read("header.json"))
+        if header.get("format") != FORMAT:
+            raise ValueError("not a .bloopz project")
+        if header.get("format_version", 0) > FORMAT_VERSION:
+            raise ValueError(f"saved by a newer Blooper (format {header['format_version']})")
+        columns = {c: np.frombuffer(zf.read(f"notes/{c}.i32"), dtype="<i4") for c in NOTE_COLUMNS}
+        # Format 1 stored no baseline: today's defaults are the best guess
+        baseline = json.loads(zf.read("defaults.json")) if "defaults.json" in zf.namelist() else None
+    columns["t"] = np.cumsum(columns["t"], dtype=np.int64)
+
+    if baseline is not None:
+        default_song, default_tracks = baseline["song"], baseline["tracks"]
+    else:
+        default_song, default_tracks = _defaults()
+    data = _patch(default_song, header.get("song", {}))
+    data["tracks"] = [_patch(default_tracks[i] if i < len(default_tracks) else {}, p)
+                      for i, p in enumerate(header.get("tracks", []))]
+
+    # Columns back to per-track notes (plain ints for the models)
+    start = 0
+    lists = None if lazy else {c: columns[c].tolist() for c in NOTE_COLUMNS}
+    for t, count in zip(data["tracks"], header.get("note_counts", [])):
+        end = start + count
+        if lazy:
+            t["note_columns"] = tuple(columns[c][start:end] for c in NOTE_COLUMNS)
+        else:
+            t["notes"] = [{"t": tk, "p": p, "d": d, "v": v} for tk, p, d, v in
+                          zip(*(lists[c][start:end] for c in NOTE_COLUMNS))]
+        start = end
+    return data
+
+
+def is_bloopz(path):
+    return path.lower().endswith(".bloopz")
@@ -0,0 +1,57 @@
+# Blooper4/utils/freeze_store.py
+import os
+import numpy as np
+
+# Frozen tracks live next to the project as raw float32 mono files:
+#   my_song.bloop  ->  my_song.track01.f32, my_song.track10.f32, ...
+SIDECAR_EXT = ".f32"
+
+
+def sidecar_path(project_path, track):
+    """Returns the sidecar file path for a track of a saved project."""
+    base, _ = os.path.splitext(project_path)
+    return f"{base}.track{track.channel:02d}{SIDECAR_EXT}"
+
+
+def write_sidecar(project_path, track):
+    """Writes the track's frozen audio next to the project. Returns the path."""
+    if track.frozen_audio is None:
+        return None
+    path = sidecar_path(project_path, track)
+    audio = track.frozen_audio
+    if isinstance(audio, np.memmap) and audio.filename and os.path.abspath(audio.filename) == os.path.abspath(path):
+        return path  # Already this file (re-save): rewriting a mapped file is unsafe
+    # Temp file + rename: a crash mid-write keeps the old sidecar
+    tmp = f"{path}.tmp"
+    np.asarray(audio, dtype=np.float32).tofile(tmp)
+    os.replace(tmp, path)
+    # Re-open as a memory map so the RAM copy can be dropped
+    track.frozen_audio = np.memmap(path, dtype=np.float32, mode='r')
+    return path
+
+
+def load_sidecar(project_path, track):
+    """
+    Memory-maps a frozen track's audio. If the file is missing, the track
+    is unfrozen so it falls back to live synthesis.
+    """
+    path = sidecar_path(project_path, track)
+    if not os.path.exists(path) or os.path.getsize(path) == 0:
+        print(f"Freeze: sidecar missing for track {track.channel}, unfreezing.")
+        track.frozen = False
+        track.freeze_info = None
+        track.frozen_audio = None
+        return None
+    track.frozen_audio = np.memmap(path, dtype=np.float32, mode='r')
+    return track.frozen_audio
+
+
+def remove_sidecar(project_path, track):
+    """Deletes a track's sidecar after it has been unfrozen."""
+    path = sidecar_path(project_path, track)
+    try:
+        if os.path.exists(path):
+            os.remove(path)
+    except OSError as e:
+        # Windows refuses while an old memory map is still alive; harmless
+        print(f"Freeze: could not remove {path}: {e}")
@@ -0,0 +1,266 @@
+# Blooper4/utils/history.py
+import bisect
+from collections import deque
+from constants import UNDO_LIMIT
+
+_MISSING = object()   # DictEdit: the key did not exist
+
+
+class NoteAdd:
+    """A note entered the track. Undo removes that same Note object."""
+    label = "Add note"
+
+    def __init__(self, track, note):
+        self.track, self.note = track, note
+
+    def undo(self):
+        _remove_note(self.track.notes, self.note)
+
+    def redo(self):
+        _insert_note(self.track.notes, self.note)
+
+    def merge(self, other):
+        """
+        The drag that sizes a new note is part of adding it: redo re-inserts
+        the same Note object, which already holds the final duration.
+        """
+        return type(other) is NoteResize and other.note is self.note
+
+
+class NoteRemove(NoteAdd):
+    """A note left the track (the inverse of NoteAdd)."""
+    label = "Delete note"
+
+    def undo(self):
+        _insert_note(self.track.notes, self.note)
+
+    def redo(self):
+        _remove_note(self.track.notes, self.note)
+
+    def merge(self, other):
+        return False
+
+
+class NoteResize:
+    """A note's duration changed. A drag keeps merging into one entry."""
+    label = "Resize note"
+
+    def __init__(self, track, note, old, new):
+        self.track, self.note, self.old, self.new = track, note, old, new
+
+    def undo(self):
+        self.note.duration = self.old
+
+    def redo(self):
+        self.note.duration = self.new
+
+    def merge(self, other):
+        if type(other) is not NoteResize or other.note is not self.note:
+            return False
+        self.new = other.new
+        return True
+
+
+class DictEdit:
+    """
+    Changed keys of one params dict: {key: (old, new)}. Only the keys that
+    changed are stored, whatever the size of the dict.
+    """
+    def __init__(self, track, target, changes, label="Edit"):
+        self.track, self.target, self.changes, self.label = track, target, changes, label
+
+    def _apply(self, index):
+        for key, values in self.changes.items():
+            value = values[index]
+            if value is _MISSING:
+                self.target.pop(key, None)
+            else:
+                self.target[key] = _copy_value(value)
+
+    def undo(self):
+        self._apply(0)
+
+    def redo(self):
+        self._apply(1)
+
+    def merge(self, other):
+        """Same dict, same keys (a slider drag): keep the first 'old', take the last 'new'."""
+        if type(other) is not DictEdit or other.target is not self.target or other.changes.keys() != self.changes.keys():
+            return False
+        self.changes = {k: (self.changes[k][0], other.changes[k][1]) for k in self.changes}
+        return True
+
+
+class AttrEdit:
+    """One attribute of an object (a track's source_type) before/after."""
+    def __init__(self, track, target, name, old, new, label="Edit"):
+        self.track, self.target, self.name, self.old, self.new, self.label = track, target, name, old, new, label
+
+    def undo(self):
+        setattr(self.target, self.name, self.old)
+
+    def redo(self):
+        setattr(self.target, self.name, self.new)
+
+    def merge(self, other):
+        return False
+
+
+class AttrsEdit:
+    """Several attributes changed by one click (a track's mode switch): {name: (old, new)}."""
+    def __init__(self, track, target, changes, label="Edit"):
+        self.track, self.target, self.changes, self.label = track, target, changes, label
+
+    def undo(self):
+        for name, (old, _) in self.changes.items():
+            setattr(self.target, name, old)
+
+    def redo(self):
+        for name, (_, new) in self.changes.items():
+            setattr(self.target, name, new)
+
+    def merge(self, other):
+        return False
+
+
+class ListEdit:
+    """A short list (an FX chain) before/after an add or delete. Items are shared, not copied."""
+    def __init__(self, track, target, old, new, label="Edit"):
+        self.track, self.target, self.old, self.new, self.label = track, target, old, new, label
+
+    def undo(self):
+        self.target[:] = self.old
+
+    def redo(self):
+        self.target[:] = self.new
+
+    def merge(self, other):
+        return False
+
+
+def _note_tick(note):
+    return note.tick
+
+
+def _insert_note(notes, note):
+    # Tick order is kept by every editor path (Track.add_note sorts)
+    notes.insert(bisect.bisect_right(notes, note.tick, key=_note_tick), note)
+
+
+def _remove_note(notes, note):
+    # Bisect to the notes sharing its tick, then find this exact object there
+    lo = bisect.bisect_left(notes, note.tick, key=_note_tick)
+    hi = bisect.bisect_right(notes, note.tick, lo=lo, key=_note_tick)
+    for i in range(lo, hi):
+        if notes[i] is note:
+            del notes[i]
+            return
+    # Out of tick order (should not happen): fall back to a full scan
+    try:
+        notes.remove(note)
+    except ValueError:
+        pass
+
+
+def _copy_value(value):
+    """Mutable values (wavetables, sends) are copied so later edits in place can be diffed."""
+    if isinstance(value, list):
+        return list(value)
+    if isinstance(value, dict):
+        return dict(value)
+    return value
+
+
+def _shallow(target):
+    return {k: _copy_value(v) for k, v in target.items()}
+
+
+class History:
+    """
+    The undo journal of one Song: small invertible entries, never copies
+    of the song.
+
+    JOURNAL:
+    --------
+    - record(entry) pushes an edit the UI already applied and clears redo.
+      While a gesture is open (mouse held), an entry that merges into the
+      previous one (same slider / same note) updates it instead: one drag =
+      one undo step.
+    - undo()/redo() pop one entry and apply its inverse: O(1) in the
+      history length. Memory is bounded to UNDO_LIMIT entries, each holding
+      only the values that changed.
+    - watch(track, target) / end_watch() diff a small params dict around a
+      UI call, for UIs that edit their dict directly (plugin UIs, mixer).
+    - pop_touched() hands the transport the tracks edited (or undone) since
+      it last asked: their cached loops are stale for the rest of the pass.
+    - on_change() (the Song marking itself dirty) runs after every recorded,
+      undone or redone edit: anything journaled is an unsaved change.
+    """
+    def __init__(self, limit=UNDO_LIMIT, on_change=None):
+        self.undo_stack = deque(maxlen=limit)
+        self.redo_stack = deque(maxlen=limit)
+        self._gesture_open = False
+        self._watched = None
+        self.touched = set()
+        self.on_change = on_change
+
+    def pop_touched(self):
+        touched, self.touched = self.touched, set()
+        return touched
+
+    def record(self, entry):
+        if entry.track is not None:
+            self.touched.add(entry.track)
+        if self.on_change:
+            self.on_change()
+        self.redo_stack.clear()
+        if self._gesture_open and self.undo_stack and self.undo_stack[-1].merge(entry):
+            return
+        self.undo_stack.append(entry)
+        self._gesture_open = True
+
+    def end_gesture(self):
+        """Mouse released: the next edit starts a new entry."""
+        self._gesture_open = False
+
+    def watch(self, track, target, label="Edit"):
+        self._watched = (track, target, _shallow(target), label)
+
+    def end_watch(self):
+        """Records what changed in the watched dict since watch(). Returns True if anything did."""
+        if self._watched is None:
+            return False
+        track, target, before, label = self._watched
+        self._watched = None
+        changes = {k: (before.get(k, _MISSING), _copy_value(v))
+                   for k, v in target.items() if before.get(k, _MISSING) != v}
+        changes.update({k: (v, _MISSING) for k, v in before.items() if k not in target})
+        if not changes:
+            return False
+        self.record(DictEdit(track, target, changes, label))
+        return True
+
+    def _step(self, source, dest, apply):
+        if not source:
+            return None
+        entry = source[-1]
+        track = entry.track
+        if track is not None and track.frozen:
+            print(f"Undo: track {track.channel} is frozen, unfreeze (F) first")
+            return None
+        source.pop()
+        getattr(entry, apply)()
+        if track is not None:
+            self.touched.add(track)
+        if self.on_change:
+            self.on_change()
+        dest.append(entry)
+        self._gesture_open = False
+        return entry.label
+
+    def undo(self):
+        """Reverts the newest entry. Returns its label (None if nothing to undo)."""
+        return self._step(self.undo_stack, self.redo_stack, "undo")
+
+    def redo(self):
+        return self._step(self.redo_stack, self.undo_stack, "redo")
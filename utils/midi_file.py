@@ -0,0 +1,212 @@
+# Blooper4/utils/midi_file.py
+import struct
+from constants import TPQN, TICKS_PER_BAR, NUM_TRACKS
+from models import Song
+
+# Standard MIDI Files (SMF) type 0 and 1, no dependencies.
+#   Import: MIDI channel N (1-16) -> Track.channel N; channel 10 -> SAMPLER
+#           track. Ticks are rescaled from the file's PPQ to TPQN. The first
+#           tempo event sets Song.bpm (Blooper has one tempo per song).
+#   Export: type 1, PPQ = TPQN. Track 0 = tempo + 4/4, then one MTrk per
+#           track that has notes, on its own channel.
+DRUM_CHANNEL = 9                       # 0-based: MIDI channel 10
+_DATA_BYTES = {0x8: 2, 0x9: 2, 0xA: 2, 0xB: 2, 0xC: 1, 0xD: 1, 0xE: 2}
+
+
+def _read_vlq(data, pos):
+    value = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        value = (value << 7) | (byte & 0x7F)
+        if byte < 0x80:
+            return value, pos
+
+
+def _write_vlq(value):
+    out = bytearray([value & 0x7F])
+    value >>= 7
+    while value:
+        out.insert(0, (value & 0x7F) | 0x80)
+        value >>= 7
+    return bytes(out)
+
+
+def _chunks(data):
+    pos = 0
+    while pos + 8 <= len(data):
+        kind, size = data[pos:pos + 4], struct.unpack(">I", data[pos + 4:pos + 8])[0]
+        yield kind, pos + 8, min(pos + 8 + size, len(data))
+        pos += 8 + size
+
+
+def parse(data):
+    """
+    SMF bytes -> (ppq, tempo in us per quarter or None, notes, names).
+    notes: {channel 0-15: [(tick, pitch, duration, velocity), ...]} in file
+    PPQ, each list sorted once at the end (one pass over the events, no
+    per-note inserts). names: {channel: track name} for MTrks using one channel.
+    """
+    if data[:4] != b"MThd":
+        raise ValueError("not a Standard MIDI File (no MThd header)")
+    if len(data) < 14:
+        raise ValueError("truncated MIDI header")
+    fmt, n_tracks, division = struct.unpack(">HHH", data[8:14])
+    if fmt > 1:
+        raise ValueError(f"SMF type {fmt} is not supported (type 0 and 1 only)")
+    # Division: bit 15 set = SMPTE frames/ticks, else ticks per quarter note
+    if division & 0x8000:
+        fps = 256 - (division >> 8)
+        raise ValueError(f"SMPTE time division ({fps} fps, {division & 0xFF} ticks/frame) is not supported: "
+                         "re-export the file with a PPQ (ticks per quarter) division")
+    if division == 0:
+        raise ValueError("invalid MIDI header: 0 ticks per quarter note")
+    ppq = division
+
+    notes = {}
+    names = {}
+    tempo = None
+    for kind, pos, end in _chunks(data):
+        if kind != b"MTrk":
+            continue
+        tick = 0
+        status = 0
+        open_notes = {}      # (channel, pitch) -> [(start, velocity), ...] FIFO
+        channels = set()
+        name = None
+        while pos < end:
+            delta, pos = _read_vlq(data, pos)
+            tick += delta
+            byte = data[pos]
+            if byte >= 0x80:
+                status = byte
+                pos += 1
+            elif status < 0x80:
+                raise ValueError("running status without a previous status byte")
+
+            if status == 0xFF:
+                # Meta: type, length, payload
+                meta = data[pos]
+                size, pos = _read_vlq(data, pos + 1)
+                if meta == 0x51 and tempo is None and size == 3:
+                    tempo = (data[pos] << 16) | (data[pos + 1] << 8) | data[pos + 2]
+                elif meta == 0x03 and name is None:
+                    name = data[pos:pos + size].decode("latin-1").strip()
+                elif meta == 0x2F:
+                    break
+                pos += size
+                status = 0   # Meta/sysex cancel running status
+                continue
+            if status in (0xF0, 0xF7):
+                size, pos = _read_vlq(data, pos)
+                pos += size
+                status = 0
+                continue
+
+            kind_nibble, channel = status >> 4, status & 0x0F
+            if kind_nibble == 0x9 or kind_nibble == 0x8:
+                pitch, velocity = data[pos], data[pos + 1]
+                pos += 2
+                key = (channel, pitch)
+                if kind_nibble == 0x9 and velocity > 0:
+                    open_notes.setdefault(key, []).append((tick, velocity))
+                else:
+                    started = open_notes.get(key)
+                    if started:
+                        start, vel = started.pop(0)
+                        notes.setdefault(channel, []).append((start, pitch, max(1, tick - start), vel))
+                        channels.add(channel)
+            else:
+                pos += _DATA_BYTES.get(kind_nibble, 0)
+
+        # Notes never released end with their track
+        for (channel, pitch), started in open_notes.items():
+            for start, vel in started:
+                notes.setdefault(channel, []).append((start, pitch, max(1, tick - start), vel))
+                channels.add(channel)
+        if name and len(channels) == 1:
+            names.setdefault(channels.pop(), name)
+
+    for events in notes.values():
+        events.sort()
+    return ppq, tempo, notes, names
+
+
+def _rescale(events, ppq):
+    """File ticks -> TPQN ticks (rounded), as t/p/d/v columns."""
+    if not events:
+        return [], [], [], []
+    t, p, d, v = (list(col) for col in zip(*events))
+    if ppq != TPQN:
+        t = [(x * TPQN + ppq // 2) // ppq for x in t]
+        d = [max(1, (x * TPQN + ppq // 2) // ppq) for x in d]
+    return t, p, d, v
+
+
+def midi_to_song(data):
+    """SMF bytes -> a new Song (notes are handed over as columns: see Track lazy hydration)."""
+    ppq, tempo, notes, names = parse(data)
+    song = Song()
+    tracks = [{} for _ in range(NUM_TRACKS)]
+    end = 0
+    for channel, events in notes.items():
+        if channel >= NUM_TRACKS:
+            continue
+        columns = _rescale(events, ppq)
+        tracks[channel]["note_columns"] = columns
+        if channel in names:
+            tracks[channel]["name"] = names[channel]
+        if channel == DRUM_CHANNEL:
+            tracks[channel].update(mode="SAMPLER", is_drum=True)
+        if columns[0]:
+            end = max(end, max(t + d for t, d in zip(columns[0], columns[2])))
+    song.from_dict({
+        "bpm": round(60_000_000 / tempo, 2) if tempo else 120,
+        "length_ticks": max(1, -(-end // TICKS_PER_BAR)) * TICKS_PER_BAR,
+        "tracks": tracks,
+    })
+    return song
+
+
+def read_midi(path):
+    with open(path, "rb") as f:
+        return midi_to_song(f.read())
+
+
+def song_to_midi(song, ppq=TPQN):
+    """Song -> SMF type 1 bytes."""
+    def to_file(tick):
+        return int(round(tick)) if ppq == TPQN else int(round(tick * ppq / TPQN))
+
+    def chunk(events):
+        # events: (tick, order, message bytes); note-offs sort before note-ons at one tick
+        out = bytearray()
+        last = 0
+        for tick, _, message in sorted(events, key=lambda e: (e[0], e[1])):
+            out += _write_vlq(tick - last) + message
+            last = tick
+        out += b"\x00\xFF\x2F\x00"
+        return b"MTrk" + struct.pack(">I", len(out)) + bytes(out)
+
+    tempo = int(round(60_000_000 / song.bpm))
+    conductor = [(0, 0, b"\xFF\x51\x03" + tempo.to_bytes(3, "big")),
+                 (0, 0, b"\xFF\x58\x04\x04\x02\x18\x08")]   # 4/4
+    chunks = [chunk(conductor)]
+    for track in song.tracks:
+        if not track.notes:
+            continue
+        channel = (track.channel - 1) % 16
+        name = track.name.encode("latin-1", "replace")
+        events = [(0, 0, b"\xFF\x03" + _write_vlq(len(name)) + name)]
+        for n in track.notes:
+            start = to_file(n.tick)
+            pitch, velocity = int(n.pitch) & 0x7F, max(1, min(127, int(n.velocity)))
+            events.append((start, 1, bytes((0x90 | channel, pitch, velocity))))
+            events.append((start + max(1, to_file(n.duration)), 0, bytes((0x80 | channel, pitch, 0))))
+        chunks.append(chunk(events))
+    return b"MThd" + struct.pack(">IHHH", 6, 1, len(chunks), ppq) + b"".join(chunks)
+
+
+def write_midi(path, song, ppq=TPQN):
+    with open(path, "wb") as f:
+        f.write(song_to_midi(song, ppq))
@@ -1,52 +1,273 @@
 # Blooper4/utils/project_manager.py
 import json
-import tkinter as tk
-from tkinter import filedialog
-import pygame
-from models import Song
+import os
+import queue
+import threading
+import time
+from collections import deque
+from constants import AUTOSAVE_SECONDS, AUTOSAVE_SUFFIX, AUTOSAVE_DIR
+from models import Song, note_dicts
+from utils import freeze_store, bloopz, midi_file
+
+PROJECT_TYPES = [("Blooper Project", "*.bloopz"), ("Blooper Project (JSON)", "*.bloop")]
+MIDI_TYPES = [("Standard MIDI File", "*.mid *.midi")]
+
+
+def is_midi(path):
+    return path.lower().endswith((".mid", ".midi"))
 
 class ProjectManager:
-    """Handles all File I/O and reconstruction logic for Blooper 4.0."""
-    
+    """Handles all File I/O and reconstruction logic for Blooper 4.0.
+
+    FORMATS:
+    --------
+    - .bloopz: compressed, notes as int32 columns, only non-default values
+      (see utils/bloopz.py). The default for new saves.
+    - .bloop:  the original indented JSON, still read and written.
+    The extension picks the format; write()/read() are the dialog-free halves
+    (no tkinter/pygame import: scripts and headless.py use only those).
+    The same dialogs import/export .mid files (notes + tempo only, see
+    utils/midi_file.py): an imported song has no file_path of its own.
+
+    SAVING:
+    -------
+    The UI thread only takes Song.snapshot(); serializing and writing happen
+    on the SAVER thread. Files are written to a temp file, fsync'd and renamed
+    over the old one, so a crash mid-save leaves the previous version intact.
+    """
+
     @staticmethod
-    def save(song):
+    def serialize(path, data):
+        """A Song.snapshot() (or to_dict()) -> file bytes for 'path's format."""
+        if bloopz.is_bloopz(path):
+            return bloopz.encode(data)
+        tracks = []
+        for t in data.get("tracks", []):
+            t = dict(t)
+            columns = t.pop("note_columns", None)
+            if columns is not None:
+                t["notes"] = note_dicts(columns)
+            tracks.append(t)
+        return json.dumps({**data, "tracks": tracks}, indent=4).encode("utf-8")
+
+    @staticmethod
+    def write_atomic(path, blob):
+        """Temp file + fsync + rename: readers see the old file or the new one, never half of it."""
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp, 'wb') as f:
+                f.write(blob)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+
+    @staticmethod
+    def write_snapshot(path, data, song=None):
+        """
+        Serializes + writes a snapshot. 'song' (optional) gets its frozen
+        sidecars written and its file_path set. Returns timing stats (ms).
+        """
+        start = time.perf_counter()
+        blob = ProjectManager.serialize(path, data)
+        serialized = time.perf_counter()
+        ProjectManager.write_atomic(path, blob)
+        # Frozen tracks keep their baked audio in sidecar files
+        if song is not None:
+            for track in song.tracks:
+                if track.frozen:
+                    freeze_store.write_sidecar(path, track)
+            song.file_path = path
+        written = time.perf_counter()
+        return {
+            "path": path,
+            "bytes": len(blob),
+            "serialize_ms": (serialized - start) * 1000,
+            "write_ms": (written - serialized) * 1000,
+        }
+
+    @staticmethod
+    def write(path, song):
+        """Synchronous save (scripts, benchmarks). Returns the timing stats."""
+        start = time.perf_counter()
+        data = song.snapshot()
+        snapshot_ms = (time.perf_counter() - start) * 1000
+        stats = ProjectManager.write_snapshot(path, data, song)
+        stats["snapshot_ms"] = snapshot_ms
+        return stats
+
+    @staticmethod
+    def read(path):
+        """
+        Builds a Song from a .bloopz, .bloop or .mid file. Only the track index
+        and mixer state are built here: notes and pads hydrate on first use.
+        """
+        if is_midi(path):
+            return midi_file.read_midi(path)
+        if bloopz.is_bloopz(path):
+            with open(path, 'rb') as f:
+                data = bloopz.decode(f.read(), lazy=True)
+        else:
+            with open(path, 'r') as f:
+                data = json.load(f)
+        new_song = Song()
+        new_song.from_dict(data)
+        new_song.file_path = path
+        for track in new_song.tracks:
+            if track.frozen:
+                freeze_store.load_sidecar(path, track)
+        return new_song
+
+    @staticmethod
+    def _dialog(ask, **options):
+        """Runs a tkinter file dialog. GUI modules are imported here, never by read()/write()."""
+        import tkinter as tk
+        from tkinter import filedialog
+        import pygame
         root = tk.Tk(); root.withdraw()
-        path = filedialog.asksaveasfilename(
-            defaultextension=".bloop", 
-            filetypes=[("Blooper Project", "*.bloop")]
-        )
+        path = getattr(filedialog, ask)(**options)
         root.destroy()
         # Flush the 'Selection Click' so it doesn't hit the Editor
         pygame.event.clear()
-        
-        if path:
+        return path
+
+    @staticmethod
+    def save(song):
+        path = ProjectManager._dialog(
+            "asksaveasfilename",
+            defaultextension=".bloopz",
+            filetypes=PROJECT_TYPES + MIDI_TYPES
+        )
+
+        if path and is_midi(path):
+            # An export: the project itself stays unsaved (MIDI has no plugins/mixer)
             try:
-                with open(path, 'w') as f:
-                    json.dump(song.to_dict(), f, indent=4)
-                song.file_path = path
-                print(f"Project Saved: {path}")
+                midi_file.write_midi(path, song)
+                print(f"MIDI Exported: {path}")
                 return True
             except Exception as e:
-                print(f"Save Error: {e}")
+                print(f"Export Error: {e}")
+            return False
+        if path:
+            # Written in the background: the UI keeps running
+            SAVER.submit(song, path)
+            return True
         return False
 
     @staticmethod
     def load():
-        root = tk.Tk(); root.withdraw()
-        path = filedialog.askopenfilename(
-            filetypes=[("Blooper Project", "*.bloop")]
+        path = ProjectManager._dialog(
+            "askopenfilename",
+            filetypes=[("Blooper Project / MIDI", "*.bloopz *.bloop *.mid *.midi")] + PROJECT_TYPES + MIDI_TYPES
         )
-        root.destroy()
-        pygame.event.clear()
-        
+
         if path:
             try:
-                with open(path, 'r') as f:
-                    data = json.load(f)
-                new_song = Song()
-                new_song.from_dict(data)
+                SAVER.wait()  # Never read a project that is still being written
+                new_song = ProjectManager.read(path)
+                new_song.hydrate_async()  # The UI shows the project meanwhile
                 print(f"Project Loaded: {path}")
                 return new_song
             except Exception as e:
                 print(f"Load Error: {e}")
-        return None
\ No newline at end of file
+        return None
+
+
+class BackgroundSaver:
+    """
+    One worker thread that writes save jobs in order. submit() costs the
+    caller a Song.snapshot() only; everything else happens here.
+
+    DIRTY TRACKING:
+    ---------------
+    A save clears Song.is_dirty when the snapshot is taken (edits made while
+    the file is written set it again) and restores it if the write fails.
+    An autosave is only a recovery copy: the song stays dirty, only its
+    autosave_pending flag is cleared (and restored the same way).
+    """
+    def __init__(self):
+        self._jobs = queue.Queue()
+        self._worker = None
+        self._lock = threading.Lock()
+        self.stats = deque(maxlen=32)   # One dict per finished save, newest last
+
+    @property
+    def busy(self):
+        return self._jobs.unfinished_tasks > 0
+
+    def submit(self, song, path, autosave=False):
+        start = time.perf_counter()
+        data = song.snapshot()
+        if autosave:
+            was_dirty, song.autosave_pending = song.autosave_pending, False
+        else:
+            was_dirty, song.is_dirty = song.is_dirty, False
+        snapshot_ms = (time.perf_counter() - start) * 1000
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name="ProjectSaver", daemon=True)
+                self._worker.start()
+        self._jobs.put((song, path, data, autosave, was_dirty, snapshot_ms))
+
+    def wait(self):
+        """Blocks until every submitted save is on disk (quit / load)."""
+        self._jobs.join()
+
+    def _run(self):
+        while True:
+            song, path, data, autosave, was_dirty, snapshot_ms = self._jobs.get()
+            try:
+                # Autosaves are recovery copies: no sidecars, the song keeps its path
+                stats = ProjectManager.write_snapshot(path, data, None if autosave else song)
+                stats.update(kind="AUTOSAVE" if autosave else "SAVE", snapshot_ms=snapshot_ms,
+                             time=time.time())
+                self.stats.append(stats)
+                label = "Autosaved" if autosave else "Project Saved"
+                print(f"{label}: {path} (snapshot {snapshot_ms:.1f} ms, serialize {stats['serialize_ms']:.1f} ms, "
+                      f"write {stats['write_ms']:.1f} ms, {stats['bytes'] / 1024:.1f} KB)")
+            except Exception as e:
+                if autosave:
+                    song.autosave_pending = song.autosave_pending or was_dirty
+                else:
+                    song.is_dirty = song.is_dirty or was_dirty
+                print(f"Save Error: {e}")
+            finally:
+                self._jobs.task_done()
+
+
+SAVER = BackgroundSaver()
+
+
+class Autosaver:
+    """
+    Call tick() once per frame: every AUTOSAVE_SECONDS, if the song changed
+    since its last save or autosave (Song.autosave_pending) and no save is
+    running, a recovery copy is queued on the SAVER.
+    """
+    def __init__(self, saver=SAVER, interval=AUTOSAVE_SECONDS):
+        self.saver = saver
+        self.interval = interval
+        self.next_time = time.monotonic() + interval
+
+    @staticmethod
+    def autosave_path(song):
+        """'song.bloopz' -> 'song.autosave.bloopz' next to it; untitled songs go to AUTOSAVE_DIR."""
+        if song.file_path:
+            return os.path.splitext(song.file_path)[0] + AUTOSAVE_SUFFIX
+        os.makedirs(AUTOSAVE_DIR, exist_ok=True)
+        return os.path.join(AUTOSAVE_DIR, "untitled" + AUTOSAVE_SUFFIX)
+
+    def tick(self, song):
+        now = time.monotonic()
+        if now < self.next_time or not song.autosave_pending or self.saver.busy:
+            return False
+        self.next_time = now + self.interval
+        try:
+            self.saver.submit(song, self.autosave_path(song), autosave=True)
+        except OSError as e:
+            print(f"Autosave Error: {e}")
+            return False
+        return True
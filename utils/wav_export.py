@@ -0,0 +1,26 @@
+# Blooper4/utils/wav_export.py
+import wave
+import numpy as np
+
+
+def write_wav(path, audio, sample_rate):
+    """
+    Writes float32 audio (samples,) or (samples, 2) to a 16-bit PCM WAV.
+    Returns the path, or None if the file could not be written.
+    """
+    audio = np.asarray(audio, dtype=np.float32)
+    if audio.ndim == 1:
+        audio = np.stack((audio, audio), axis=-1)
+    pcm = (np.clip(audio, -1.0, 1.0) * 32767).astype('<i2')
+
+    try:
+        with wave.open(path, 'wb') as wf:
+            wf.setnchannels(pcm.shape[1])
+            wf.setsampwidth(2)
+            wf.setframerate(int(sample_rate))
+            wf.writeframes(pcm.tobytes())
+    except (OSError, wave.Error) as e:
+        print(f"Export Error: {e}")
+        return None
+    print(f"Exported: {path} ({len(pcm)} samples @ {sample_rate} Hz)")
+    return path